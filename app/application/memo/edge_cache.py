@@ -0,0 +1,202 @@
+"""Materialised similarity edges kept in step with memo writes."""
+
+import heapq
+import threading
+from collections.abc import Callable, Iterable, Sequence
+from uuid import UUID
+
+import numpy as np
+
+from app.domain.memo.entities.memo import Memo
+from app.domain.memo.services.knn_graph import EdgeArrays
+from app.domain.memo.services.similarity import (
+    FloatMatrix,
+    normalize_rows,
+    threshold_pairs,
+)
+
+_INITIAL_CAPACITY = 64
+
+
+class SimilarityEdgeCache:
+    """Adjacency of every memo pair at or above a similarity floor.
+
+    The cache is built from the repository on the first graph read. After
+    that, each write compares only the written memo against the corpus
+    (one O(n * d) matrix-vector product) and graph reads walk the stored
+    adjacency in O(edges). Reads below the current floor rebuild the cache
+    at the lower floor.
+
+    Reads list the embedded memos while holding the cache lock, so a
+    write's :meth:`upsert` either lands before the read or waits for it and
+    is applied on top; a rebuild never replaces a newer upsert with older
+    vectors. The cached memo IDs are checked against that listing, so
+    inserts and deletes made elsewhere (another worker, or a direct
+    repository write) trigger a rebuild rather than a stale answer, and
+    vectors are only read when a rebuild is needed. Content changes made
+    elsewhere are not detected.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._floor: float | None = None
+        self._rows: FloatMatrix = np.zeros((0, 0), dtype=np.float32)
+        self._ids: list[UUID] = []
+        self._row_of: dict[UUID, int] = {}
+        self._adjacency: dict[UUID, dict[UUID, float]] = {}
+
+    @property
+    def floor(self) -> float | None:
+        """Lowest similarity stored, or None before the first build."""
+        return self._floor
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def upsert(self, memo_id: UUID, embedding: Sequence[float]) -> None:
+        """Replace ``memo_id``'s edges with those of its new embedding."""
+        with self._lock:
+            if self._floor is None:
+                return
+            self._remove(memo_id)
+            self._insert(memo_id, normalize_rows([embedding])[0])
+
+    def remove(self, memo_id: UUID) -> None:
+        with self._lock:
+            self._remove(memo_id)
+
+    def edges(
+        self,
+        embedded: Callable[[], list[Memo]],
+        snapshot: Callable[[], tuple[list[Memo], FloatMatrix]],
+        threshold: float,
+        k: int | None = None,
+    ) -> tuple[list[Memo], EdgeArrays]:
+        """Embedded memos and the edges between them at or above ``threshold``.
+
+        ``embedded`` lists the memos that have an embedding without loading
+        vectors. ``snapshot`` returns those memos with their unit vectors
+        row-aligned, from one consistent read, and is only called when the
+        cache has to be rebuilt. Both are called under the cache lock.
+
+        See :func:`collect_edges` for the layout of the edges.
+        """
+        with self._lock:
+            memos = embedded()
+            if not self._in_sync(memos, threshold):
+                memos, matrix = snapshot()
+                self._rebuild(memos, matrix, threshold)
+            pairs = [
+                (memo.id, other, sim)
+                for memo in memos
+                for other, sim in self._adjacency[memo.id].items()
+            ]
+        return memos, collect_edges(memos, pairs, threshold, k)
+
+    def _in_sync(self, memos: list[Memo], threshold: float) -> bool:
+        if self._floor is None or threshold < self._floor:
+            return False
+        return len(memos) == len(self._ids) and all(
+            memo.id in self._row_of for memo in memos
+        )
+
+    def _rebuild(self, memos: list[Memo], matrix: FloatMatrix, floor: float) -> None:
+        self._floor = floor
+        self._rows = np.zeros(
+            (max(len(memos), _INITIAL_CAPACITY), matrix.shape[1]), dtype=np.float32
+        )
+        self._rows[: len(memos)] = matrix
+        self._ids = [memo.id for memo in memos]
+        self._row_of = {memo_id: row for row, memo_id in enumerate(self._ids)}
+        self._adjacency = {memo_id: {} for memo_id in self._ids}
+        rows, cols, sims = threshold_pairs(matrix, floor)
+        for i, j, sim in zip(rows.tolist(), cols.tolist(), sims.tolist(), strict=True):
+            self._adjacency[self._ids[i]][self._ids[j]] = sim
+            self._adjacency[self._ids[j]][self._ids[i]] = sim
+
+    def _insert(self, memo_id: UUID, unit: FloatMatrix) -> None:
+        assert self._floor is not None  # noqa: S101
+        if unit.shape[0] != self._rows.shape[1]:
+            if self._ids:
+                msg = (
+                    f"Vector dimension {unit.shape[0]} does not match "
+                    f"cache dimension {self._rows.shape[1]}"
+                )
+                raise ValueError(msg)
+            self._rows = np.zeros((_INITIAL_CAPACITY, unit.shape[0]), dtype=np.float32)
+
+        count = len(self._ids)
+        sims = self._rows[:count] @ unit
+        neighbours: dict[UUID, float] = {}
+        for row in np.flatnonzero(sims >= self._floor).tolist():
+            other = self._ids[row]
+            neighbours[other] = float(sims[row])
+            self._adjacency[other][memo_id] = float(sims[row])
+        self._adjacency[memo_id] = neighbours
+
+        if count == self._rows.shape[0]:
+            grown = np.zeros((count * 2, self._rows.shape[1]), dtype=np.float32)
+            grown[:count] = self._rows
+            self._rows = grown
+        self._rows[count] = unit
+        self._ids.append(memo_id)
+        self._row_of[memo_id] = count
+
+    def _remove(self, memo_id: UUID) -> None:
+        row = self._row_of.pop(memo_id, None)
+        if row is None:
+            return
+        for other in self._adjacency.pop(memo_id):
+            del self._adjacency[other][memo_id]
+        last = len(self._ids) - 1
+        if row != last:
+            moved = self._ids[last]
+            self._rows[row] = self._rows[last]
+            self._ids[row] = moved
+            self._row_of[moved] = row
+        self._ids.pop()
+
+
+def collect_edges(
+    memos: list[Memo],
+    pairs: Iterable[tuple[UUID, UUID, float]],
+    threshold: float,
+    k: int | None = None,
+) -> EdgeArrays:
+    """Turn precomputed ``(id, id, similarity)`` pairs into edge arrays.
+
+    Indices refer to positions in ``memos`` and pairs come back once, with
+    ``rows < cols`` in row-major order, matching the batch builders in
+    ``app.domain.memo.services``. Pairs may be listed in either or both
+    directions; pairs touching memos outside ``memos`` are ignored. With
+    ``k`` set, each memo keeps at most its ``k`` most similar neighbours and
+    a pair kept by either endpoint becomes one edge.
+    """
+    position = {memo.id: i for i, memo in enumerate(memos)}
+    kept: dict[tuple[int, int], float] = {}
+    neighbours: dict[int, list[tuple[float, int]]] = {}
+    for first, second, sim in pairs:
+        if sim < threshold:
+            continue
+        i, j = position.get(first), position.get(second)
+        if i is None or j is None or i == j:
+            continue
+        if k is None:
+            kept[(min(i, j), max(i, j))] = sim
+        else:
+            neighbours.setdefault(i, []).append((sim, j))
+            neighbours.setdefault(j, []).append((sim, i))
+    if k is not None:
+        for i, candidates in neighbours.items():
+            for sim, j in heapq.nlargest(k, set(candidates)):
+                kept[(min(i, j), max(i, j))] = sim
+
+    if not kept:
+        empty = np.empty(0, dtype=np.intp)
+        return empty, empty, np.empty(0, dtype=np.float32)
+    ordered = sorted(kept.items())
+    return (
+        np.asarray([i for (i, _), _ in ordered], dtype=np.intp),
+        np.asarray([j for (_, j), _ in ordered], dtype=np.intp),
+        np.asarray([sim for _, sim in ordered], dtype=np.float32),
+    )
@@ -0,0 +1,151 @@
+"""Bounded background worker pool for memo enrichment."""
+
+import logging
+import threading
+import time
+from collections.abc import Callable, Sequence
+from concurrent.futures import Future, ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+_DEFAULT_WORKERS = 4
+_DEFAULT_MAX_PENDING = 1000
+_DEFAULT_MAX_ATTEMPTS = 3
+_DEFAULT_BACKOFF_SECONDS = 0.5
+
+EnrichmentJob = tuple[Callable[[], object], Callable[[Exception], None]]
+
+
+class EnrichmentQueueFullError(RuntimeError):
+    """Raised when more jobs are queued than the pool accepts."""
+
+
+class EnrichmentWorkerPool:
+    """Runs enrichment jobs on a fixed number of threads, with retry.
+
+    Each job is attempted up to ``max_attempts`` times with exponential
+    backoff (``backoff_seconds * 2**attempt``). When every attempt fails,
+    ``on_failure`` is called with the last exception. At most
+    ``max_pending`` jobs may be queued or running at once; beyond that
+    :meth:`submit` raises :class:`EnrichmentQueueFullError` instead of
+    growing the queue without bound, or with ``block=True`` waits for a
+    slot. :meth:`submit_many` hands whatever does not fit to a feeder
+    thread that waits for slots.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = _DEFAULT_WORKERS,
+        max_pending: int = _DEFAULT_MAX_PENDING,
+        max_attempts: int = _DEFAULT_MAX_ATTEMPTS,
+        backoff_seconds: float = _DEFAULT_BACKOFF_SECONDS,
+    ) -> None:
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="memo-enrichment"
+        )
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._max_attempts = max_attempts
+        self._backoff_seconds = backoff_seconds
+        self._feeders: list[threading.Thread] = []
+        self._closed = False
+
+    def submit(
+        self,
+        job: Callable[[], object],
+        on_failure: Callable[[Exception], None],
+        block: bool = False,
+    ) -> Future[None]:
+        if not self._slots.acquire(blocking=block):
+            msg = "Enrichment queue is full"
+            raise EnrichmentQueueFullError(msg)
+        return self._submit_reserved(job, on_failure)
+
+    def submit_many(self, jobs: Sequence[EnrichmentJob]) -> None:
+        """Submit every ``(job, on_failure)`` pair, waiting for slots as needed.
+
+        Jobs that fit are queued at once and the rest are fed in by a
+        background thread as slots free up, so a batch larger than
+        ``max_pending`` neither fails nor holds the caller. Nothing is
+        submitted, and :class:`EnrichmentQueueFullError` is raised, only when
+        not even the first job fits.
+        """
+        if not jobs:
+            return
+        if not self._slots.acquire(blocking=False):
+            msg = "Enrichment queue is full"
+            raise EnrichmentQueueFullError(msg)
+        self._submit_reserved(*jobs[0])
+        queued = 1
+        while queued < len(jobs) and self._slots.acquire(blocking=False):
+            self._submit_reserved(*jobs[queued])
+            queued += 1
+        if queued < len(jobs):
+            feeder = threading.Thread(
+                target=self._feed,
+                args=(jobs[queued:],),
+                name="memo-enrichment-feeder",
+                daemon=True,
+            )
+            self._feeders = [f for f in self._feeders if f.is_alive()]
+            self._feeders.append(feeder)
+            feeder.start()
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the pool; with ``wait``, after every fed and queued job ran.
+
+        Without ``wait``, jobs still waiting in a feeder are not submitted.
+        """
+        if wait:
+            for feeder in list(self._feeders):
+                feeder.join()
+        self._closed = True
+        self._executor.shutdown(wait=wait)
+
+    def _submit_reserved(
+        self, job: Callable[[], object], on_failure: Callable[[Exception], None]
+    ) -> Future[None]:
+        try:
+            return self._executor.submit(self._run, job, on_failure)
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def _feed(self, jobs: Sequence[EnrichmentJob]) -> None:
+        for fed, (job, on_failure) in enumerate(jobs):
+            self._slots.acquire()
+            if self._closed:
+                self._slots.release()
+                logger.warning(
+                    "Pool shut down with %d enrichment jobs unsubmitted",
+                    len(jobs) - fed,
+                )
+                return
+            self._submit_reserved(job, on_failure)
+
+    def _run(
+        self,
+        job: Callable[[], object],
+        on_failure: Callable[[Exception], None],
+    ) -> None:
+        try:
+            for attempt in range(self._max_attempts):
+                try:
+                    job()
+                    return
+                except Exception as exc:
+                    if attempt + 1 == self._max_attempts:
+                        logger.exception(
+                            "Enrichment failed after %d attempts", self._max_attempts
+                        )
+                        on_failure(exc)
+                        return
+                    delay = self._backoff_seconds * 2**attempt
+                    logger.warning(
+                        "Enrichment attempt %d failed (%s); retrying in %.1fs",
+                        attempt + 1,
+                        exc,
+                        delay,
+                    )
+                    time.sleep(delay)
+        finally:
+            self._slots.release()
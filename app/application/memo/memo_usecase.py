@@ -1,19 +1,57 @@
+import asyncio
 import logging
 import os
-from collections.abc import Callable
+from collections.abc import AsyncIterator, Callable
 from dataclasses import dataclass, field
 from datetime import datetime
+from enum import StrEnum
 from uuid import UUID
 
-from app.domain.memo.entities.memo import Memo
-from app.domain.memo.repositories.memo_repository import IMemoRepository
-from app.domain.memo.services.ai_client import IAIClient, SearchResult
+from app.application.memo.edge_cache import SimilarityEdgeCache, collect_edges
+from app.application.memo.enrichment import EnrichmentJob, EnrichmentWorkerPool
+from app.application.memo.search_cache import SemanticSearchCache
+from app.domain.memo.entities.memo import EnrichmentStatus, Memo
+from app.domain.memo.repositories.memo_repository import (
+    IMemoRepository,
+    MemoCursor,
+    MemoPage,
+)
+from app.domain.memo.services.ai_client import (
+    IAIClient,
+    MemoAnalysisResult,
+    SearchResult,
+)
 from app.domain.memo.services.embedding_client import IEmbeddingClient
-from app.domain.memo.services.similarity import cosine_similarity
+from app.domain.memo.services.knn_graph import (
+    EdgeArrays,
+    approximate_knn_edges,
+    edge_recall,
+    exact_knn_edges,
+)
+from app.domain.memo.services.similarity import (
+    FloatMatrix,
+    normalize_rows,
+    query_similarity,
+    threshold_pairs,
+)
 
 logger = logging.getLogger(__name__)
 
 _MAX_LABEL_LENGTH = 30
+_DEFAULT_INGEST_BATCH_SIZE = 64
+_DEFAULT_ANALYSIS_CONCURRENCY = 8
+_DEFAULT_APPROXIMATE_K = 10
+
+
+class GraphMode(StrEnum):
+    """How graph edges are built.
+
+    ``exact`` compares every pair; ``approximate`` builds a degree-capped
+    k-NN graph with LSH + NN-descent in sub-quadratic time.
+    """
+
+    EXACT = "exact"
+    APPROXIMATE = "approximate"
 
 
 @dataclass
@@ -36,6 +74,7 @@ class GraphEdge:
 class GraphData:
     nodes: list[GraphNode] = field(default_factory=list)
     edges: list[GraphEdge] = field(default_factory=list)
+    recall: float | None = None
 
 
 @dataclass
@@ -59,104 +98,533 @@ class Graph3DNode:
 class Graph3DData:
     nodes: list[Graph3DNode] = field(default_factory=list)
     edges: list[GraphEdge] = field(default_factory=list)
+    recall: float | None = None
+
+
+@dataclass
+class SearchStream:
+    """Retrieved memo IDs, available at once, and the answer as it streams."""
+
+    related_memo_ids: list[str]
+    answer: AsyncIterator[str]
+
+
+async def _single_chunk(text: str) -> AsyncIterator[str]:
+    yield text
+
+
+def _retrieval_scores(
+    query_embedding: list[float], memos: list[Memo]
+) -> list[float] | None:
+    """Each retrieved memo's cosine similarity to the query.
+
+    None when a memo came back without its embedding.
+    """
+    vectors = [m.embedding for m in memos if m.embedding is not None]
+    if len(vectors) != len(memos):
+        return None
+    scores: list[float] = query_similarity(
+        query_embedding, normalize_rows(vectors)
+    ).tolist()
+    return scores
+
+
+def _to_graph_edges(memos: list[Memo], edge_arrays: EdgeArrays) -> list[GraphEdge]:
+    rows, cols, sims = edge_arrays
+    return [
+        GraphEdge(
+            source=str(memos[i].id),
+            target=str(memos[j].id),
+            similarity=round(float(sim), 4),
+        )
+        for i, j, sim in zip(rows.tolist(), cols.tolist(), sims.tolist(), strict=True)
+    ]
 
 
 class MemoUsecase:
-    """Application service for memo operations."""
+    """Application service for memo operations.
+
+    When an ``edge_cache`` is given, exact-mode graph reads are served from
+    it and every write through this service keeps it up to date. Deferred
+    creates are enriched on ``enrichment_pool`` (a default pool is created
+    on demand). With a ``search_cache``, searches whose query embedding and
+    retrieved memos match a recent search reuse its answer; writes through
+    this service evict answers built from the written memo.
+    """
 
     def __init__(
         self,
         repository: IMemoRepository,
         ai_client: IAIClient,
         embedding_client: IEmbeddingClient | None = None,
+        edge_cache: SimilarityEdgeCache | None = None,
+        enrichment_pool: EnrichmentWorkerPool | None = None,
+        search_cache: SemanticSearchCache | None = None,
     ) -> None:
         self._repository = repository
         self._ai_client = ai_client
         self._embedding_client = embedding_client
+        self._edge_cache = edge_cache
+        self._enrichment_pool = enrichment_pool
+        self._search_cache = search_cache
 
     def create_memo(self, content: str) -> Memo:
         memo = Memo(content=content)
+        self._enrich(memo)
+        self._persist(memo)
+        logger.info("Memo created: id=%s", memo.id)
+        return memo
 
-        analysis = self._ai_client.analyze_memo(content)
-        memo.summary = analysis.summary
-        memo.tags = analysis.tags
+    async def create_memos_async(
+        self,
+        contents: list[str],
+        batch_size: int = _DEFAULT_INGEST_BATCH_SIZE,
+        max_concurrency: int = _DEFAULT_ANALYSIS_CONCURRENCY,
+    ) -> list[Memo]:
+        """Create many memos, embedding them in batches and writing them at once.
+
+        Each batch is embedded with one ``embed_batch_async`` call while its
+        analyses run at most ``max_concurrency`` at a time. Every memo is
+        written with a single ``save_many`` once all are enriched, so a
+        failure leaves nothing behind. Callers keep ``contents`` small
+        enough to finish within one request; larger imports belong on
+        :meth:`create_memos_deferred`.
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def analyze(content: str) -> MemoAnalysisResult:
+            async with semaphore:
+                return await self._ai_client.analyze_memo_async(content)
+
+        created: list[Memo] = []
+        for start in range(0, len(contents), batch_size):
+            batch = [Memo(content=c) for c in contents[start : start + batch_size]]
+            analyses_task = asyncio.gather(*(analyze(m.content) for m in batch))
+            if self._embedding_client is None:
+                analyses = await analyses_task
+            else:
+                analyses, embeddings = await asyncio.gather(
+                    analyses_task,
+                    self._embedding_client.embed_batch_async(
+                        [m.content for m in batch]
+                    ),
+                )
+                for memo, embedding in zip(batch, embeddings, strict=True):
+                    memo.embedding = embedding
+            for memo, analysis in zip(batch, analyses, strict=True):
+                memo.summary = analysis.summary
+                memo.tags = analysis.tags
+            created.extend(batch)
+        await asyncio.to_thread(self._persist_many, created)
+        logger.info("Memos created in bulk: count=%d", len(created))
+        return created
+
+    def create_memo_deferred(self, content: str) -> Memo:
+        """Persist a memo immediately and enrich it in the background.
+
+        The memo is returned with ``enrichment_status=pending`` and no
+        summary, tags or embedding; a worker fills them in and marks it
+        completed, or failed once its retries are exhausted.
+
+        Raises:
+            EnrichmentQueueFullError: Too many memos are awaiting enrichment.
+        """
+        memo = Memo(content=content, enrichment_status=EnrichmentStatus.PENDING)
+        self._repository.save(memo)
+        try:
+            self._schedule_enrichment(memo.id)
+        except Exception:
+            self._repository.delete(memo.id)
+            raise
+        logger.info("Memo accepted for enrichment: id=%s", memo.id)
+        return memo
 
-        if self._embedding_client is not None:
-            memo.embedding = self._embedding_client.embed(content)
+    def create_memos_deferred(self, contents: list[str]) -> list[Memo]:
+        """Persist many pending memos at once and enrich them in the background.
 
-        self._repository.save(memo)
+        Memos beyond the queue's free slots wait for one in the background,
+        so a batch may be larger than the queue. When the queue has no free
+        slot at all the batch is removed again with one bulk delete. Each
+        memo's outcome shows in its ``enrichment_status``.
+
+        Raises:
+            EnrichmentQueueFullError: The queue has no room at all.
+        """
+        memos = [
+            Memo(content=c, enrichment_status=EnrichmentStatus.PENDING)
+            for c in contents
+        ]
+        self._repository.save_many(memos)
+        try:
+            self._pool().submit_many([self._enrichment_job(m.id) for m in memos])
+        except Exception:
+            self._repository.delete_many([m.id for m in memos])
+            raise
+        logger.info("Memos accepted for enrichment: count=%d", len(memos))
+        return memos
+
+    def resume_pending_enrichment(self) -> int:
+        """Queue every memo still pending, e.g. after a restart lost the queue.
+
+        Waits for queue slots rather than failing when there are more
+        pending memos than the pool holds. Memos another process is already
+        enriching may be analyzed twice; only the first result is stored.
+        Returns the number of memos queued.
+        """
+        memo_ids = self._repository.get_pending_ids()
+        for memo_id in memo_ids:
+            self._schedule_enrichment(memo_id, block=True)
+        if memo_ids:
+            logger.info("Resumed enrichment of %d pending memos", len(memo_ids))
+        return len(memo_ids)
+
+    def enrich_memo(self, memo_id: UUID) -> Memo | None:
+        """Enrich a pending memo. Returns None if there was nothing to do.
+
+        A memo that was deleted, already enriched by an update, or edited
+        while this job ran is left untouched: the result is written with
+        :meth:`IMemoRepository.save_if_pending`.
+        """
+        memo = self._repository.get_by_id(memo_id)
+        if memo is None or memo.enrichment_status is not EnrichmentStatus.PENDING:
+            return None
+        self._enrich(memo)
+        if not self._repository.save_if_pending(memo):
+            return None
+        self._after_write(memo)
+        logger.info("Memo enriched: id=%s", memo.id)
+        return memo
+
+    def _schedule_enrichment(self, memo_id: UUID, block: bool = False) -> None:
+        job, on_failure = self._enrichment_job(memo_id)
+        self._pool().submit(job, on_failure=on_failure, block=block)
+
+    def _enrichment_job(self, memo_id: UUID) -> EnrichmentJob:
+        return (
+            lambda: self.enrich_memo(memo_id),
+            lambda _: self._mark_enrichment_failed(memo_id),
+        )
+
+    def _pool(self) -> EnrichmentWorkerPool:
+        if self._enrichment_pool is None:
+            self._enrichment_pool = EnrichmentWorkerPool()
+        return self._enrichment_pool
+
+    def _mark_enrichment_failed(self, memo_id: UUID) -> None:
+        memo = self._repository.get_by_id(memo_id)
+        if memo is not None and memo.enrichment_status is EnrichmentStatus.PENDING:
+            memo.enrichment_status = EnrichmentStatus.FAILED
+            self._repository.save_if_pending(memo)
+
+    async def create_memo_async(self, content: str) -> Memo:
+        """Create a memo, running AI analysis and embedding concurrently.
+
+        Latency is roughly ``max(analysis, embedding)`` rather than their sum.
+        The repository is synchronous, so persistence runs in a worker thread.
+        """
+        memo = Memo(content=content)
+        await self._enrich_async(memo)
+        await asyncio.to_thread(self._persist, memo)
         logger.info("Memo created: id=%s", memo.id)
         return memo
 
     def get_all_memos(self) -> list[Memo]:
         return self._repository.get_all()
 
+    def get_dataset_version(self) -> int | None:
+        return self._repository.version()
+
+    def get_memo_page(self, limit: int, cursor: MemoCursor | None = None) -> MemoPage:
+        return self._repository.get_page(limit, after=cursor)
+
     def get_memo_by_id(self, memo_id: UUID) -> Memo | None:
         return self._repository.get_by_id(memo_id)
 
     def update_memo(self, memo_id: UUID, content: str) -> Memo | None:
+        """Replace a memo's content and re-enrich it.
+
+        An update that leaves a fully enriched memo's content unchanged (as
+        autosave often does) returns the stored memo without calling the AI
+        or embedding clients.
+        """
         memo = self._repository.get_by_id(memo_id)
         if memo is None:
             return None
+        if self._is_unchanged(memo, content):
+            return memo
 
         memo.content = content
-        analysis = self._ai_client.analyze_memo(content)
+        self._enrich(memo)
+        self._persist(memo)
+        logger.info("Memo updated: id=%s", memo.id)
+        return memo
+
+    async def update_memo_async(self, memo_id: UUID, content: str) -> Memo | None:
+        """Async :meth:`update_memo` with concurrent analysis and embedding."""
+        memo = await asyncio.to_thread(self._repository.get_by_id, memo_id)
+        if memo is None:
+            return None
+        if self._is_unchanged(memo, content):
+            return memo
+
+        memo.content = content
+        await self._enrich_async(memo)
+        await asyncio.to_thread(self._persist, memo)
+        logger.info("Memo updated: id=%s", memo.id)
+        return memo
+
+    def _is_unchanged(self, memo: Memo, content: str) -> bool:
+        return (
+            memo.content == content
+            and memo.enrichment_status is EnrichmentStatus.COMPLETED
+            and (self._embedding_client is None or memo.embedding is not None)
+        )
+
+    def _enrich(self, memo: Memo) -> None:
+        analysis = self._ai_client.analyze_memo(memo.content)
         memo.summary = analysis.summary
         memo.tags = analysis.tags
 
         if self._embedding_client is not None:
-            memo.embedding = self._embedding_client.embed(content)
+            memo.embedding = self._embedding_client.embed(memo.content)
+        memo.enrichment_status = EnrichmentStatus.COMPLETED
 
+    async def _enrich_async(self, memo: Memo) -> None:
+        analysis_task = self._ai_client.analyze_memo_async(memo.content)
+        if self._embedding_client is None:
+            analysis = await analysis_task
+        else:
+            analysis, memo.embedding = await asyncio.gather(
+                analysis_task, self._embedding_client.embed_async(memo.content)
+            )
+        memo.summary = analysis.summary
+        memo.tags = analysis.tags
+        memo.enrichment_status = EnrichmentStatus.COMPLETED
+
+    def _persist(self, memo: Memo) -> None:
         self._repository.save(memo)
-        logger.info("Memo updated: id=%s", memo.id)
-        return memo
+        self._after_write(memo)
+
+    def _after_write(self, memo: Memo) -> None:
+        self._refresh_edges(memo)
+        self._invalidate_searches(memo.id)
+
+    def _persist_many(self, memos: list[Memo]) -> None:
+        self._repository.save_many(memos)
+        for memo in memos:
+            self._refresh_edges(memo)
+            self._invalidate_searches(memo.id)
 
     def delete_memo(self, memo_id: UUID) -> bool:
         deleted = self._repository.delete(memo_id)
         if deleted:
+            if self._edge_cache is not None:
+                self._edge_cache.remove(memo_id)
+            self._invalidate_searches(memo_id)
             logger.info("Memo deleted: id=%s", memo_id)
         return deleted
 
-    def search_memos(self, query: str) -> SearchResult:
-        if self._embedding_client is not None:
-            query_embedding = self._embedding_client.embed(query)
-            relevant_memos = self._repository.search_by_vector(query_embedding, limit=5)
+    def _refresh_edges(self, memo: Memo) -> None:
+        if self._edge_cache is None:
+            return
+        if memo.embedding is not None:
+            self._edge_cache.upsert(memo.id, memo.embedding)
         else:
-            relevant_memos = self._repository.get_all()
+            self._edge_cache.remove(memo.id)
+
+    def _invalidate_searches(self, memo_id: UUID) -> None:
+        if self._search_cache is not None:
+            self._search_cache.invalidate(memo_id)
+
+    def search_memos(self, query: str) -> SearchResult:
+        if self._embedding_client is None:
+            return self._ai_client.search_memos(
+                query, self._repository.get_all_metadata()
+            )
 
-        return self._ai_client.search_memos(query, relevant_memos)
+        query_embedding = self._embedding_client.embed(query)
+        relevant_memos = self._repository.search_by_vector(query_embedding, limit=5)
+        if self._search_cache is not None:
+            cached = self._search_cache.get(query_embedding, relevant_memos)
+            if cached is not None:
+                logger.info("Search answered from cache")
+                return cached
+
+        scores = _retrieval_scores(query_embedding, relevant_memos)
+        result = self._ai_client.search_memos(query, relevant_memos, scores)
+        if self._search_cache is not None:
+            self._search_cache.put(query_embedding, relevant_memos, result)
+        return result
+
+    async def search_memos_async(self, query: str) -> SearchResult:
+        query_embedding, relevant_memos, cached = await self._retrieve_async(query)
+        if cached is not None:
+            return cached
+
+        scores = (
+            None
+            if query_embedding is None
+            else _retrieval_scores(query_embedding, relevant_memos)
+        )
+        result = await self._ai_client.search_memos_async(query, relevant_memos, scores)
+        if self._search_cache is not None and query_embedding is not None:
+            self._search_cache.put(query_embedding, relevant_memos, result)
+        return result
+
+    async def search_memos_stream(self, query: str) -> SearchStream:
+        """Retrieve memos for ``query`` and start streaming the answer.
+
+        Retrieval has finished when this returns, so the related IDs can be
+        sent before the first answer token. They are the retrieved memos
+        rather than the subset :meth:`search_memos` asks the AI to pick.
+        A cached answer is replayed as a single chunk; streamed answers are
+        not added to the search cache.
+        """
+        query_embedding, relevant_memos, cached = await self._retrieve_async(query)
+        if cached is not None:
+            return SearchStream(
+                related_memo_ids=cached.related_memo_ids,
+                answer=_single_chunk(cached.answer),
+            )
+        scores = (
+            None
+            if query_embedding is None
+            else _retrieval_scores(query_embedding, relevant_memos)
+        )
+        return SearchStream(
+            related_memo_ids=[str(m.id) for m in relevant_memos],
+            answer=self._ai_client.stream_search_answer(query, relevant_memos, scores),
+        )
+
+    async def _retrieve_async(
+        self, query: str
+    ) -> tuple[list[float] | None, list[Memo], SearchResult | None]:
+        """Query embedding, memos to answer from, and any cached answer."""
+        if self._embedding_client is None:
+            memos = await asyncio.to_thread(self._repository.get_all_metadata)
+            return None, memos, None
+
+        query_embedding = await self._embedding_client.embed_async(query)
+        relevant_memos = await asyncio.to_thread(
+            self._repository.search_by_vector, query_embedding, 5
+        )
+        cached = None
+        if self._search_cache is not None:
+            cached = self._search_cache.get(query_embedding, relevant_memos)
+            if cached is not None:
+                logger.info("Search answered from cache")
+        return query_embedding, relevant_memos, cached
 
     def _get_threshold(self, threshold: float | None) -> float:
         if threshold is not None:
             return threshold
         return float(os.environ.get("GRAPH_SIMILARITY_THRESHOLD", "0.7"))
 
+    def _embedded_memos(
+        self, normalized: bool = True
+    ) -> tuple[list[Memo], FloatMatrix]:
+        """Memos that have an embedding, with their vectors row-aligned.
+
+        Vectors come from the repository's embedding matrix rather than being
+        re-normalised from each memo's list; ``normalized=False`` returns
+        them as stored.
+        """
+        ids, matrix = self._repository.get_embedding_matrix(normalized)
+        row_of = {memo_id: row for row, memo_id in enumerate(ids)}
+        memos = [m for m in self._repository.get_all_metadata() if m.id in row_of]
+        return memos, matrix[[row_of[m.id] for m in memos]]
+
+    def _embedded_metadata(self) -> list[Memo]:
+        """Memos that have an embedding, without reading the vectors."""
+        embedded = set(self._repository.get_embedded_ids())
+        return [m for m in self._repository.get_all_metadata() if m.id in embedded]
+
     @staticmethod
     def _compute_edges(
         memos: list[Memo],
+        matrix: FloatMatrix,
         threshold: float,
-    ) -> list[GraphEdge]:
-        edges: list[GraphEdge] = []
-        for i, memo_a in enumerate(memos):
-            for memo_b in memos[i + 1 :]:
-                assert memo_a.embedding is not None  # noqa: S101
-                assert memo_b.embedding is not None  # noqa: S101
-                sim = cosine_similarity(memo_a.embedding, memo_b.embedding)
-                if sim >= threshold:
-                    edges.append(
-                        GraphEdge(
-                            source=str(memo_a.id),
-                            target=str(memo_b.id),
-                            similarity=round(sim, 4),
-                        )
-                    )
-        return edges
-
-    def get_graph_data(self, threshold: float | None = None) -> GraphData:
-        resolved_threshold = self._get_threshold(threshold)
+        mode: GraphMode = GraphMode.EXACT,
+        k: int | None = None,
+        measure_recall: bool = False,
+    ) -> tuple[list[GraphEdge], float | None]:
+        """Build similarity edges between memos.
+
+        With ``k`` set, each memo keeps at most its ``k`` most similar
+        neighbours above ``threshold``. When ``measure_recall`` is set in
+        approximate mode, the exact builder also runs and the fraction of
+        exact edges recovered is returned alongside the edges.
+        """
+        if len(memos) < 2:
+            return [], None
+
+        edge_arrays: EdgeArrays
+        recall: float | None = None
+        if mode is GraphMode.APPROXIMATE:
+            degree = k if k is not None else _DEFAULT_APPROXIMATE_K
+            edge_arrays = approximate_knn_edges(matrix, threshold, degree)
+            if measure_recall:
+                exact = exact_knn_edges(matrix, threshold, degree)
+                recall = edge_recall(edge_arrays, exact, len(memos))
+                logger.info("Approximate graph recall: %.4f (k=%d)", recall, degree)
+        elif k is not None:
+            edge_arrays = exact_knn_edges(matrix, threshold, k)
+        else:
+            edge_arrays = threshold_pairs(matrix, threshold)
 
-        all_memos = self._repository.get_all()
-        memos_with_embedding = [m for m in all_memos if m.embedding is not None]
+        return _to_graph_edges(memos, edge_arrays), recall
+
+    def _graph_edges(
+        self,
+        threshold: float,
+        mode: GraphMode,
+        k: int | None,
+        measure_recall: bool,
+        raw_vectors: bool = False,
+    ) -> tuple[list[Memo], list[GraphEdge], float | None, FloatMatrix | None]:
+        """Embedded memos, their similarity edges, recall and vectors.
+
+        Exact-mode reads prefer edges the repository has precomputed, then
+        the edge cache when one is configured; neither loads vectors, so the
+        returned matrix is None. Approximate mode, and exact mode without
+        either, build the graph from the embedding matrix and return it
+        row-aligned with the memos: unit rows, or the embeddings as stored
+        with ``raw_vectors``.
+        """
+        if mode is GraphMode.EXACT:
+            stored = self._repository.get_similarity_graph(threshold, k)
+            if stored is not None:
+                memos, similarity_edges = stored
+                pairs = (
+                    (e.source_id, e.target_id, e.similarity) for e in similarity_edges
+                )
+                edge_arrays = collect_edges(memos, pairs, threshold, k)
+                return memos, _to_graph_edges(memos, edge_arrays), None, None
+
+        if self._edge_cache is not None and mode is GraphMode.EXACT:
+            memos, edge_arrays = self._edge_cache.edges(
+                self._embedded_metadata, self._embedded_memos, threshold, k
+            )
+            return memos, _to_graph_edges(memos, edge_arrays), None, None
+
+        memos, vectors = self._embedded_memos(normalized=not raw_vectors)
+        unit = normalize_rows(vectors) if raw_vectors else vectors
+        edges, recall = self._compute_edges(
+            memos, unit, threshold, mode, k, measure_recall
+        )
+        return memos, edges, recall, vectors
+
+    def get_graph_data(
+        self,
+        threshold: float | None = None,
+        mode: GraphMode = GraphMode.EXACT,
+        k: int | None = None,
+        measure_recall: bool = False,
+    ) -> GraphData:
+        resolved_threshold = self._get_threshold(threshold)
+        memos_with_embedding, edges, recall, _ = self._graph_edges(
+            resolved_threshold, mode, k, measure_recall
+        )
 
         nodes = [
             GraphNode(
@@ -168,26 +636,30 @@ class MemoUsecase:
             )
             for m in memos_with_embedding
         ]
-
-        edges = self._compute_edges(memos_with_embedding, resolved_threshold)
-        return GraphData(nodes=nodes, edges=edges)
+        return GraphData(nodes=nodes, edges=edges, recall=recall)
 
     def get_graph_3d_data(
         self,
         reduce_fn: Callable[[list[list[float]]], list[dict[str, float]]],
         threshold: float | None = None,
+        mode: GraphMode = GraphMode.EXACT,
+        k: int | None = None,
+        measure_recall: bool = False,
     ) -> Graph3DData:
         resolved_threshold = self._get_threshold(threshold)
-
-        all_memos = self._repository.get_all()
-        memos_with_embedding = [m for m in all_memos if m.embedding is not None]
+        memos_with_embedding, edges, recall, matrix = self._graph_edges(
+            resolved_threshold, mode, k, measure_recall, raw_vectors=True
+        )
 
         if not memos_with_embedding:
             return Graph3DData()
 
-        embeddings = [m.embedding for m in memos_with_embedding]
-        # Type narrowing: embeddings are guaranteed non-None by the filter above
-        positions = reduce_fn([e for e in embeddings if e is not None])
+        if matrix is None:
+            # Precomputed and cached edges come without vectors; PCA needs them
+            ids, vectors = self._repository.get_embedding_matrix(normalized=False)
+            row_of = {memo_id: row for row, memo_id in enumerate(ids)}
+            matrix = vectors[[row_of[m.id] for m in memos_with_embedding]]
+        positions = reduce_fn(matrix.tolist())
 
         nodes = [
             Graph3DNode(
@@ -204,6 +676,4 @@ class MemoUsecase:
             )
             for m, pos in zip(memos_with_embedding, positions, strict=True)
         ]
-
-        edges = self._compute_edges(memos_with_embedding, resolved_threshold)
-        return Graph3DData(nodes=nodes, edges=edges)
+        return Graph3DData(nodes=nodes, edges=edges, recall=recall)
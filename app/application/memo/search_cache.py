@@ -0,0 +1,116 @@
+"""Answers to recent searches, reused for semantically equivalent queries."""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from collections.abc import Sequence
+from dataclasses import dataclass
+from uuid import UUID, uuid4
+
+import numpy as np
+
+from app.domain.memo.entities.memo import Memo
+from app.domain.memo.services.ai_client import SearchResult
+from app.domain.memo.services.similarity import FloatMatrix, normalize_rows
+
+_DEFAULT_MAX_ENTRIES = 256
+_DEFAULT_MAX_DISTANCE = 0.05
+
+
+def memo_fingerprint(memos: Sequence[Memo]) -> str:
+    """Digest of every field the AI sees for ``memos``, in retrieval order."""
+    digest = hashlib.sha256()
+    for memo in memos:
+        for part in (str(memo.id), memo.content, memo.summary or "", *memo.tags):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        digest.update(b"\1")
+    return digest.hexdigest()
+
+
+@dataclass
+class _Entry:
+    vector: FloatMatrix
+    fingerprint: str
+    memo_ids: frozenset[UUID]
+    result: SearchResult
+
+
+class SemanticSearchCache:
+    """LRU of search answers looked up by query-embedding distance.
+
+    A cached answer is returned when the new query's cosine distance to a
+    cached query is at most ``max_distance`` *and* retrieval produced the
+    same memos with the same content, summary and tags. Entries that
+    reference a memo are dropped as soon as that memo is written or
+    deleted through :meth:`invalidate`.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = _DEFAULT_MAX_ENTRIES,
+        max_distance: float = _DEFAULT_MAX_DISTANCE,
+    ) -> None:
+        self._max_entries = max_entries
+        self._max_distance = max_distance
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[UUID, _Entry] = OrderedDict()
+        self._by_memo: dict[UUID, set[UUID]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(
+        self, query_embedding: Sequence[float], memos: Sequence[Memo]
+    ) -> SearchResult | None:
+        vector = normalize_rows([query_embedding])[0]
+        fingerprint = memo_fingerprint(memos)
+        with self._lock:
+            candidates = [
+                (key, entry)
+                for key, entry in self._entries.items()
+                if entry.fingerprint == fingerprint
+            ]
+            if not candidates:
+                return None
+            sims = np.stack([entry.vector for _, entry in candidates]) @ vector
+            best = int(np.argmax(sims))
+            if 1.0 - float(sims[best]) > self._max_distance:
+                return None
+            key, entry = candidates[best]
+            self._entries.move_to_end(key)
+            return entry.result.model_copy(deep=True)
+
+    def put(
+        self,
+        query_embedding: Sequence[float],
+        memos: Sequence[Memo],
+        result: SearchResult,
+    ) -> None:
+        entry = _Entry(
+            vector=normalize_rows([query_embedding])[0],
+            fingerprint=memo_fingerprint(memos),
+            memo_ids=frozenset(memo.id for memo in memos),
+            result=result.model_copy(deep=True),
+        )
+        key = uuid4()
+        with self._lock:
+            self._entries[key] = entry
+            for memo_id in entry.memo_ids:
+                self._by_memo.setdefault(memo_id, set()).add(key)
+            while len(self._entries) > self._max_entries:
+                self._drop(next(iter(self._entries)))
+
+    def invalidate(self, memo_id: UUID) -> None:
+        """Forget every answer that was built from ``memo_id``."""
+        with self._lock:
+            for key in list(self._by_memo.get(memo_id, ())):
+                self._drop(key)
+
+    def _drop(self, key: UUID) -> None:
+        entry = self._entries.pop(key)
+        for memo_id in entry.memo_ids:
+            keys = self._by_memo[memo_id]
+            keys.discard(key)
+            if not keys:
+                del self._by_memo[memo_id]
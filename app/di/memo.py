@@ -1,21 +1,43 @@
+import logging
 import os
+import threading
+import time
+from collections.abc import Callable
+from functools import partial
+from pathlib import Path
+from typing import Any
 
 from dotenv import load_dotenv
+from sqlalchemy.orm import Session, sessionmaker
 
+from app.application.memo.edge_cache import SimilarityEdgeCache
+from app.application.memo.enrichment import EnrichmentWorkerPool
 from app.application.memo.memo_usecase import MemoUsecase
+from app.application.memo.search_cache import SemanticSearchCache
 from app.domain.memo.repositories.memo_repository import IMemoRepository
+from app.domain.memo.services.ai_client import IAIClient
 from app.domain.memo.services.embedding_client import IEmbeddingClient
 from app.infrastructure.memo.db.database import create_session_factory
+from app.infrastructure.memo.db.hnsw_index import HnswParams
+from app.infrastructure.memo.db.quantization import VectorPrecision
 from app.infrastructure.memo.db.repositories.in_memory_memo_repository import (
     InMemoryMemoRepository,
 )
 from app.infrastructure.memo.db.repositories.memo_repository_impl import (
     PostgresMemoRepository,
 )
-from app.infrastructure.memo.external.claude_client import ClaudeClient
+from app.infrastructure.memo.db.vector_index import VectorIndexConfig
+from app.infrastructure.memo.external.cached_analysis import CachedAIClient
+from app.infrastructure.memo.external.cached_embedding import CachedEmbeddingClient
+from app.infrastructure.memo.external.context_packer import ContextBudget
 
 load_dotenv(override=True)
 
+logger = logging.getLogger(__name__)
+
+_WARMUP_INITIAL_DELAY_SECONDS = 1.0
+_WARMUP_MAX_DELAY_SECONDS = 60.0
+
 
 def _create_embedding_client() -> IEmbeddingClient | None:
     provider = os.environ.get("EMBEDDING_PROVIDER", "")
@@ -29,40 +51,276 @@ def _create_embedding_client() -> IEmbeddingClient | None:
 
         return OpenAIEmbeddingClient(
             api_key=os.environ["OPENAI_API_KEY"],
+            timeout=float(os.environ.get("OPENAI_TIMEOUT_SECONDS", "10")),
+            max_retries=int(os.environ.get("OPENAI_MAX_RETRIES", "3")),
+            max_connections=int(os.environ.get("OPENAI_MAX_CONNECTIONS", "10")),
+            coalesce_batch_size=int(
+                os.environ.get("OPENAI_COALESCE_BATCH_SIZE", "256")
+            ),
+            coalesce_wait_ms=float(os.environ.get("OPENAI_COALESCE_WAIT_MS", "10")),
+        )
+
+    factory: Callable[[], IEmbeddingClient]
+    if provider == "onnx":
+        from app.infrastructure.memo.external.onnx_embedding import (
+            OnnxEmbeddingClient,
         )
 
-    from app.infrastructure.memo.external.local_embedding import (
-        LocalEmbeddingClient,
+        threads = os.environ.get("ONNX_THREADS")
+        factory = partial(
+            OnnxEmbeddingClient,
+            model_dir=Path(os.environ.get("ONNX_MODEL_DIR", "models/onnx-minilm")),
+            threads=int(threads) if threads else None,
+        )
+    else:
+        from app.infrastructure.memo.external.local_embedding import (
+            LocalEmbeddingClient,
+        )
+
+        factory = LocalEmbeddingClient
+
+    workers = int(os.environ.get("EMBEDDING_WORKERS", "0"))
+    if workers <= 0:
+        return factory()
+
+    from app.infrastructure.memo.external.embedding_pool import (
+        ProcessPoolEmbeddingClient,
+    )
+
+    return ProcessPoolEmbeddingClient(
+        factory,
+        workers=workers,
+        max_batch_size=int(os.environ.get("EMBEDDING_MAX_BATCH_SIZE", "32")),
+        max_wait_ms=float(os.environ.get("EMBEDDING_MAX_WAIT_MS", "5")),
+    )
+
+
+def _create_hnsw_params() -> HnswParams:
+    defaults = HnswParams()
+    return HnswParams(
+        m=int(os.environ.get("HNSW_M", defaults.m)),
+        ef_construction=int(
+            os.environ.get("HNSW_EF_CONSTRUCTION", defaults.ef_construction)
+        ),
+        ef_search=int(os.environ.get("HNSW_EF_SEARCH", defaults.ef_search)),
+        precision=VectorPrecision(os.environ.get("HNSW_PRECISION", defaults.precision)),
+    )
+
+
+def _create_in_memory_repository() -> InMemoryMemoRepository:
+    options: dict[str, int] = {}
+    threshold = os.environ.get("HNSW_BRUTE_FORCE_THRESHOLD")
+    if threshold is not None:
+        options["brute_force_threshold"] = int(threshold)
+    rerank_factor = os.environ.get("HNSW_RERANK_FACTOR")
+    if rerank_factor is not None:
+        options["rerank_factor"] = int(rerank_factor)
+    return InMemoryMemoRepository(index_params=_create_hnsw_params(), **options)
+
+
+def _create_postgres_repository(
+    session_factory: sessionmaker[Session], index_config: VectorIndexConfig
+) -> PostgresMemoRepository:
+    options: dict[str, Any] = {}
+    floor = os.environ.get("GRAPH_EDGE_FLOOR")
+    if floor is not None:
+        options["edge_floor"] = float(floor)
+    neighbours = os.environ.get("GRAPH_EDGE_NEIGHBOURS")
+    if neighbours is not None:
+        options["edge_neighbours"] = int(neighbours)
+    return PostgresMemoRepository(session_factory, index_config, **options)
+
+
+def _create_edge_cache() -> SimilarityEdgeCache | None:
+    enabled = os.environ.get("GRAPH_EDGE_CACHE", "true").lower()
+    if enabled in ("0", "false", "no", "off"):
+        return None
+    return SimilarityEdgeCache()
+
+
+def _create_enrichment_pool() -> EnrichmentWorkerPool:
+    return EnrichmentWorkerPool(
+        max_workers=int(os.environ.get("ENRICHMENT_WORKERS", "4")),
+        max_pending=int(os.environ.get("ENRICHMENT_MAX_PENDING", "1000")),
+        max_attempts=int(os.environ.get("ENRICHMENT_MAX_ATTEMPTS", "3")),
+        backoff_seconds=float(os.environ.get("ENRICHMENT_BACKOFF_SECONDS", "0.5")),
+    )
+
+
+def _create_search_cache() -> SemanticSearchCache | None:
+    max_entries = int(os.environ.get("SEARCH_CACHE_SIZE", "256"))
+    if max_entries <= 0:
+        return None
+    return SemanticSearchCache(
+        max_entries=max_entries,
+        max_distance=float(os.environ.get("SEARCH_CACHE_MAX_DISTANCE", "0.05")),
+    )
+
+
+def _with_embedding_cache(
+    client: IEmbeddingClient | None,
+) -> tuple[IEmbeddingClient | None, CachedEmbeddingClient | None]:
+    max_entries = int(os.environ.get("EMBEDDING_CACHE_SIZE", "10000"))
+    if client is None or max_entries <= 0:
+        return client, None
+    disk_path = os.environ.get("EMBEDDING_CACHE_PATH", "")
+    cached = CachedEmbeddingClient(
+        client,
+        max_entries=max_entries,
+        disk_path=Path(disk_path) if disk_path else None,
+    )
+    return cached, cached
+
+
+def _create_context_budget() -> ContextBudget:
+    defaults = ContextBudget()
+    return ContextBudget(
+        total=int(os.environ.get("SEARCH_CONTEXT_TOKENS", defaults.total)),
+        per_memo=int(os.environ.get("SEARCH_CONTEXT_MEMO_TOKENS", defaults.per_memo)),
+        min_score=float(os.environ.get("SEARCH_CONTEXT_MIN_SCORE", defaults.min_score)),
+        min_relative_score=float(
+            os.environ.get(
+                "SEARCH_CONTEXT_MIN_RELATIVE_SCORE", defaults.min_relative_score
+            )
+        ),
     )
 
-    return LocalEmbeddingClient()
+
+def _create_ai_client() -> IAIClient:
+    # The Anthropic SDK is slow to import, so it loads with the container
+    from app.infrastructure.memo.external.claude_client import ClaudeClient
+
+    return ClaudeClient(
+        api_key=os.environ.get("ANTHROPIC_API_KEY", ""),
+        context_budget=_create_context_budget(),
+    )
+
+
+def _with_analysis_cache(client: IAIClient) -> IAIClient:
+    max_entries = int(os.environ.get("ANALYSIS_CACHE_SIZE", "10000"))
+    if max_entries <= 0:
+        return client
+    disk_path = os.environ.get("ANALYSIS_CACHE_PATH", "")
+    return CachedAIClient(
+        client,
+        max_entries=max_entries,
+        disk_path=Path(disk_path) if disk_path else None,
+    )
 
 
 class Container:
-    """DI container that wires concrete implementations to interfaces."""
+    """DI container that wires concrete implementations to interfaces.
+
+    Nothing is built at import time. The first use of :attr:`memo_usecase`,
+    or an explicit :meth:`warmup`, connects to the database, loads the
+    embedding model and constructs the API clients.
+    """
 
     def __init__(self) -> None:
-        api_key = os.environ.get("ANTHROPIC_API_KEY", "")
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._memo_usecase: MemoUsecase | None = None
+        self._embedding_client: IEmbeddingClient | None = None
+        self._embedding_cache: CachedEmbeddingClient | None = None
+        self._resumed = False
+
+    @property
+    def memo_usecase(self) -> MemoUsecase:
+        if self._memo_usecase is None:
+            with self._lock:
+                if self._memo_usecase is None:
+                    self._memo_usecase = self._build()
+        return self._memo_usecase
+
+    @property
+    def embedding_cache(self) -> CachedEmbeddingClient | None:
+        self.memo_usecase  # noqa: B018
+        return self._embedding_cache
+
+    @property
+    def is_ready(self) -> bool:
+        """Whether :meth:`warmup` has completed."""
+        return self._ready.is_set()
+
+    def warmup(self) -> bool:
+        """Build every dependency and run one embedding to load the model.
+
+        Returns whether the container is ready. Failures are logged and
+        leave it not ready; :meth:`warmup_with_retry` keeps trying. Once
+        ready, memos a previous process left awaiting enrichment are queued
+        again; that may wait for queue slots, so call this off the event
+        loop.
+        """
+        started = time.perf_counter()
+        try:
+            usecase = self.memo_usecase
+            if self._embedding_client is not None:
+                self._embedding_client.embed("warmup")
+        except Exception:
+            logger.exception("Container warmup failed")
+            return False
+        self._ready.set()
+        logger.info("Container ready in %.2fs", time.perf_counter() - started)
+        self._resume_enrichment(usecase)
+        return True
+
+    def warmup_with_retry(
+        self,
+        stop: threading.Event,
+        initial_delay: float = _WARMUP_INITIAL_DELAY_SECONDS,
+        max_delay: float = _WARMUP_MAX_DELAY_SECONDS,
+    ) -> None:
+        """Run :meth:`warmup` until it succeeds or ``stop`` is set.
+
+        The readiness probe keeps traffic away until then, so nothing else
+        would retry a build that failed at boot (e.g. the database was not
+        up yet). The delay doubles after each failure, up to ``max_delay``.
+        """
+        delay = initial_delay
+        while not self.warmup():
+            logger.warning("Retrying container warmup in %.1fs", delay)
+            if stop.wait(delay):
+                return
+            delay = min(delay * 2, max_delay)
+
+    def _resume_enrichment(self, usecase: MemoUsecase) -> None:
+        """Requeue memos left pending by a previous process, once."""
+        with self._lock:
+            if self._resumed:
+                return
+            self._resumed = True
+        try:
+            usecase.resume_pending_enrichment()
+        except Exception:
+            logger.exception("Resuming pending enrichment failed")
+
+    def _build(self) -> MemoUsecase:
         database_url = os.environ.get("DATABASE_URL", "")
 
-        self._repository: IMemoRepository
+        repository: IMemoRepository
+        edge_cache: SimilarityEdgeCache | None = None
         if database_url:
-            session_factory = create_session_factory(database_url)
-            self._repository = PostgresMemoRepository(session_factory)
+            # Postgres serves top-k reads from its memo_edges table; an
+            # in-process cache would miss other replicas' content changes
+            index_config = VectorIndexConfig.from_env()
+            session_factory = create_session_factory(database_url, index_config)
+            repository = _create_postgres_repository(session_factory, index_config)
         else:
-            self._repository = InMemoryMemoRepository()
+            repository = _create_in_memory_repository()
+            edge_cache = _create_edge_cache()
 
-        self._ai_client = ClaudeClient(api_key=api_key)
         self._embedding_client = _create_embedding_client()
-        self._memo_usecase = MemoUsecase(
-            repository=self._repository,
-            ai_client=self._ai_client,
-            embedding_client=self._embedding_client,
+        embedding_client, self._embedding_cache = _with_embedding_cache(
+            self._embedding_client
+        )
+        return MemoUsecase(
+            repository=repository,
+            ai_client=_with_analysis_cache(_create_ai_client()),
+            embedding_client=embedding_client,
+            edge_cache=edge_cache,
+            enrichment_pool=_create_enrichment_pool(),
+            search_cache=_create_search_cache(),
         )
-
-    @property
-    def memo_usecase(self) -> MemoUsecase:
-        return self._memo_usecase
 
 
 container = Container()
@@ -1,9 +1,18 @@
 from datetime import datetime
+from enum import StrEnum
 from uuid import UUID, uuid4
 
 from pydantic import BaseModel, Field
 
 
+class EnrichmentStatus(StrEnum):
+    """Progress of AI summary, tags and embedding generation for a memo."""
+
+    PENDING = "pending"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
 class Memo(BaseModel):
     """Memo entity representing a user's note with AI-generated metadata."""
 
@@ -13,3 +22,4 @@ class Memo(BaseModel):
     tags: list[str] = Field(default_factory=list)
     embedding: list[float] | None = None
     created_at: datetime = Field(default_factory=datetime.now)
+    enrichment_status: EnrichmentStatus = EnrichmentStatus.COMPLETED
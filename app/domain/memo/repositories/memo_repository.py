@@ -1,7 +1,71 @@
+import base64
+import binascii
 from abc import ABC, abstractmethod
+from datetime import datetime
 from uuid import UUID
 
-from app.domain.memo.entities.memo import Memo
+import numpy as np
+from pydantic import BaseModel
+
+from app.domain.memo.entities.memo import EnrichmentStatus, Memo
+from app.domain.memo.services.similarity import FloatMatrix, normalize_rows
+
+
+class SimilarityEdge(BaseModel):
+    """Value object for a precomputed similarity link between two memos."""
+
+    source_id: UUID
+    target_id: UUID
+    similarity: float
+
+
+class MemoCursor(BaseModel):
+    """Position after the last memo of a page, newest-first.
+
+    Pages are ordered by ``(created_at, id)`` descending, so the key is
+    unique even when memos share a timestamp.
+    """
+
+    created_at: datetime
+    id: UUID
+
+    def encode(self) -> str:
+        """Opaque URL-safe token for API clients."""
+        raw = f"{self.created_at.isoformat()}|{self.id}".encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    @classmethod
+    def decode(cls, token: str) -> "MemoCursor":
+        """Parse a token from :meth:`encode`; raises ValueError if malformed."""
+        try:
+            raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+            created_at, memo_id = raw.decode().split("|")
+            return cls(created_at=datetime.fromisoformat(created_at), id=UUID(memo_id))
+        except (binascii.Error, UnicodeDecodeError, ValueError) as exc:
+            msg = f"Invalid cursor: {token!r}"
+            raise ValueError(msg) from exc
+
+    @classmethod
+    def of(cls, memo: Memo) -> "MemoCursor":
+        return cls(created_at=memo.created_at, id=memo.id)
+
+
+class MemoPage(BaseModel):
+    """One page of memos; ``next_cursor`` is None on the last page."""
+
+    memos: list[Memo]
+    next_cursor: MemoCursor | None = None
+
+    @classmethod
+    def from_lookahead(cls, memos: list[Memo], limit: int) -> "MemoPage":
+        """Build a page from up to ``limit + 1`` memos read in page order.
+
+        Reading one row past the page tells whether another page follows
+        without a separate count.
+        """
+        if len(memos) <= limit:
+            return cls(memos=memos)
+        return cls(memos=memos[:limit], next_cursor=MemoCursor.of(memos[limit - 1]))
 
 
 class IMemoRepository(ABC):
@@ -10,16 +74,133 @@ class IMemoRepository(ABC):
     @abstractmethod
     def save(self, memo: Memo) -> None: ...
 
+    def save_many(self, memos: list[Memo]) -> None:
+        """Save several memos; implementations may write them in one batch."""
+        for memo in memos:
+            self.save(memo)
+
     @abstractmethod
     def get_all(self) -> list[Memo]: ...
 
+    def get_all_metadata(self) -> list[Memo]:
+        """Every memo without its embedding, in :meth:`get_all` order.
+
+        For reads that never look at vectors. Implementations should skip
+        loading embeddings altogether; fetch them separately with
+        :meth:`get_embedding_matrix` when they are needed.
+        """
+        return [m.model_copy(update={"embedding": None}) for m in self.get_all()]
+
+    def get_page(self, limit: int, after: MemoCursor | None = None) -> MemoPage:
+        """Return up to ``limit`` memos newest-first, starting after ``after``.
+
+        Memos come back without their embedding. Implementations should seek
+        on ``(created_at, id)`` so that the cost depends on ``limit`` rather
+        than on the number of memos; this fallback sorts every memo.
+        """
+        memos = sorted(
+            self.get_all_metadata(), key=lambda m: (m.created_at, m.id), reverse=True
+        )
+        if after is not None:
+            memos = [
+                m for m in memos if (m.created_at, m.id) < (after.created_at, after.id)
+            ]
+        return MemoPage.from_lookahead(memos[: limit + 1], limit)
+
+    def save_if_pending(self, memo: Memo) -> bool:
+        """Save ``memo`` only if the stored memo is pending with the same content.
+
+        Enrichment writes back a result computed from content read earlier;
+        this keeps it from overwriting an edit, a delete or another job's
+        result that landed meanwhile. Returns whether ``memo`` was saved.
+        Implementations must check and write atomically; this fallback
+        does not.
+        """
+        current = self.get_by_id(memo.id)
+        if (
+            current is None
+            or current.enrichment_status is not EnrichmentStatus.PENDING
+            or current.content != memo.content
+        ):
+            return False
+        self.save(memo)
+        return True
+
+    def get_pending_ids(self) -> list[UUID]:
+        """IDs of memos still awaiting enrichment, oldest first."""
+        pending = [
+            m
+            for m in self.get_all_metadata()
+            if m.enrichment_status is EnrichmentStatus.PENDING
+        ]
+        return [m.id for m in sorted(pending, key=lambda m: m.created_at)]
+
+    def version(self) -> int | None:
+        """Dataset version, or None when the repository does not track one.
+
+        The version only ever grows and moves with every save and delete,
+        so two reads that see the same version saw the same memos. Callers
+        key caches and HTTP validators on it.
+        """
+        return None
+
     @abstractmethod
     def get_by_id(self, memo_id: UUID) -> Memo | None: ...
 
     @abstractmethod
     def delete(self, memo_id: UUID) -> bool: ...
 
+    def delete_many(self, memo_ids: list[UUID]) -> int:
+        """Delete several memos; implementations may remove them in one batch.
+
+        Returns how many existed.
+        """
+        return sum(self.delete(memo_id) for memo_id in memo_ids)
+
     @abstractmethod
     def search_by_vector(
         self, query_embedding: list[float], limit: int = 5
     ) -> list[Memo]: ...
+
+    def get_embedding_matrix(
+        self, normalized: bool = True
+    ) -> tuple[list[UUID], FloatMatrix]:
+        """Return IDs and unit-normalised embeddings of memos that have one.
+
+        Row ``i`` of the matrix belongs to the ``i``-th ID. With
+        ``normalized=False`` the rows are the embeddings as stored.
+        Implementations that keep embeddings in matrix form should override
+        this to avoid materialising every memo.
+        """
+        memos = [m for m in self.get_all() if m.embedding is not None]
+        vectors = [m.embedding for m in memos if m.embedding is not None]
+        if normalized:
+            matrix = normalize_rows(vectors)
+        elif vectors:
+            matrix = np.array(vectors, dtype=np.float32)
+        else:
+            matrix = np.zeros((0, 0), dtype=np.float32)
+        return [m.id for m in memos], matrix
+
+    def get_embedded_ids(self) -> list[UUID]:
+        """IDs of memos that have an embedding, in :meth:`get_all` order.
+
+        Lets callers check what changed before paying for
+        :meth:`get_embedding_matrix`. Implementations should answer without
+        reading the vectors.
+        """
+        return self.get_embedding_matrix()[0]
+
+    def get_similarity_graph(
+        self, threshold: float, k: int | None = None
+    ) -> tuple[list[Memo], list[SimilarityEdge]] | None:
+        """Return embedded memos and their stored edges at or above ``threshold``.
+
+        The edges must contain each memo's ``k`` most similar neighbours, or
+        every pair when ``k`` is None. Memos come back newest first and
+        without their embedding. Returns None when the repository keeps no
+        precomputed edges, when they cannot answer for ``k``, or when
+        ``threshold`` is below the similarity they were stored at; callers
+        then compute edges from :meth:`get_embedding_matrix` instead.
+        """
+        return None
@@ -1,4 +1,6 @@
+import asyncio
 from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator
 
 from pydantic import BaseModel, Field
 
@@ -20,10 +22,47 @@ class SearchResult(BaseModel):
 
 
 class IAIClient(ABC):
-    """Interface for AI analysis operations."""
+    """Interface for AI analysis operations.
+
+    The ``*_async`` variants default to running the blocking call in a worker
+    thread; clients with a native async SDK should override them.
+
+    Search methods receive the retrieved memos most relevant first and, when
+    retrieval scored them, each memo's similarity to the query in
+    ``scores``; clients may leave weak matches out of the prompt.
+    """
+
+    def prompt_version(self) -> str:
+        """Identifies the model and prompt behind :meth:`analyze_memo`.
+
+        Cached analyses are keyed on it, so it must change whenever the same
+        content could be analysed differently.
+        """
+        return type(self).__name__
 
     @abstractmethod
     def analyze_memo(self, content: str) -> MemoAnalysisResult: ...
 
     @abstractmethod
-    def search_memos(self, query: str, memos: list[Memo]) -> SearchResult: ...
+    def search_memos(
+        self, query: str, memos: list[Memo], scores: list[float] | None = None
+    ) -> SearchResult: ...
+
+    async def analyze_memo_async(self, content: str) -> MemoAnalysisResult:
+        return await asyncio.to_thread(self.analyze_memo, content)
+
+    async def search_memos_async(
+        self, query: str, memos: list[Memo], scores: list[float] | None = None
+    ) -> SearchResult:
+        return await asyncio.to_thread(self.search_memos, query, memos, scores)
+
+    async def stream_search_answer(
+        self, query: str, memos: list[Memo], scores: list[float] | None = None
+    ) -> AsyncIterator[str]:
+        """Yield the answer to ``query`` as it is generated.
+
+        The default waits for :meth:`search_memos_async` and yields the whole
+        answer at once; clients whose API can stream should override it.
+        """
+        result = await self.search_memos_async(query, memos, scores)
+        yield result.answer
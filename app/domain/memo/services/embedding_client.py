@@ -1,3 +1,4 @@
+import asyncio
 from abc import ABC, abstractmethod
 
 
@@ -13,3 +14,19 @@ class IEmbeddingClient(ABC):
     def dimension(self) -> int:
         """Return the dimensionality of vectors produced by this client."""
         ...
+
+    def model_id(self) -> str:
+        """Identify the model, so cached vectors are never mixed across models."""
+        return type(self).__name__
+
+    async def embed_async(self, text: str) -> list[float]:
+        """Async :meth:`embed`; defaults to running it in a worker thread."""
+        return await asyncio.to_thread(self.embed, text)
+
+    def embed_batch(self, texts: list[str]) -> list[list[float]]:
+        """Embed several texts; override when the backend batches natively."""
+        return [self.embed(text) for text in texts]
+
+    async def embed_batch_async(self, texts: list[str]) -> list[list[float]]:
+        """Async :meth:`embed_batch`; defaults to a worker thread."""
+        return await asyncio.to_thread(self.embed_batch, texts)
@@ -0,0 +1,247 @@
+"""Degree-capped k-nearest-neighbour graph construction over unit vectors.
+
+Both builders return undirected edges as parallel ``(rows, cols, sims)``
+arrays with ``rows < cols``, in row-major order. Each node contributes at
+most ``k`` of its most similar neighbours above the threshold, so the edge
+count is bounded by ``n * k`` instead of growing quadratically.
+"""
+
+import math
+
+import numpy as np
+from numpy.typing import NDArray
+
+from app.domain.memo.services.similarity import FloatMatrix
+
+IndexArray = NDArray[np.intp]
+EdgeArrays = tuple[IndexArray, IndexArray, FloatMatrix]
+
+_BLOCK_ROWS = 1024
+_DEFAULT_TABLES = 8
+_TARGET_BUCKET_SIZE = 64
+_MAX_BUCKET_SIZE = 256
+_DEFAULT_REFINE_ROUNDS = 2
+_REFINE_BLOCK_ROWS = 256
+
+
+def _empty_edges() -> EdgeArrays:
+    empty_idx = np.empty(0, dtype=np.intp)
+    return empty_idx, empty_idx, np.empty(0, dtype=np.float32)
+
+
+def _block_top_k(
+    sims: FloatMatrix,
+    row_ids: IndexArray,
+    col_ids: IndexArray,
+    threshold: float,
+    k: int,
+) -> EdgeArrays:
+    """Take the top-k columns of each row of a similarity block.
+
+    ``sims[r, c]`` is the similarity between ``row_ids[r]`` and
+    ``col_ids[c]``. Self-pairs and pairs below ``threshold`` are dropped.
+    """
+    sims = np.where(row_ids[:, None] == col_ids[None, :], -np.inf, sims)
+    width = sims.shape[1]
+    if k < width:
+        picked = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+    else:
+        picked = np.broadcast_to(np.arange(width), sims.shape)
+    picked_sims = np.take_along_axis(sims, picked, axis=1)
+    keep = picked_sims >= threshold
+    local_rows = np.nonzero(keep)[0]
+    return (
+        row_ids[local_rows],
+        col_ids[picked[keep]],
+        picked_sims[keep].astype(np.float32),
+    )
+
+
+def _merge_directed(parts: list[EdgeArrays], count: int, k: int) -> EdgeArrays:
+    """Merge directed candidates and keep the k best per source node.
+
+    The result is sorted by source node, best candidate first.
+    """
+    if not parts:
+        return _empty_edges()
+    rows = np.concatenate([p[0] for p in parts])
+    cols = np.concatenate([p[1] for p in parts])
+    sims = np.concatenate([p[2] for p in parts])
+    if rows.size == 0:
+        return _empty_edges()
+
+    # Drop duplicate candidates found by several hash tables or rounds
+    _, first = np.unique(rows * count + cols, return_index=True)
+    rows, cols, sims = rows[first], cols[first], sims[first]
+
+    order = np.lexsort((-sims, rows))
+    rows, cols, sims = rows[order], cols[order], sims[order]
+    keep = _rank_within_source(rows) < k
+    return rows[keep], cols[keep], sims[keep]
+
+
+def _rank_within_source(rows: IndexArray) -> IndexArray:
+    """Position of each entry inside its run of equal, sorted ``rows``."""
+    ranks: IndexArray = np.arange(rows.size) - np.searchsorted(rows, rows)
+    return ranks
+
+
+def _undirect(directed: EdgeArrays, count: int) -> EdgeArrays:
+    """Collapse directed k-NN lists into undirected ``rows < cols`` edges.
+
+    A pair kept by either endpoint becomes a single edge.
+    """
+    rows, cols, sims = directed
+    low = np.minimum(rows, cols)
+    high = np.maximum(rows, cols)
+    _, first = np.unique(low * count + high, return_index=True)
+    return low[first], high[first], sims[first]
+
+
+def _refine(
+    matrix: FloatMatrix,
+    directed: EdgeArrays,
+    threshold: float,
+    k: int,
+    visit_order: IndexArray,
+    block_rows: int,
+) -> EdgeArrays:
+    """Run one NN-descent round: compare every node to its neighbours' lists.
+
+    Nodes are visited in ``visit_order`` (hash order), so each block holds
+    nearby nodes whose neighbour lists overlap heavily.
+    """
+    count = matrix.shape[0]
+    rows, cols, _ = directed
+    neighbours = np.full((count, k), -1, dtype=np.intp)
+    neighbours[rows, _rank_within_source(rows)] = cols
+
+    parts = [directed]
+    for start in range(0, count, block_rows):
+        node_ids = visit_order[start : start + block_rows]
+        first_hop = neighbours[node_ids]
+        candidates = np.sort(
+            np.where(first_hop[:, :, None] >= 0, neighbours[first_hop], -1).reshape(
+                node_ids.size, k * k
+            ),
+            axis=1,
+        )
+        # Several neighbours often share a neighbour; score each one once
+        repeated = np.zeros_like(candidates, dtype=bool)
+        repeated[:, 1:] = candidates[:, 1:] == candidates[:, :-1]
+        valid = (candidates >= 0) & ~repeated
+        if not valid.any():
+            continue
+        safe = np.where(valid, candidates, 0)
+        # One GEMM against the block's distinct candidates beats gathering a
+        # k^2 x d slab per node
+        distinct, position = np.unique(safe, return_inverse=True)
+        block = matrix[node_ids] @ matrix[distinct].T
+        sims = np.take_along_axis(block, position.reshape(safe.shape), axis=1)
+        sims = np.where(valid & (safe != node_ids[:, None]), sims, -np.inf)
+        picked = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+        picked_sims = np.take_along_axis(sims, picked, axis=1)
+        keep = picked_sims >= threshold
+        local_rows = np.nonzero(keep)[0]
+        parts.append(
+            (
+                node_ids[local_rows],
+                np.take_along_axis(safe, picked, axis=1)[keep],
+                picked_sims[keep].astype(np.float32),
+            )
+        )
+    return _merge_directed(parts, count, k)
+
+
+def exact_knn_edges(
+    matrix: FloatMatrix,
+    threshold: float,
+    k: int,
+    block_rows: int = _BLOCK_ROWS,
+) -> EdgeArrays:
+    """Build the exact degree-capped k-NN graph by brute force.
+
+    Cost is O(n^2 * d) but runs as blocked matrix products, and memory stays
+    at ``block_rows x n``.
+    """
+    count = matrix.shape[0]
+    if count < 2 or k <= 0:
+        return _empty_edges()
+    all_ids = np.arange(count)
+    parts = [
+        _block_top_k(
+            matrix[start : start + block_rows] @ matrix.T,
+            all_ids[start : start + block_rows],
+            all_ids,
+            threshold,
+            k,
+        )
+        for start in range(0, count, block_rows)
+    ]
+    return _undirect(_merge_directed(parts, count, k), count)
+
+
+def _bucket_bits(count: int) -> int:
+    return max(1, math.ceil(math.log2(max(count / _TARGET_BUCKET_SIZE, 1.0))))
+
+
+def approximate_knn_edges(
+    matrix: FloatMatrix,
+    threshold: float,
+    k: int,
+    num_tables: int = _DEFAULT_TABLES,
+    num_bits: int | None = None,
+    max_bucket_size: int = _MAX_BUCKET_SIZE,
+    refine_rounds: int = _DEFAULT_REFINE_ROUNDS,
+    seed: int = 0,
+) -> EdgeArrays:
+    """Build an approximate degree-capped k-NN graph with random-projection LSH.
+
+    Each of ``num_tables`` hash tables signs the vectors against ``num_bits``
+    random hyperplanes; only vectors sharing a bucket are compared. Buckets
+    larger than ``max_bucket_size`` are split in hash order, so the total
+    cost is O(num_tables * n * max_bucket_size * d) rather than O(n^2 * d).
+    ``refine_rounds`` NN-descent passes then compare each node with its
+    neighbours' neighbours, which recovers most pairs the hashes missed for
+    another O(n * k^2 * d).
+    """
+    count, dim = matrix.shape
+    if count < 2 or k <= 0:
+        return _empty_edges()
+    bits = num_bits if num_bits is not None else _bucket_bits(count)
+    rng = np.random.default_rng(seed)
+    weights = np.left_shift(np.int64(1), np.arange(bits, dtype=np.int64))
+
+    parts: list[EdgeArrays] = []
+    order = np.arange(count)
+    for _ in range(num_tables):
+        planes = rng.standard_normal((dim, bits)).astype(np.float32)
+        codes = ((matrix @ planes) > 0).astype(np.int64) @ weights
+        order = np.argsort(codes, kind="stable")
+        boundaries = np.flatnonzero(np.diff(codes[order])) + 1
+        for bucket in np.split(order, boundaries):
+            for start in range(0, bucket.size, max_bucket_size):
+                members = bucket[start : start + max_bucket_size]
+                if members.size < 2:
+                    continue
+                block = matrix[members]
+                parts.append(
+                    _block_top_k(block @ block.T, members, members, threshold, k)
+                )
+    directed = _merge_directed(parts, count, k)
+    for _ in range(refine_rounds):
+        directed = _refine(matrix, directed, threshold, k, order, _REFINE_BLOCK_ROWS)
+    return _undirect(directed, count)
+
+
+def edge_recall(approximate: EdgeArrays, exact: EdgeArrays, count: int) -> float:
+    """Fraction of exact edges that the approximate graph also contains.
+
+    Returns 1.0 when the exact graph has no edges.
+    """
+    exact_keys = exact[0] * count + exact[1]
+    if exact_keys.size == 0:
+        return 1.0
+    approximate_keys = approximate[0] * count + approximate[1]
+    found = np.isin(exact_keys, approximate_keys, assume_unique=True)
+    return float(found.mean())
@@ -1,4 +1,12 @@
 import math
+from collections.abc import Sequence
+
+import numpy as np
+from numpy.typing import NDArray
+
+FloatMatrix = NDArray[np.float32]
+
+_PAIR_BLOCK_ROWS = 1024
 
 
 def cosine_similarity(a: list[float], b: list[float]) -> float:
@@ -12,3 +20,76 @@ def cosine_similarity(a: list[float], b: list[float]) -> float:
     if norm_a == 0 or norm_b == 0:
         return 0.0
     return dot / (norm_a * norm_b)
+
+
+def normalize_rows(
+    vectors: Sequence[Sequence[float]] | NDArray[np.floating],
+) -> FloatMatrix:
+    """Stack vectors into a float32 matrix whose rows have unit L2 norm.
+
+    Zero-magnitude rows are left as zeros so that they score 0.0 against
+    everything, matching ``cosine_similarity``.
+    """
+    matrix = np.array(vectors, dtype=np.float32, ndmin=2)
+    if matrix.size == 0:
+        return matrix.reshape(0, matrix.shape[1] if matrix.ndim == 2 else 0)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+    return matrix
+
+
+def pairwise_similarity(matrix: FloatMatrix) -> FloatMatrix:
+    """Return the full ``n x n`` cosine similarity matrix of unit rows."""
+    return matrix @ matrix.T
+
+
+def query_similarity(query: Sequence[float], matrix: FloatMatrix) -> FloatMatrix:
+    """Score one query vector against every unit row of ``matrix``."""
+    if matrix.shape[0] == 0:
+        return np.empty(0, dtype=np.float32)
+    scores: FloatMatrix = matrix @ normalize_rows([query])[0]
+    return scores
+
+
+def threshold_pairs(
+    matrix: FloatMatrix,
+    threshold: float,
+    block_rows: int = _PAIR_BLOCK_ROWS,
+) -> tuple[NDArray[np.intp], NDArray[np.intp], FloatMatrix]:
+    """Find every pair ``i < j`` of unit rows with similarity >= ``threshold``.
+
+    Rows are processed in blocks so peak memory stays at
+    ``block_rows x n`` instead of ``n x n``. Pairs are returned in row-major
+    order as parallel ``(rows, cols, similarities)`` arrays.
+    """
+    count = matrix.shape[0]
+    rows: list[NDArray[np.intp]] = []
+    cols: list[NDArray[np.intp]] = []
+    sims: list[FloatMatrix] = []
+    for start in range(0, count, block_rows):
+        stop = min(start + block_rows, count)
+        block = matrix[start:stop] @ matrix.T
+        # Keep only the strict upper triangle so each pair is reported once
+        upper = np.arange(count) > np.arange(start, stop)[:, None]
+        block_rows_idx, block_cols_idx = np.nonzero(upper & (block >= threshold))
+        rows.append(block_rows_idx + start)
+        cols.append(block_cols_idx)
+        sims.append(block[block_rows_idx, block_cols_idx])
+
+    if not rows:
+        empty_idx = np.empty(0, dtype=np.intp)
+        return empty_idx, empty_idx, np.empty(0, dtype=np.float32)
+    return np.concatenate(rows), np.concatenate(cols), np.concatenate(sims)
+
+
+def top_k(scores: FloatMatrix, k: int) -> NDArray[np.intp]:
+    """Return indices of the ``k`` highest scores, best first.
+
+    Uses a partial partition so the cost is O(n + k log k) rather than a full
+    sort of every score.
+    """
+    count = scores.shape[0]
+    if k <= 0 or count == 0:
+        return np.empty(0, dtype=np.intp)
+    candidates = np.argpartition(-scores, k - 1)[:k] if k < count else np.arange(count)
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
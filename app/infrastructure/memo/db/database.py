@@ -1,17 +1,84 @@
 from sqlalchemy import create_engine, text
 from sqlalchemy.orm import DeclarativeBase, Session, sessionmaker
 
+from app.infrastructure.memo.db.vector_index import (
+    VectorIndexConfig,
+    ensure_vector_index,
+    ensure_vector_index_in_background,
+    existing_index_definition,
+)
+
+# Tables whose layout changed in a way ALTER cannot carry over are dropped
+# before create_all recreates them; memo_edges without owner_id is
+# rebuilt by rebuild_edges once its state row is gone
+_SCHEMA_RESETS = (
+    """
+    DO $$
+    BEGIN
+        IF to_regclass('memo_edges') IS NOT NULL AND NOT EXISTS (
+            SELECT 1 FROM information_schema.columns
+            WHERE table_name = 'memo_edges' AND column_name = 'owner_id'
+        ) THEN
+            DROP TABLE memo_edges;
+            DROP TABLE IF EXISTS memo_edge_state;
+        END IF;
+    END
+    $$
+    """,
+)
+
+# create_all only creates missing tables; columns and indexes added to
+# existing tables after their first release are applied here
+_SCHEMA_UPGRADES = (
+    "ALTER TABLE memos ADD COLUMN IF NOT EXISTS enrichment_status "
+    "VARCHAR(16) NOT NULL DEFAULT 'completed'",
+)
+# Built CONCURRENTLY, which cannot run in a transaction, so that a
+# populated memos table keeps taking writes while they build
+_INDEX_UPGRADES = (
+    ("ix_memos_created_at_id", "ON memos (created_at, id)"),
+    ("ix_memos_pending", "ON memos (created_at) WHERE enrichment_status = 'pending'"),
+)
+
 
 class Base(DeclarativeBase):
     pass
 
 
-def create_session_factory(database_url: str) -> sessionmaker[Session]:
+def create_session_factory(
+    database_url: str,
+    index_config: VectorIndexConfig | None = None,
+    wait_for_index: bool = False,
+) -> sessionmaker[Session]:
+    """Create the schema and return a session factory for ``database_url``.
+
+    A missing ANN index is built in the background unless
+    ``wait_for_index`` is set, e.g. for one-off commands that exit soon
+    after and want the index while they run.
+    """
     engine = create_engine(database_url)
 
     with engine.connect() as conn:
         conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
+        for statement in _SCHEMA_RESETS:
+            conn.execute(text(statement))
         conn.commit()
 
     Base.metadata.create_all(bind=engine)
+    with engine.connect() as conn:
+        for statement in _SCHEMA_UPGRADES:
+            conn.execute(text(statement))
+        conn.commit()
+    autocommit = engine.execution_options(isolation_level="AUTOCOMMIT")
+    with autocommit.connect() as conn:
+        for name, definition in _INDEX_UPGRADES:
+            if existing_index_definition(conn, name) is None:
+                conn.execute(
+                    text(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} {definition}")
+                )
+    config = index_config or VectorIndexConfig.from_env()
+    if wait_for_index:
+        ensure_vector_index(engine, config)
+    else:
+        ensure_vector_index_in_background(engine, config)
     return sessionmaker(bind=engine)
@@ -0,0 +1,129 @@
+"""Contiguous float32 storage for memo embeddings."""
+
+from collections.abc import Sequence
+from uuid import UUID
+
+import numpy as np
+
+from app.domain.memo.services.similarity import FloatMatrix, normalize_rows, top_k
+
+_INITIAL_CAPACITY = 64
+
+
+class EmbeddingMatrix:
+    """Growable matrix of L2-normalised float32 rows keyed by memo ID.
+
+    Rows ``[0, len)`` are always dense, so similarity scans are a single
+    matrix product over :attr:`matrix`. Deleting swaps the last row into the
+    freed slot, making removal O(1). Each row's original norm is kept so the
+    caller's vector can be reconstructed (to float32 precision).
+    """
+
+    def __init__(self) -> None:
+        self._rows: FloatMatrix = np.zeros((0, 0), dtype=np.float32)
+        self._norms: FloatMatrix = np.zeros(0, dtype=np.float32)
+        self._ids: list[UUID] = []
+        self._row_of: dict[UUID, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, memo_id: object) -> bool:
+        return memo_id in self._row_of
+
+    @property
+    def dimension(self) -> int:
+        return int(self._rows.shape[1])
+
+    @property
+    def ids(self) -> list[UUID]:
+        """Memo IDs aligned with the rows of :attr:`matrix`."""
+        return list(self._ids)
+
+    @property
+    def matrix(self) -> FloatMatrix:
+        """Read-only view of the live, unit-normalised rows."""
+        view = self._rows[: len(self._ids)]
+        view.flags.writeable = False
+        return view
+
+    def raw_matrix(self) -> FloatMatrix:
+        """New array of the vectors as stored, row-aligned with :attr:`ids`."""
+        count = len(self._ids)
+        raw: FloatMatrix = self._rows[:count] * self._norms[:count, np.newaxis]
+        return raw
+
+    def upsert(self, memo_id: UUID, vector: Sequence[float]) -> None:
+        raw = np.asarray(vector, dtype=np.float32)
+        if len(self._ids) == 0 and self._rows.shape[1] != raw.shape[0]:
+            self._rows = np.zeros((_INITIAL_CAPACITY, raw.shape[0]), dtype=np.float32)
+            self._norms = np.zeros(_INITIAL_CAPACITY, dtype=np.float32)
+        if raw.shape[0] != self.dimension:
+            msg = (
+                f"Vector dimension {raw.shape[0]} does not match "
+                f"matrix dimension {self.dimension}"
+            )
+            raise ValueError(msg)
+
+        row = self._row_of.get(memo_id)
+        if row is None:
+            row = len(self._ids)
+            if row == self._rows.shape[0]:
+                self._grow()
+            self._ids.append(memo_id)
+            self._row_of[memo_id] = row
+        norm = np.linalg.norm(raw)
+        self._rows[row] = raw / norm if norm > 0 else raw
+        self._norms[row] = norm
+
+    def remove(self, memo_id: UUID) -> bool:
+        row = self._row_of.pop(memo_id, None)
+        if row is None:
+            return False
+        last = len(self._ids) - 1
+        if row != last:
+            moved = self._ids[last]
+            self._rows[row] = self._rows[last]
+            self._norms[row] = self._norms[last]
+            self._ids[row] = moved
+            self._row_of[moved] = row
+        self._ids.pop()
+        return True
+
+    def get(self, memo_id: UUID) -> list[float] | None:
+        """Reconstruct the vector originally stored for ``memo_id``."""
+        row = self._row_of.get(memo_id)
+        if row is None:
+            return None
+        vector: list[float] = (self._rows[row] * self._norms[row]).tolist()
+        return vector
+
+    def search(self, query: Sequence[float], k: int) -> list[tuple[UUID, float]]:
+        """Exact top-k by cosine similarity with one matrix-vector product."""
+        if not self._ids:
+            return []
+        scores = self.matrix @ normalize_rows([query])[0]
+        return [(self._ids[i], float(scores[i])) for i in top_k(scores, k).tolist()]
+
+    def rerank(
+        self, query: Sequence[float], candidates: Sequence[UUID], k: int
+    ) -> list[tuple[UUID, float]]:
+        """Exact top-k of ``candidates`` by cosine similarity.
+
+        Used to re-score a shortlist produced from lower-precision vectors.
+        IDs not in the matrix are dropped.
+        """
+        ids = [memo_id for memo_id in candidates if memo_id in self._row_of]
+        if not ids:
+            return []
+        rows = self._rows[[self._row_of[memo_id] for memo_id in ids]]
+        scores = rows @ normalize_rows([query])[0]
+        return [(ids[i], float(scores[i])) for i in top_k(scores, k).tolist()]
+
+    def _grow(self) -> None:
+        capacity = self._rows.shape[0] * 2
+        rows = np.zeros((capacity, self.dimension), dtype=np.float32)
+        rows[: self._rows.shape[0]] = self._rows
+        norms = np.zeros(capacity, dtype=np.float32)
+        norms[: self._norms.shape[0]] = self._norms
+        self._rows, self._norms = rows, norms
@@ -0,0 +1,284 @@
+"""In-process HNSW index for cosine similarity search.
+
+A Hierarchical Navigable Small World graph (Malkov & Yashunin) keeps every
+vector in a stack of proximity graphs. Searches descend greedily from the
+sparse top layer and finish with a beam search of width ``ef_search`` on
+layer 0, so query cost grows roughly logarithmically with the collection
+instead of linearly.
+"""
+
+import heapq
+import math
+from collections.abc import Sequence
+from dataclasses import dataclass
+from uuid import UUID
+
+import numpy as np
+from numpy.typing import NDArray
+
+from app.domain.memo.services.similarity import normalize_rows
+from app.infrastructure.memo.db.quantization import CompactRows, VectorPrecision
+
+_INITIAL_CAPACITY = 64
+
+
+@dataclass(frozen=True)
+class HnswParams:
+    """Tuning knobs for :class:`HnswIndex`.
+
+    Attributes:
+        m: Links per node on upper layers (layer 0 keeps ``2 * m``).
+        ef_construction: Beam width used while inserting.
+        ef_search: Beam width used while querying (raised to ``k`` if smaller).
+        seed: Seed for the random layer assignment.
+        precision: Storage format of the indexed vectors; ``float16`` and
+            ``int8`` halve and quarter their memory at a small cost in
+            similarity accuracy.
+    """
+
+    m: int = 16
+    ef_construction: int = 64
+    ef_search: int = 64
+    seed: int = 0
+    precision: VectorPrecision = VectorPrecision.FLOAT32
+
+
+class HnswIndex:
+    """Incrementally maintained HNSW index keyed by memo ID.
+
+    Vectors are stored L2-normalised (at ``params.precision``), so inner
+    product equals cosine similarity; at reduced precision the returned
+    similarities are approximate. Removal marks the node as deleted but
+    keeps it as a routing hop; the graph is rebuilt once tombstones
+    outnumber live nodes.
+    """
+
+    def __init__(self, params: HnswParams | None = None) -> None:
+        self._params = params or HnswParams()
+        self._level_mult = 1.0 / math.log(max(self._params.m, 2))
+        self._rng = np.random.default_rng(self._params.seed)
+        self._reset(dimension=0)
+
+    def _reset(self, dimension: int) -> None:
+        self._dimension = dimension
+        self._vectors = CompactRows(
+            dimension, self._params.precision, capacity=_INITIAL_CAPACITY
+        )
+        self._labels: list[UUID] = []
+        self._node_of: dict[UUID, int] = {}
+        self._deleted: list[bool] = []
+        self._links: list[list[list[int]]] = []
+        self._entry: int | None = None
+        self._max_level = -1
+        self._tombstones = 0
+
+    def __len__(self) -> int:
+        return len(self._node_of)
+
+    def __contains__(self, label: object) -> bool:
+        return label in self._node_of
+
+    @property
+    def params(self) -> HnswParams:
+        return self._params
+
+    def add(self, label: UUID, vector: Sequence[float]) -> None:
+        """Insert ``vector`` under ``label``, replacing any previous vector."""
+        unit = normalize_rows([vector])[0]
+        existing = self._node_of.get(label)
+        if existing is not None:
+            if self._vectors.equals(existing, unit):
+                return
+            self.remove(label)
+
+        if self._dimension == 0:
+            self._reset(dimension=unit.shape[0])
+        if unit.shape[0] != self._dimension:
+            msg = (
+                f"Vector dimension {unit.shape[0]} does not match "
+                f"index dimension {self._dimension}"
+            )
+            raise ValueError(msg)
+        self._insert(label, unit)
+
+    def remove(self, label: UUID) -> bool:
+        """Remove ``label`` from the index. Returns False if it was absent."""
+        node = self._node_of.pop(label, None)
+        if node is None:
+            return False
+        self._deleted[node] = True
+        self._tombstones += 1
+        if self._tombstones > len(self._node_of):
+            self._rebuild()
+        return True
+
+    def search(self, query: Sequence[float], k: int) -> list[tuple[UUID, float]]:
+        """Return up to ``k`` ``(label, similarity)`` pairs, most similar first."""
+        if k <= 0 or not self._node_of:
+            return []
+        unit = normalize_rows([query])[0]
+        if unit.shape[0] != self._dimension:
+            msg = (
+                f"Query dimension {unit.shape[0]} does not match "
+                f"index dimension {self._dimension}"
+            )
+            raise ValueError(msg)
+
+        assert self._entry is not None  # noqa: S101
+        entry = self._entry
+        entry_sim = float(self._vectors.similarities([entry], unit)[0])
+        for level in range(self._max_level, 0, -1):
+            entry, entry_sim = self._greedy_closest(unit, entry, entry_sim, level)
+        ef = max(self._params.ef_search, k)
+        found = self._search_layer(unit, [(entry_sim, entry)], ef, level=0)
+        live = [(sim, node) for sim, node in found if not self._deleted[node]]
+        live.sort(reverse=True)
+        return [(self._labels[node], sim) for sim, node in live[:k]]
+
+    def _max_links(self, level: int) -> int:
+        return self._params.m * 2 if level == 0 else self._params.m
+
+    def _insert(self, label: UUID, unit: NDArray[np.float32]) -> None:
+        node = len(self._labels)
+        if node == len(self._vectors):
+            self._vectors.resize(node * 2)
+        self._vectors.set(node, unit)
+
+        level = int(-math.log(1.0 - self._rng.random()) * self._level_mult)
+        self._labels.append(label)
+        self._node_of[label] = node
+        self._deleted.append(False)
+        self._links.append([[] for _ in range(level + 1)])
+
+        if self._entry is None:
+            self._entry = node
+            self._max_level = level
+            return
+
+        entry = self._entry
+        entry_sim = float(self._vectors.similarities([entry], unit)[0])
+        for layer in range(self._max_level, level, -1):
+            entry, entry_sim = self._greedy_closest(unit, entry, entry_sim, layer)
+
+        entries = [(entry_sim, entry)]
+        for layer in range(min(level, self._max_level), -1, -1):
+            candidates = self._search_layer(
+                unit, entries, self._params.ef_construction, layer
+            )
+            neighbours = self._select_neighbours(candidates, self._params.m)
+            self._links[node][layer] = neighbours
+            for neighbour in neighbours:
+                self._link(neighbour, node, layer)
+            entries = candidates
+
+        if level > self._max_level:
+            self._entry = node
+            self._max_level = level
+
+    def _link(self, node: int, neighbour: int, level: int) -> None:
+        """Add ``node -> neighbour``, keeping only the closest links on overflow.
+
+        Pruning by plain similarity rather than the diversity heuristic keeps
+        inserts cheap; the heuristic is still applied to new nodes' own links.
+        """
+        links = self._links[node][level]
+        links.append(neighbour)
+        limit = self._max_links(level)
+        if len(links) <= limit:
+            return
+        sims = self._vectors.similarities(links, self._vectors.decode([node])[0])
+        keep = np.argpartition(-sims, limit - 1)[:limit]
+        self._links[node][level] = [links[i] for i in keep.tolist()]
+
+    def _select_neighbours(
+        self, candidates: list[tuple[float, int]], limit: int
+    ) -> list[int]:
+        """Pick diverse neighbours with the HNSW heuristic.
+
+        A candidate is kept only if it is closer to the base vector than to
+        every neighbour already kept, which preserves links across clusters.
+        Remaining slots are filled with the closest discarded candidates.
+        """
+        ordered = sorted(candidates, reverse=True)
+        nodes = [node for _, node in ordered]
+        vectors = self._vectors.decode(nodes)
+        between = (vectors @ vectors.T).tolist()
+        selected: list[int] = []
+        discarded: list[int] = []
+        for position, (sim, _) in enumerate(ordered):
+            if len(selected) >= limit:
+                break
+            row = between[position]
+            if selected and max(row[i] for i in selected) > sim:
+                discarded.append(position)
+                continue
+            selected.append(position)
+        for position in discarded:
+            if len(selected) >= limit:
+                break
+            selected.append(position)
+        return [nodes[position] for position in selected]
+
+    def _greedy_closest(
+        self,
+        unit: NDArray[np.float32],
+        entry: int,
+        entry_sim: float,
+        level: int,
+    ) -> tuple[int, float]:
+        improved = True
+        while improved:
+            improved = False
+            links = self._links[entry][level]
+            if not links:
+                break
+            sims = self._vectors.similarities(links, unit)
+            best = int(np.argmax(sims))
+            if float(sims[best]) > entry_sim:
+                entry, entry_sim = links[best], float(sims[best])
+                improved = True
+        return entry, entry_sim
+
+    def _search_layer(
+        self,
+        unit: NDArray[np.float32],
+        entries: list[tuple[float, int]],
+        ef: int,
+        level: int,
+    ) -> list[tuple[float, int]]:
+        """Beam search on one layer; returns up to ``ef`` ``(sim, node)`` pairs."""
+        visited = {node for _, node in entries}
+        # Max-heap of candidates to expand and min-heap of the current best
+        frontier = [(-sim, node) for sim, node in entries]
+        heapq.heapify(frontier)
+        best = list(entries)
+        heapq.heapify(best)
+        while best and len(best) > ef:
+            heapq.heappop(best)
+
+        while frontier:
+            neg_sim, node = heapq.heappop(frontier)
+            if len(best) >= ef and -neg_sim < best[0][0]:
+                break
+            links = [n for n in self._links[node][level] if n not in visited]
+            if not links:
+                continue
+            visited.update(links)
+            sims = self._vectors.similarities(links, unit).tolist()
+            for sim, neighbour in zip(sims, links, strict=True):
+                if len(best) < ef or sim > best[0][0]:
+                    heapq.heappush(frontier, (-sim, neighbour))
+                    heapq.heappush(best, (sim, neighbour))
+                    if len(best) > ef:
+                        heapq.heappop(best)
+        return best
+
+    def _rebuild(self) -> None:
+        """Re-insert live vectors into a fresh graph to drop tombstones."""
+        live = [
+            (label, self._vectors.decode([node])[0])
+            for label, node in self._node_of.items()
+        ]
+        self._reset(self._dimension)
+        for label, unit in live:
+            self._insert(label, unit)
@@ -0,0 +1,44 @@
+import uuid
+
+from sqlalchemy import Float, ForeignKey, Integer
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.infrastructure.memo.db.database import Base
+
+
+class MemoEdgeRow(Base):
+    """SQLAlchemy table definition for precomputed memo similarity edges.
+
+    Each undirected pair is stored with ``source_id < target_id``, once per
+    endpoint that found the other among its nearest neighbours; that
+    endpoint is ``owner_id``. Edges disappear with either memo through
+    ``ON DELETE CASCADE``.
+    """
+
+    __tablename__ = "memo_edges"
+
+    source_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("memos.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    target_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("memos.id", ondelete="CASCADE"),
+        primary_key=True,
+        index=True,
+    )
+    owner_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, index=True
+    )
+    similarity: Mapped[float] = mapped_column(Float, nullable=False)
+
+
+class MemoEdgeStateRow(Base):
+    """Single-row table recording the similarity floor ``memo_edges`` holds."""
+
+    __tablename__ = "memo_edge_state"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    floor: Mapped[float] = mapped_column(Float, nullable=False)
@@ -2,19 +2,29 @@ import uuid
 from datetime import datetime
 
 from pgvector.sqlalchemy import Vector  # type: ignore[import-untyped]
-from sqlalchemy import DateTime, String, Text
+from sqlalchemy import BigInteger, DateTime, Index, Integer, String, Text, text
 from sqlalchemy.dialects.postgresql import ARRAY, UUID
 from sqlalchemy.orm import Mapped, mapped_column
 
+from app.domain.memo.entities.memo import EnrichmentStatus
 from app.infrastructure.memo.db.database import Base
-
-_EMBEDDING_DIMENSION = 384
+from app.infrastructure.memo.db.vector_index import EMBEDDING_DIMENSION
 
 
 class MemoRow(Base):
     """SQLAlchemy table definition for memos."""
 
     __tablename__ = "memos"
+    __table_args__ = (
+        # Keyset pagination seeks on (created_at, id), scanned backwards
+        Index("ix_memos_created_at_id", "created_at", "id"),
+        # Startup finds memos left awaiting enrichment without a full scan
+        Index(
+            "ix_memos_pending",
+            "created_at",
+            postgresql_where=text("enrichment_status = 'pending'"),
+        ),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
@@ -22,7 +32,23 @@ class MemoRow(Base):
     content: Mapped[str] = mapped_column(Text, nullable=False)
     summary: Mapped[str | None] = mapped_column(Text, nullable=True)
     tags: Mapped[list[str]] = mapped_column(ARRAY(String), nullable=False, default=list)
-    embedding = mapped_column(Vector(_EMBEDDING_DIMENSION), nullable=True)
+    embedding = mapped_column(Vector(EMBEDDING_DIMENSION), nullable=True)
     created_at: Mapped[datetime] = mapped_column(
         DateTime, nullable=False, default=datetime.now
     )
+    enrichment_status: Mapped[str] = mapped_column(
+        String(16), nullable=False, server_default=EnrichmentStatus.COMPLETED
+    )
+
+
+class MemoVersionRow(Base):
+    """Single-row table holding the dataset version of ``memos``.
+
+    Bumped in the same transaction as every write, so a reader never sees
+    the new version before the rows it stands for.
+    """
+
+    __tablename__ = "memo_version"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    version: Mapped[int] = mapped_column(BigInteger, nullable=False)
@@ -0,0 +1,113 @@
+"""Reduced-precision storage for unit-normalised embedding rows.
+
+Dropping float32 to float16 halves the bytes per row and scalar-quantizing to
+int8 quarters them. For unit vectors both keep cosine similarity within about
+1e-3 (float16) and 1e-2 (int8) of the exact value, which is enough to pick
+candidates; callers that need exact scores re-rank them against the
+full-precision vectors.
+"""
+
+from collections.abc import Sequence
+from enum import StrEnum
+from typing import Any
+
+import numpy as np
+from numpy.typing import NDArray
+
+from app.domain.memo.services.similarity import FloatMatrix
+
+_INT8_MAX = 127
+
+
+class VectorPrecision(StrEnum):
+    FLOAT32 = "float32"
+    FLOAT16 = "float16"
+    INT8 = "int8"
+
+
+_DTYPES: dict[VectorPrecision, type[np.generic]] = {
+    VectorPrecision.FLOAT32: np.float32,
+    VectorPrecision.FLOAT16: np.float16,
+    VectorPrecision.INT8: np.int8,
+}
+
+
+class CompactRows:
+    """Growable array of unit vectors stored at ``precision``.
+
+    int8 rows use symmetric per-row scaling: each row's largest component
+    maps to +/-127 and the row's scale is kept as one float32, so a row
+    costs ``dimension + 4`` bytes.
+    """
+
+    def __init__(
+        self,
+        dimension: int,
+        precision: VectorPrecision = VectorPrecision.FLOAT32,
+        capacity: int = 0,
+    ) -> None:
+        self._precision = VectorPrecision(precision)
+        self._codes: NDArray[Any] = np.zeros(
+            (capacity, dimension), dtype=_DTYPES[self._precision]
+        )
+        self._scales: FloatMatrix = np.ones(capacity, dtype=np.float32)
+
+    def __len__(self) -> int:
+        return int(self._codes.shape[0])
+
+    @property
+    def precision(self) -> VectorPrecision:
+        return self._precision
+
+    @property
+    def nbytes(self) -> int:
+        if self._precision is VectorPrecision.INT8:
+            return int(self._codes.nbytes + self._scales.nbytes)
+        return int(self._codes.nbytes)
+
+    def resize(self, capacity: int) -> None:
+        """Grow or shrink to ``capacity`` rows, keeping the leading rows."""
+        kept = min(capacity, len(self))
+        codes = np.zeros((capacity, self._codes.shape[1]), dtype=self._codes.dtype)
+        codes[:kept] = self._codes[:kept]
+        scales = np.ones(capacity, dtype=np.float32)
+        scales[:kept] = self._scales[:kept]
+        self._codes, self._scales = codes, scales
+
+    def set(self, row: int, unit: NDArray[np.float32]) -> None:
+        self._codes[row], self._scales[row] = self._encode(unit)
+
+    def equals(self, row: int, unit: NDArray[np.float32]) -> bool:
+        """Whether storing ``unit`` would leave ``row`` unchanged."""
+        codes, scale = self._encode(unit)
+        return bool(
+            np.array_equal(self._codes[row], codes) and self._scales[row] == scale
+        )
+
+    def decode(self, rows: Sequence[int] | slice) -> FloatMatrix:
+        """float32 approximation of ``rows``."""
+        decoded: FloatMatrix = self._codes[rows].astype(np.float32)
+        if self._precision is VectorPrecision.INT8:
+            decoded *= self._scales[rows][:, np.newaxis]
+        return decoded
+
+    def similarities(
+        self, rows: Sequence[int] | slice, unit: NDArray[np.float32]
+    ) -> FloatMatrix:
+        """Approximate cosine similarity of ``rows`` to the unit vector."""
+        if self._precision is VectorPrecision.FLOAT32:
+            exact: FloatMatrix = self._codes[rows] @ unit
+            return exact
+        sims: FloatMatrix = self._codes[rows].astype(np.float32) @ unit
+        if self._precision is VectorPrecision.INT8:
+            sims *= self._scales[rows]
+        return sims
+
+    def _encode(self, unit: NDArray[np.float32]) -> tuple[NDArray[Any], np.float32]:
+        if self._precision is not VectorPrecision.INT8:
+            return unit.astype(self._codes.dtype), np.float32(1.0)
+        peak = float(np.abs(unit).max(initial=0.0))
+        if peak == 0:
+            return np.zeros(unit.shape, dtype=np.int8), np.float32(1.0)
+        scale = np.float32(peak / _INT8_MAX)
+        return np.rint(unit / scale).astype(np.int8), scale
@@ -1,38 +1,196 @@
+import bisect
+import threading
+import time
+from datetime import datetime
 from uuid import UUID
 
-from app.domain.memo.entities.memo import Memo
-from app.domain.memo.repositories.memo_repository import IMemoRepository
-from app.domain.memo.services.similarity import cosine_similarity
+from app.domain.memo.entities.memo import EnrichmentStatus, Memo
+from app.domain.memo.repositories.memo_repository import (
+    IMemoRepository,
+    MemoCursor,
+    MemoPage,
+)
+from app.domain.memo.services.similarity import FloatMatrix
+from app.infrastructure.memo.db.embedding_matrix import EmbeddingMatrix
+from app.infrastructure.memo.db.hnsw_index import HnswIndex, HnswParams
+from app.infrastructure.memo.db.quantization import VectorPrecision
+
+_DEFAULT_BRUTE_FORCE_THRESHOLD = 5000
+_DEFAULT_RERANK_FACTOR = 4
 
 
 class InMemoryMemoRepository(IMemoRepository):
-    """In-memory implementation of IMemoRepository using a dict."""
+    """In-memory implementation of IMemoRepository using a dict.
+
+    Memos are stored without their embedding; vectors live in a contiguous
+    float32 ``EmbeddingMatrix`` and are reattached on read. An HNSW index is
+    kept in step on every save and delete and serves vector search once the
+    store grows past ``brute_force_threshold``; below that an exact scan of
+    the matrix is cheaper.
+
+    When the index stores vectors at reduced precision, it shortlists
+    ``limit * rerank_factor`` candidates and they are re-ranked exactly
+    against the matrix; ``rerank_factor=0`` returns the index's order as is.
+
+    ``(created_at, id)`` keys are kept sorted so a page is found by binary
+    search instead of sorting every memo.
+
+    One lock guards the dict, the sort keys, the matrix and the index, so a
+    read never sees them half-updated by a write on another thread (the
+    enrichment workers write concurrently with API reads). Writes bump the
+    dataset version only once the memo is stored or removed, so a reader
+    that sees a version also sees every write it counts. The version starts
+    from the clock rather than zero, so a restarted process does not hand
+    out versions a client may still hold for different memos.
+    """
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        index_params: HnswParams | None = None,
+        brute_force_threshold: int = _DEFAULT_BRUTE_FORCE_THRESHOLD,
+        rerank_factor: int = _DEFAULT_RERANK_FACTOR,
+    ) -> None:
         self._storage: dict[UUID, Memo] = {}
+        self._order: list[tuple[datetime, UUID]] = []
+        self._embeddings = EmbeddingMatrix()
+        self._index = HnswIndex(index_params)
+        self._brute_force_threshold = brute_force_threshold
+        self._rerank_factor = rerank_factor
+        self._version = time.time_ns()
+        self._lock = threading.Lock()
 
     def save(self, memo: Memo) -> None:
-        self._storage[memo.id] = memo
+        with self._lock:
+            self._store(memo)
+            self._version += 1
+
+    def save_many(self, memos: list[Memo]) -> None:
+        with self._lock:
+            for memo in memos:
+                self._store(memo)
+            self._version += 1
+
+    def save_if_pending(self, memo: Memo) -> bool:
+        with self._lock:
+            current = self._storage.get(memo.id)
+            if (
+                current is None
+                or current.enrichment_status is not EnrichmentStatus.PENDING
+                or current.content != memo.content
+            ):
+                return False
+            self._store(memo)
+            self._version += 1
+            return True
+
+    def get_pending_ids(self) -> list[UUID]:
+        with self._lock:
+            return [
+                memo_id
+                for _, memo_id in self._order
+                if self._storage[memo_id].enrichment_status is EnrichmentStatus.PENDING
+            ]
 
     def get_all(self) -> list[Memo]:
-        return list(self._storage.values())
+        with self._lock:
+            return [self._with_embedding(m) for m in self._storage.values()]
+
+    def get_all_metadata(self) -> list[Memo]:
+        with self._lock:
+            return [m.model_copy() for m in self._storage.values()]
+
+    def get_page(self, limit: int, after: MemoCursor | None = None) -> MemoPage:
+        with self._lock:
+            end = (
+                len(self._order)
+                if after is None
+                else bisect.bisect_left(self._order, (after.created_at, after.id))
+            )
+            keys = self._order[max(end - limit - 1, 0) : end]
+            memos = [
+                self._storage[memo_id].model_copy() for _, memo_id in reversed(keys)
+            ]
+        return MemoPage.from_lookahead(memos, limit)
+
+    def version(self) -> int:
+        return self._version
 
     def get_by_id(self, memo_id: UUID) -> Memo | None:
-        return self._storage.get(memo_id)
+        with self._lock:
+            memo = self._storage.get(memo_id)
+            return self._with_embedding(memo) if memo is not None else None
 
     def delete(self, memo_id: UUID) -> bool:
-        if memo_id in self._storage:
-            del self._storage[memo_id]
-            return True
-        return False
+        return self.delete_many([memo_id]) == 1
+
+    def delete_many(self, memo_ids: list[UUID]) -> int:
+        with self._lock:
+            deleted = 0
+            for memo_id in memo_ids:
+                if memo_id not in self._storage:
+                    continue
+                self._unorder(self._storage.pop(memo_id))
+                self._embeddings.remove(memo_id)
+                self._index.remove(memo_id)
+                deleted += 1
+            if deleted:
+                self._version += 1
+            return deleted
 
     def search_by_vector(
         self, query_embedding: list[float], limit: int = 5
     ) -> list[Memo]:
-        scored = [
-            (memo, cosine_similarity(query_embedding, memo.embedding))
-            for memo in self._storage.values()
-            if memo.embedding is not None
-        ]
-        scored.sort(key=lambda x: x[1], reverse=True)
-        return [memo for memo, _ in scored[:limit]]
+        with self._lock:
+            if len(self._embeddings) <= self._brute_force_threshold:
+                hits = self._embeddings.search(query_embedding, limit)
+            elif self._reranks():
+                shortlist = self._index.search(
+                    query_embedding, limit * self._rerank_factor
+                )
+                hits = self._embeddings.rerank(
+                    query_embedding, [memo_id for memo_id, _ in shortlist], limit
+                )
+            else:
+                hits = self._index.search(query_embedding, limit)
+            return [self._with_embedding(self._storage[memo_id]) for memo_id, _ in hits]
+
+    def get_embedded_ids(self) -> list[UUID]:
+        with self._lock:
+            return self._embeddings.ids
+
+    def get_embedding_matrix(
+        self, normalized: bool = True
+    ) -> tuple[list[UUID], FloatMatrix]:
+        # The live matrix is updated in place, so hand out a copy taken
+        # together with its IDs.
+        with self._lock:
+            if normalized:
+                return self._embeddings.ids, self._embeddings.matrix.copy()
+            return self._embeddings.ids, self._embeddings.raw_matrix()
+
+    def _store(self, memo: Memo) -> None:
+        previous = self._storage.get(memo.id)
+        if previous is None or previous.created_at != memo.created_at:
+            if previous is not None:
+                self._unorder(previous)
+            bisect.insort(self._order, (memo.created_at, memo.id))
+        self._storage[memo.id] = memo.model_copy(update={"embedding": None})
+        if memo.embedding is not None:
+            self._embeddings.upsert(memo.id, memo.embedding)
+            self._index.add(memo.id, memo.embedding)
+        else:
+            self._embeddings.remove(memo.id)
+            self._index.remove(memo.id)
+
+    def _unorder(self, memo: Memo) -> None:
+        key = (memo.created_at, memo.id)
+        del self._order[bisect.bisect_left(self._order, key)]
+
+    def _reranks(self) -> bool:
+        return (
+            self._rerank_factor > 0
+            and self._index.params.precision != VectorPrecision.FLOAT32
+        )
+
+    def _with_embedding(self, memo: Memo) -> Memo:
+        return memo.model_copy(update={"embedding": self._embeddings.get(memo.id)})
@@ -1,17 +1,118 @@
+"""PostgreSQL memo repository.
+
+Run as a module to backfill ``memo_edges`` after a first deployment or a
+``GRAPH_EDGE_FLOOR`` change::
+
+    uv run python -m app.infrastructure.memo.db.repositories.memo_repository_impl
+"""
+
+import logging
+import os
+import time
+from collections.abc import Sequence
+from typing import Any
 from uuid import UUID
 
-from sqlalchemy.orm import Session, sessionmaker
+import numpy as np
+from pgvector.sqlalchemy import HALFVEC, Vector
+from sqlalchemy import (
+    Select,
+    and_,
+    cast,
+    delete,
+    func,
+    insert,
+    literal,
+    or_,
+    select,
+    true,
+    tuple_,
+    update,
+)
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session, aliased, sessionmaker
+
+from app.domain.memo.entities.memo import EnrichmentStatus, Memo
+from app.domain.memo.repositories.memo_repository import (
+    IMemoRepository,
+    MemoCursor,
+    MemoPage,
+    SimilarityEdge,
+)
+from app.domain.memo.services.similarity import FloatMatrix, normalize_rows
+from app.infrastructure.memo.db.models.memo_edge_model import (
+    MemoEdgeRow,
+    MemoEdgeStateRow,
+)
+from app.infrastructure.memo.db.models.memo_model import MemoRow, MemoVersionRow
+from app.infrastructure.memo.db.vector_index import (
+    EMBEDDING_DIMENSION,
+    VectorIndexConfig,
+    apply_search_settings,
+)
 
-from app.domain.memo.entities.memo import Memo
-from app.domain.memo.repositories.memo_repository import IMemoRepository
-from app.infrastructure.memo.db.models.memo_model import MemoRow
+logger = logging.getLogger(__name__)
+
+_DEFAULT_EDGE_FLOOR = 0.3
+_DEFAULT_EDGE_NEIGHBOURS = 50
+_BACKFILL_BATCH_SIZE = 500
+_EDGE_STATE_ID = 1
+_VERSION_ID = 1
+_EDGE_COLUMNS = ["source_id", "target_id", "owner_id", "similarity"]
+# Everything but the embedding, for reads that do not need vectors
+_METADATA_COLUMNS = (
+    MemoRow.id,
+    MemoRow.content,
+    MemoRow.summary,
+    MemoRow.tags,
+    MemoRow.created_at,
+    MemoRow.enrichment_status,
+)
 
 
 class PostgresMemoRepository(IMemoRepository):
-    """PostgreSQL implementation of IMemoRepository."""
+    """PostgreSQL implementation of IMemoRepository.
+
+    Similarity edges are materialised in ``memo_edges``: each memo links to
+    its ``edge_neighbours`` nearest memos whose similarity is at least
+    ``edge_floor``, found with an ``ORDER BY distance LIMIT k`` query the
+    ANN index serves, and deletes cascade. Each link is owned by the memo
+    that found it, so re-saving a memo replaces only its own links and
+    re-scores the ones other memos hold to it. Top-k graph reads then come
+    from indexed SQL without loading embeddings; the table keeps only each
+    memo's nearest neighbours, so reads without ``k`` are not served from
+    it.
+
+    Edges for memos that existed before the first deployment, or before an
+    ``edge_floor`` change, are filled in by :meth:`rebuild_edges`, run once
+    as a command (see the module docstring); an empty table needs none.
+    Until it has recorded the configured floor, :meth:`get_similarity_graph`
+    returns None and callers compute edges themselves.
 
-    def __init__(self, session_factory: sessionmaker[Session]) -> None:
+    Every write first bumps the single ``memo_version`` row in its own
+    transaction; see :meth:`version`. The row lock also serializes writers,
+    so each save's neighbour query sees every memo committed before it and
+    no pair of concurrent saves misses the edge between them.
+    """
+
+    def __init__(
+        self,
+        session_factory: sessionmaker[Session],
+        index_config: VectorIndexConfig | None = None,
+        edge_floor: float = _DEFAULT_EDGE_FLOOR,
+        edge_neighbours: int = _DEFAULT_EDGE_NEIGHBOURS,
+    ) -> None:
         self._session_factory = session_factory
+        self._index_config = index_config or VectorIndexConfig.from_env()
+        self._edge_floor = edge_floor
+        self._edge_neighbours = edge_neighbours
+        if not self._edges_ready() and not self._claim_empty_edges():
+            logger.warning(
+                "memo_edges is not built at floor %.3f; graph reads fall back "
+                "to in-process edges until rebuild_edges has run",
+                edge_floor,
+            )
 
     def save(self, memo: Memo) -> None:
         with self._session_factory() as session:
@@ -22,15 +123,130 @@ class PostgresMemoRepository(IMemoRepository):
                 tags=memo.tags,
                 embedding=memo.embedding,
                 created_at=memo.created_at,
+                enrichment_status=memo.enrichment_status,
             )
+            self._bump_version(session)
             session.merge(row)
+            session.flush()
+            self._replace_edges(session, memo)
+            session.commit()
+
+    def save_many(self, memos: list[Memo]) -> None:
+        """Upsert ``memos`` with one multi-row INSERT and link them set-wise.
+
+        Edges for the whole batch are computed by a single INSERT ... SELECT
+        with a nearest-neighbour LATERAL subquery per new row.
+        """
+        if not memos:
+            return
+        ids = [memo.id for memo in memos]
+        upsert = pg_insert(MemoRow).values(
+            [
+                {
+                    "id": memo.id,
+                    "content": memo.content,
+                    "summary": memo.summary,
+                    "tags": memo.tags,
+                    "embedding": memo.embedding,
+                    "created_at": memo.created_at,
+                    "enrichment_status": memo.enrichment_status,
+                }
+                for memo in memos
+            ]
+        )
+        upsert = upsert.on_conflict_do_update(
+            index_elements=[MemoRow.id],
+            set_={
+                column: upsert.excluded[column]
+                for column in (
+                    "content",
+                    "summary",
+                    "tags",
+                    "embedding",
+                    "created_at",
+                    "enrichment_status",
+                )
+            },
+        )
+
+        with self._session_factory() as session:
+            self._bump_version(session)
+            session.execute(upsert)
+            self._release_edges(session, ids)
+            self._link(session, ids)
+            session.commit()
+
+    def save_if_pending(self, memo: Memo) -> bool:
+        """One ``UPDATE ... WHERE content = :old AND status = 'pending'``."""
+        claim = (
+            update(MemoRow)
+            .where(
+                MemoRow.id == memo.id,
+                MemoRow.content == memo.content,
+                MemoRow.enrichment_status == EnrichmentStatus.PENDING,
+            )
+            .values(
+                summary=memo.summary,
+                tags=memo.tags,
+                embedding=memo.embedding,
+                enrichment_status=memo.enrichment_status,
+            )
+            .returning(MemoRow.id)
+        )
+        with self._session_factory() as session:
+            self._bump_version(session)
+            if session.scalar(claim) is None:
+                session.rollback()
+                return False
+            self._replace_edges(session, memo)
             session.commit()
+            return True
+
+    def get_pending_ids(self) -> list[UUID]:
+        """Served by the partial index ``ix_memos_pending``."""
+        with self._session_factory() as session:
+            return list(
+                session.scalars(
+                    select(MemoRow.id)
+                    .where(MemoRow.enrichment_status == EnrichmentStatus.PENDING)
+                    .order_by(MemoRow.created_at)
+                )
+            )
 
     def get_all(self) -> list[Memo]:
         with self._session_factory() as session:
             rows = session.query(MemoRow).order_by(MemoRow.created_at.desc()).all()
             return [self._to_domain(row) for row in rows]
 
+    def get_all_metadata(self) -> list[Memo]:
+        with self._session_factory() as session:
+            rows = session.execute(
+                select(*_METADATA_COLUMNS).order_by(MemoRow.created_at.desc())
+            ).all()
+        return [self._metadata_to_domain(row) for row in rows]
+
+    def get_page(self, limit: int, after: MemoCursor | None = None) -> MemoPage:
+        """Seek on ``ix_memos_created_at_id``; reads at most ``limit + 1`` rows."""
+        query = select(*_METADATA_COLUMNS).order_by(
+            MemoRow.created_at.desc(), MemoRow.id.desc()
+        )
+        if after is not None:
+            query = query.where(
+                tuple_(MemoRow.created_at, MemoRow.id) < (after.created_at, after.id)
+            )
+        with self._session_factory() as session:
+            rows = session.execute(query.limit(limit + 1)).all()
+        return MemoPage.from_lookahead(
+            [self._metadata_to_domain(row) for row in rows], limit
+        )
+
+    def version(self) -> int:
+        with self._session_factory() as session:
+            version = session.scalar(
+                select(MemoVersionRow.version).where(MemoVersionRow.id == _VERSION_ID)
+            )
+        return version or 0
+
     def get_by_id(self, memo_id: UUID) -> Memo | None:
         with self._session_factory() as session:
             row = session.get(MemoRow, memo_id)
@@ -43,14 +259,33 @@ class PostgresMemoRepository(IMemoRepository):
             row = session.get(MemoRow, memo_id)
             if row is None:
                 return False
+            self._bump_version(session)
             session.delete(row)
             session.commit()
             return True
 
+    def delete_many(self, memo_ids: list[UUID]) -> int:
+        """Delete ``memo_ids`` with one statement; their edges cascade."""
+        if not memo_ids:
+            return 0
+        with self._session_factory() as session:
+            self._bump_version(session)
+            deleted = session.scalars(
+                delete(MemoRow).where(MemoRow.id.in_(memo_ids)).returning(MemoRow.id)
+            ).all()
+            if not deleted:
+                session.rollback()
+                return 0
+            session.commit()
+            return len(deleted)
+
     def search_by_vector(
         self, query_embedding: list[float], limit: int = 5
     ) -> list[Memo]:
+        if self._index_config.halfvec:
+            return self._search_halfvec(query_embedding, limit)
         with self._session_factory() as session:
+            apply_search_settings(session, self._index_config)
             rows = (
                 session.query(MemoRow)
                 .filter(MemoRow.embedding.isnot(None))
@@ -60,6 +295,275 @@ class PostgresMemoRepository(IMemoRepository):
             )
             return [self._to_domain(row) for row in rows]
 
+    def _search_halfvec(self, query_embedding: list[float], limit: int) -> list[Memo]:
+        """Shortlist on the halfvec index, then re-rank at full precision.
+
+        The ORDER BY expression matches the index expression, so the planner
+        serves the shortlist from the index; the re-rank only reads the
+        ``limit * rerank_factor`` shortlisted rows.
+        """
+        rerank_factor = self._index_config.rerank_factor
+        shortlist_size = limit * rerank_factor if rerank_factor > 0 else limit
+        compact = cast(MemoRow.embedding, HALFVEC(EMBEDDING_DIMENSION))
+        with self._session_factory() as session:
+            apply_search_settings(session, self._index_config, shortlist_size)
+            shortlist = (
+                session.query(MemoRow)
+                .filter(MemoRow.embedding.isnot(None))
+                .order_by(compact.cosine_distance(query_embedding))
+                .limit(shortlist_size)
+            )
+            if rerank_factor <= 0:
+                return [self._to_domain(row) for row in shortlist.all()]
+            candidates = shortlist.subquery()
+            reranked = aliased(MemoRow, candidates)
+            rows = (
+                session.query(reranked)
+                .order_by(reranked.embedding.cosine_distance(query_embedding))
+                .limit(limit)
+                .all()
+            )
+            return [self._to_domain(row) for row in rows]
+
+    def get_embedded_ids(self) -> list[UUID]:
+        with self._session_factory() as session:
+            return list(
+                session.scalars(
+                    select(MemoRow.id)
+                    .where(MemoRow.embedding.isnot(None))
+                    .order_by(MemoRow.created_at.desc())
+                )
+            )
+
+    def get_embedding_matrix(
+        self, normalized: bool = True
+    ) -> tuple[list[UUID], FloatMatrix]:
+        with self._session_factory() as session:
+            rows = session.execute(
+                select(MemoRow.id, MemoRow.embedding)
+                .where(MemoRow.embedding.isnot(None))
+                .order_by(MemoRow.created_at.desc())
+            ).all()
+        if not rows:
+            return [], np.zeros((0, 0), dtype=np.float32)
+        matrix = np.stack([r.embedding for r in rows]).astype(np.float32)
+        return [r.id for r in rows], normalize_rows(matrix) if normalized else matrix
+
+    def get_similarity_graph(
+        self, threshold: float, k: int | None = None
+    ) -> tuple[list[Memo], list[SimilarityEdge]] | None:
+        if k is None or k > self._edge_neighbours:
+            return None
+        if threshold < self._edge_floor or not self._edges_ready():
+            return None
+        with self._session_factory() as session:
+            rows = session.execute(
+                select(*_METADATA_COLUMNS)
+                .where(MemoRow.embedding.isnot(None))
+                .order_by(MemoRow.created_at.desc())
+            ).all()
+            # A pair both ends found is stored once per owner
+            edges = session.execute(
+                select(
+                    MemoEdgeRow.source_id,
+                    MemoEdgeRow.target_id,
+                    func.max(MemoEdgeRow.similarity).label("similarity"),
+                )
+                .where(MemoEdgeRow.similarity >= threshold)
+                .group_by(MemoEdgeRow.source_id, MemoEdgeRow.target_id)
+            ).all()
+        memos = [self._metadata_to_domain(r) for r in rows]
+        return memos, [
+            SimilarityEdge(
+                source_id=e.source_id, target_id=e.target_id, similarity=e.similarity
+            )
+            for e in edges
+        ]
+
+    def rebuild_edges(self, batch_size: int = _BACKFILL_BATCH_SIZE) -> None:
+        """Backfill the edges of every memo at the configured floor.
+
+        Memos are linked ``batch_size`` at a time in key order, each batch in
+        its own transaction, with the same index-backed neighbour query as
+        :meth:`save_many`; edges below a raised floor are dropped first.
+        Existing edges are kept, so reads stay served throughout, and a
+        second run (or two started together) only repeats work.
+        """
+        with self._session_factory() as session:
+            self._bump_version(session)
+            session.execute(
+                delete(MemoEdgeRow).where(MemoEdgeRow.similarity < self._edge_floor)
+            )
+            session.commit()
+        linked = 0
+        after: UUID | None = None
+        while True:
+            query = select(MemoRow.id).where(MemoRow.embedding.isnot(None))
+            if after is not None:
+                query = query.where(MemoRow.id > after)
+            with self._session_factory() as session:
+                ids = list(
+                    session.scalars(query.order_by(MemoRow.id).limit(batch_size))
+                )
+                if not ids:
+                    break
+                self._bump_version(session)
+                self._link(session, ids)
+                session.commit()
+            linked += len(ids)
+            after = ids[-1]
+        with self._session_factory() as session:
+            session.merge(MemoEdgeStateRow(id=_EDGE_STATE_ID, floor=self._edge_floor))
+            session.commit()
+        logger.info(
+            "Backfilled memo_edges for %d memos at floor %.3f",
+            linked,
+            self._edge_floor,
+        )
+
+    def _claim_empty_edges(self) -> bool:
+        """Record the floor if there is nothing to backfill yet."""
+        with self._session_factory() as session:
+            embedded = session.scalar(
+                select(MemoRow.id).where(MemoRow.embedding.isnot(None)).limit(1)
+            )
+            if embedded is not None:
+                return False
+            session.merge(MemoEdgeStateRow(id=_EDGE_STATE_ID, floor=self._edge_floor))
+            session.commit()
+        return True
+
+    def _edges_ready(self) -> bool:
+        with self._session_factory() as session:
+            state = session.get(MemoEdgeStateRow, _EDGE_STATE_ID)
+        return state is not None and state.floor == self._edge_floor
+
+    @staticmethod
+    def _bump_version(session: Session) -> None:
+        # The first write seeds from the clock so that a recreated database
+        # does not reissue versions a client may still hold
+        bump = pg_insert(MemoVersionRow).values(id=_VERSION_ID, version=time.time_ns())
+        session.execute(
+            bump.on_conflict_do_update(
+                index_elements=[MemoVersionRow.id],
+                set_={"version": MemoVersionRow.version + 1},
+            )
+        )
+
+    def _replace_edges(self, session: Session, memo: Memo) -> None:
+        self._release_edges(session, [memo.id])
+        if memo.embedding is None:
+            return
+        own_id = literal(memo.id, PG_UUID(as_uuid=True))
+        query = literal(memo.embedding, Vector(EMBEDDING_DIMENSION))
+        nearest = self._nearest(query, own_id).subquery()
+        distance = nearest.c.embedding.cosine_distance(memo.embedding)
+        neighbours = select(
+            func.least(own_id, nearest.c.id),
+            func.greatest(own_id, nearest.c.id),
+            own_id,
+            1 - distance,
+        ).where(distance <= 1 - self._edge_floor)
+        apply_search_settings(session, self._index_config, self._edge_neighbours)
+        session.execute(insert(MemoEdgeRow).from_select(_EDGE_COLUMNS, neighbours))
+
+    def _release_edges(self, session: Session, ids: Sequence[UUID]) -> None:
+        """Drop the edges ``ids`` own and re-score the ones others own to them.
+
+        Called after the rows are written. Edges other memos found stay, as
+        those memos still link here, but take the new similarity; they go
+        once it falls below the floor or the memo has no embedding left.
+        """
+        session.execute(delete(MemoEdgeRow).where(MemoEdgeRow.owner_id.in_(ids)))
+        memo, owner = aliased(MemoRow), aliased(MemoRow)
+        session.execute(
+            update(MemoEdgeRow)
+            .where(
+                memo.id.in_(ids),
+                memo.embedding.isnot(None),
+                or_(MemoEdgeRow.source_id == memo.id, MemoEdgeRow.target_id == memo.id),
+                MemoEdgeRow.owner_id == owner.id,
+            )
+            .values(similarity=1 - owner.embedding.cosine_distance(memo.embedding))
+            .execution_options(synchronize_session=False)
+        )
+        unembedded = select(MemoRow.id).where(
+            MemoRow.id.in_(ids), MemoRow.embedding.is_(None)
+        )
+        touches = or_(MemoEdgeRow.source_id.in_(ids), MemoEdgeRow.target_id.in_(ids))
+        session.execute(
+            delete(MemoEdgeRow)
+            .where(
+                or_(
+                    MemoEdgeRow.source_id.in_(unembedded),
+                    MemoEdgeRow.target_id.in_(unembedded),
+                    and_(touches, MemoEdgeRow.similarity < self._edge_floor),
+                )
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+    def _link(self, session: Session, ids: Sequence[UUID]) -> None:
+        """Insert the edges from each memo in ``ids`` to its nearest memos."""
+        new = aliased(MemoRow)
+        nearest = self._nearest(new.embedding, new.id).lateral()
+        distance = new.embedding.cosine_distance(nearest.c.embedding)
+        neighbours = (
+            select(
+                func.least(new.id, nearest.c.id),
+                func.greatest(new.id, nearest.c.id),
+                new.id,
+                1 - distance,
+            )
+            .select_from(new)
+            .join(nearest, true())
+            .where(
+                new.id.in_(ids),
+                new.embedding.isnot(None),
+                distance <= 1 - self._edge_floor,
+            )
+        )
+        apply_search_settings(session, self._index_config, self._edge_neighbours)
+        # Pairs whose ends are both in ``ids`` are found from both ends
+        session.execute(
+            pg_insert(MemoEdgeRow)
+            .from_select(_EDGE_COLUMNS, neighbours)
+            .on_conflict_do_nothing()
+        )
+
+    def _nearest(self, embedding: Any, own_id: Any) -> Select[Any]:
+        """The ``edge_neighbours`` memos closest to ``embedding``, itself excluded.
+
+        The ORDER BY matches the ANN index expression, so each lookup is an
+        index scan rather than a scan of every memo; the floor is applied
+        to the exact distance by the caller.
+        """
+        other = aliased(MemoRow)
+        if self._index_config.halfvec:
+            compact = HALFVEC(EMBEDDING_DIMENSION)
+            distance = cast(other.embedding, compact).cosine_distance(
+                cast(embedding, compact)
+            )
+        else:
+            distance = other.embedding.cosine_distance(embedding)
+        return (
+            select(other.id, other.embedding)
+            .where(other.id != own_id, other.embedding.isnot(None))
+            .order_by(distance)
+            .limit(self._edge_neighbours)
+        )
+
+    @staticmethod
+    def _metadata_to_domain(row: Any) -> Memo:
+        return Memo(
+            id=row.id,
+            content=row.content,
+            summary=row.summary,
+            tags=row.tags,
+            created_at=row.created_at,
+            enrichment_status=EnrichmentStatus(row.enrichment_status),
+        )
+
     @staticmethod
     def _to_domain(row: MemoRow) -> Memo:
         embedding = row.embedding.tolist() if row.embedding is not None else None
@@ -70,4 +574,21 @@ class PostgresMemoRepository(IMemoRepository):
             tags=row.tags,
             embedding=embedding,
             created_at=row.created_at,
+            enrichment_status=EnrichmentStatus(row.enrichment_status),
         )
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+
+    from app.infrastructure.memo.db.database import create_session_factory
+
+    load_dotenv(override=True)
+    logging.basicConfig(level=logging.INFO)
+    PostgresMemoRepository(
+        create_session_factory(os.environ["DATABASE_URL"], wait_for_index=True),
+        edge_floor=float(os.environ.get("GRAPH_EDGE_FLOOR", _DEFAULT_EDGE_FLOOR)),
+        edge_neighbours=int(
+            os.environ.get("GRAPH_EDGE_NEIGHBOURS", _DEFAULT_EDGE_NEIGHBOURS)
+        ),
+    ).rebuild_edges()
@@ -0,0 +1,298 @@
+"""pgvector ANN index management for ``memos.embedding``.
+
+Without an index, ``ORDER BY embedding <=> :query`` is a sequential scan.
+This module creates an HNSW or IVFFlat index with ``vector_cosine_ops`` (or,
+at ``float16`` precision, on the ``halfvec`` cast of the column with
+``halfvec_cosine_ops``, which halves the index), applies per-query search
+settings, and can rebuild the index concurrently without blocking writes::
+
+    uv run python -m app.infrastructure.memo.db.vector_index
+"""
+
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from enum import StrEnum
+
+from sqlalchemy import Connection, Engine, create_engine, text
+from sqlalchemy.orm import Session
+
+from app.infrastructure.memo.db.quantization import VectorPrecision
+
+logger = logging.getLogger(__name__)
+
+INDEX_NAME = "ix_memos_embedding_ann"
+_TABLE = "memos"
+_COLUMN = "embedding"
+EMBEDDING_DIMENSION = 384
+
+# Session-level advisory lock serializing index builds across replicas
+_TRY_BUILD_LOCK = text("SELECT pg_try_advisory_lock(hashtext(:name))")
+_BUILD_LOCK = text("SELECT pg_advisory_lock(hashtext(:name))")
+_BUILD_UNLOCK = text("SELECT pg_advisory_unlock(hashtext(:name))")
+
+
+class VectorIndexMethod(StrEnum):
+    HNSW = "hnsw"
+    IVFFLAT = "ivfflat"
+
+
+@dataclass(frozen=True)
+class VectorIndexConfig:
+    """Build and query parameters for the embedding ANN index.
+
+    Attributes:
+        method: ``hnsw`` (better recall/latency) or ``ivfflat`` (faster build).
+        m: HNSW links per node.
+        ef_construction: HNSW beam width while building.
+        lists: IVFFlat cluster count (rows / 1000 is a common start).
+        ef_search: HNSW beam width per query (``hnsw.ef_search``).
+        probes: IVFFlat lists scanned per query (``ivfflat.probes``).
+        precision: ``float32`` indexes the column as stored; ``float16``
+            indexes its ``halfvec`` cast (pgvector >= 0.7). pgvector has no
+            int8 vector type, so ``int8`` is rejected.
+        rerank_factor: At ``float16``, searches shortlist
+            ``limit * rerank_factor`` rows from the index and re-rank them
+            by full-precision distance; 0 skips the re-rank.
+    """
+
+    method: VectorIndexMethod = VectorIndexMethod.HNSW
+    m: int = 16
+    ef_construction: int = 64
+    lists: int = 100
+    ef_search: int = 40
+    probes: int = 10
+    precision: VectorPrecision = VectorPrecision.FLOAT32
+    rerank_factor: int = 4
+
+    def __post_init__(self) -> None:
+        if self.precision == VectorPrecision.INT8:
+            msg = "pgvector has no int8 vector type; use float16 (halfvec)"
+            raise ValueError(msg)
+
+    @property
+    def halfvec(self) -> bool:
+        return self.precision == VectorPrecision.FLOAT16
+
+    @classmethod
+    def from_env(cls) -> "VectorIndexConfig":
+        defaults = cls()
+        return cls(
+            method=VectorIndexMethod(
+                os.environ.get("PGVECTOR_INDEX_METHOD", defaults.method)
+            ),
+            m=int(os.environ.get("PGVECTOR_HNSW_M", defaults.m)),
+            ef_construction=int(
+                os.environ.get(
+                    "PGVECTOR_HNSW_EF_CONSTRUCTION", defaults.ef_construction
+                )
+            ),
+            lists=int(os.environ.get("PGVECTOR_IVFFLAT_LISTS", defaults.lists)),
+            ef_search=int(
+                os.environ.get("PGVECTOR_HNSW_EF_SEARCH", defaults.ef_search)
+            ),
+            probes=int(os.environ.get("PGVECTOR_IVFFLAT_PROBES", defaults.probes)),
+            precision=VectorPrecision(
+                os.environ.get("PGVECTOR_PRECISION", defaults.precision)
+            ),
+            rerank_factor=int(
+                os.environ.get("PGVECTOR_RERANK_FACTOR", defaults.rerank_factor)
+            ),
+        )
+
+    def build_options(self) -> str:
+        if self.method is VectorIndexMethod.HNSW:
+            return f"m = {int(self.m)}, ef_construction = {int(self.ef_construction)}"
+        return f"lists = {int(self.lists)}"
+
+    def operator_class(self) -> str:
+        if self.halfvec:
+            return f"({_COLUMN}::halfvec({EMBEDDING_DIMENSION})) halfvec_cosine_ops"
+        return f"{_COLUMN} vector_cosine_ops"
+
+
+def index_ddl(
+    config: VectorIndexConfig,
+    name: str = INDEX_NAME,
+    concurrently: bool = False,
+) -> str:
+    keyword = "CONCURRENTLY " if concurrently else ""
+    return (
+        f"CREATE INDEX {keyword}IF NOT EXISTS {name} ON {_TABLE} "
+        f"USING {config.method} ({config.operator_class()}) "
+        f"WITH ({config.build_options()})"
+    )
+
+
+def existing_index_definition(conn: Connection, name: str) -> str | None:
+    """Definition of the index ``name``, or None if it has to be built.
+
+    An interrupted concurrent build leaves an INVALID index behind that
+    ``IF NOT EXISTS`` would keep skipping; it is dropped so the caller
+    builds it again. An index is also INVALID while a concurrent build is
+    still running, so one that ``pg_stat_progress_create_index`` lists is
+    left alone.
+    """
+    row = conn.execute(
+        text(
+            "SELECT pg_get_indexdef(i.indexrelid), i.indisvalid, EXISTS ("
+            "SELECT 1 FROM pg_stat_progress_create_index p "
+            "WHERE p.index_relid = i.indexrelid) "
+            "FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+            "WHERE c.relname = :name"
+        ),
+        {"name": name},
+    ).one_or_none()
+    if row is None:
+        return None
+    definition, valid, building = row
+    if valid or building:
+        return str(definition)
+    conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+    logger.warning("Dropped invalid index %s left by a failed build", name)
+    return None
+
+
+def _embedded_rows(conn: Connection, at_most: int) -> int:
+    """Rows with an embedding, counting no further than ``at_most``."""
+    return int(
+        conn.execute(
+            text(
+                f"SELECT count(*) FROM (SELECT 1 FROM {_TABLE} "
+                f"WHERE {_COLUMN} IS NOT NULL LIMIT :at_most) AS sample"
+            ),
+            {"at_most": at_most},
+        ).scalar_one()
+    )
+
+
+def _matches(definition: str, config: VectorIndexConfig) -> bool:
+    normalized = definition.lower().replace("'", "").replace(" ", "")
+    expected_using = f"using{config.method}"
+    expected_with = config.build_options().replace(" ", "")
+    expected_ops = "halfvec_cosine_ops" if config.halfvec else "vector_cosine_ops"
+    return (
+        expected_using in normalized
+        and expected_with in normalized
+        and expected_ops in normalized
+    )
+
+
+def ensure_vector_index(engine: Engine, config: VectorIndexConfig) -> None:
+    """Create the ANN index if it is missing.
+
+    The index is built with ``CREATE INDEX CONCURRENTLY`` in AUTOCOMMIT, so
+    a first start against a populated table does not block writes while it
+    builds. Builds hold a Postgres advisory lock; a replica that finds it
+    taken leaves the build to whoever holds it. IVFFlat trains its
+    ``lists`` centroids on the rows present at build time; with fewer
+    embedded rows than lists the clusters are meaningless, so creation is
+    skipped with a warning until there is enough data. An existing index
+    built with different parameters is left in place; a warning points at
+    :func:`rebuild_vector_index` instead.
+    """
+    autocommit = engine.execution_options(isolation_level="AUTOCOMMIT")
+    with autocommit.connect() as conn:
+        if not conn.execute(_TRY_BUILD_LOCK, {"name": INDEX_NAME}).scalar_one():
+            logger.info("Vector index %s is being built elsewhere", INDEX_NAME)
+            return
+        try:
+            _ensure_locked(conn, config)
+        finally:
+            conn.execute(_BUILD_UNLOCK, {"name": INDEX_NAME})
+
+
+def ensure_vector_index_in_background(
+    engine: Engine, config: VectorIndexConfig
+) -> threading.Thread:
+    """Run :func:`ensure_vector_index` on a daemon thread and return it.
+
+    Building on a large table takes minutes; searches fall back to a
+    sequential scan until the index is ready, instead of startup waiting.
+    """
+
+    def build() -> None:
+        try:
+            ensure_vector_index(engine, config)
+        except Exception:
+            logger.exception("Building vector index %s failed", INDEX_NAME)
+
+    thread = threading.Thread(target=build, name="vector-index-build", daemon=True)
+    thread.start()
+    return thread
+
+
+def _ensure_locked(conn: Connection, config: VectorIndexConfig) -> None:
+    definition = existing_index_definition(conn, INDEX_NAME)
+    if definition is None:
+        if config.method is VectorIndexMethod.IVFFLAT:
+            rows = _embedded_rows(conn, config.lists)
+            if rows < config.lists:
+                logger.warning(
+                    "Not creating IVFFlat index %s: %d embedded rows is fewer "
+                    "than lists = %d; run rebuild_vector_index once there are "
+                    "more, or use hnsw",
+                    INDEX_NAME,
+                    rows,
+                    config.lists,
+                )
+                return
+        conn.execute(text(index_ddl(config, concurrently=True)))
+        logger.info("Created vector index %s (%s)", INDEX_NAME, config.method)
+    elif not _matches(definition, config):
+        logger.warning(
+            "Vector index %s does not match configuration (%s); "
+            "run rebuild_vector_index to apply it",
+            INDEX_NAME,
+            definition,
+        )
+
+
+def rebuild_vector_index(engine: Engine, config: VectorIndexConfig) -> None:
+    """Rebuild the ANN index with ``config`` without blocking reads or writes.
+
+    A new index is built with ``CREATE INDEX CONCURRENTLY`` and swapped in
+    for the old one, so queries keep using the old index until the new one is
+    ready. Concurrent DDL cannot run in a transaction, hence AUTOCOMMIT.
+    """
+    staging = f"{INDEX_NAME}_rebuild"
+    autocommit = engine.execution_options(isolation_level="AUTOCOMMIT")
+    with autocommit.connect() as conn:
+        # Waits for a startup build to finish rather than racing it
+        conn.execute(_BUILD_LOCK, {"name": INDEX_NAME})
+        try:
+            # A failed earlier rebuild leaves an INVALID index behind
+            conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {staging}"))
+            conn.execute(text(index_ddl(config, name=staging, concurrently=True)))
+            conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {INDEX_NAME}"))
+            conn.execute(text(f"ALTER INDEX {staging} RENAME TO {INDEX_NAME}"))
+        finally:
+            conn.execute(_BUILD_UNLOCK, {"name": INDEX_NAME})
+    logger.info("Rebuilt vector index %s (%s)", INDEX_NAME, config.method)
+
+
+def apply_search_settings(
+    session: Session, config: VectorIndexConfig, candidates: int = 0
+) -> None:
+    """Set per-transaction ANN search parameters on ``session``.
+
+    ``SET LOCAL`` only lasts until the end of the current transaction, so the
+    setting never leaks to other users of a pooled connection. HNSW returns
+    at most ``ef_search`` rows, so it is raised to ``candidates`` if smaller.
+    """
+    if config.method is VectorIndexMethod.HNSW:
+        ef_search = max(int(config.ef_search), int(candidates))
+        session.execute(text(f"SET LOCAL hnsw.ef_search = {ef_search}"))
+    else:
+        session.execute(text(f"SET LOCAL ivfflat.probes = {int(config.probes)}"))
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+
+    load_dotenv(override=True)
+    logging.basicConfig(level=logging.INFO)
+    rebuild_vector_index(
+        create_engine(os.environ["DATABASE_URL"]), VectorIndexConfig.from_env()
+    )
@@ -0,0 +1,123 @@
+"""Persistent cache of memo analyses in front of an :class:`IAIClient`."""
+
+import asyncio
+import hashlib
+import re
+import unicodedata
+from collections.abc import AsyncIterator
+from pathlib import Path
+
+from app.domain.memo.entities.memo import Memo
+from app.domain.memo.services.ai_client import (
+    IAIClient,
+    MemoAnalysisResult,
+    SearchResult,
+)
+from app.infrastructure.memo.external.tiered_cache import (
+    DEFAULT_MAX_ENTRIES,
+    CacheStats,
+    DiskSchema,
+    TieredCache,
+)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_content(content: str) -> str:
+    """NFKC-normalise ``content`` and collapse runs of whitespace.
+
+    Full-width/half-width variants and trailing newlines from autosave then
+    hash to the same key.
+    """
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFKC", content)).strip()
+
+
+_DISK_SCHEMA = DiskSchema[MemoAnalysisResult](
+    table="analyses",
+    column="analysis",
+    column_type="TEXT",
+    encode=lambda analysis: analysis.model_dump_json(),
+    decode=MemoAnalysisResult.model_validate_json,
+)
+
+
+class CachedAIClient(IAIClient):
+    """Reuses analyses keyed on ``(prompt_version, sha256(normalised content))``.
+
+    Lookups go memory (LRU of ``max_entries``) -> disk (when ``disk_path`` is
+    set) -> the wrapped client. Concurrent requests for the same uncached
+    content share one analysis. Search is never cached: its answer depends
+    on the current memos.
+    """
+
+    def __init__(
+        self,
+        inner: IAIClient,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        disk_path: Path | None = None,
+    ) -> None:
+        self._inner = inner
+        self._cache = TieredCache(_DISK_SCHEMA, max_entries, disk_path)
+
+    def prompt_version(self) -> str:
+        return self._inner.prompt_version()
+
+    def stats(self) -> CacheStats:
+        return self._cache.stats()
+
+    def analyze_memo(self, content: str) -> MemoAnalysisResult:
+        # Callers mutate the tags they get back, so every result is a copy
+        key = self._key(content)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached.model_copy(deep=True)
+        future, owner = self._cache.claim(key)
+        if not owner:
+            return future.result().model_copy(deep=True)
+        try:
+            analysis = self._inner.analyze_memo(content).model_copy(deep=True)
+        except BaseException as exc:
+            self._cache.fail(key, future, exc)
+            raise
+        self._cache.put_many([(key, analysis)])
+        self._cache.resolve(key, future, analysis)
+        return analysis.model_copy(deep=True)
+
+    async def analyze_memo_async(self, content: str) -> MemoAnalysisResult:
+        key = self._key(content)
+        cached = await self._cache.get_async(key)
+        if cached is not None:
+            return cached.model_copy(deep=True)
+        future, owner = self._cache.claim(key)
+        if not owner:
+            shared = await asyncio.wrap_future(future)
+            return shared.model_copy(deep=True)
+        try:
+            result = await self._inner.analyze_memo_async(content)
+        except BaseException as exc:
+            self._cache.fail(key, future, exc)
+            raise
+        analysis = result.model_copy(deep=True)
+        await self._cache.put_many_async([(key, analysis)])
+        self._cache.resolve(key, future, analysis)
+        return analysis.model_copy(deep=True)
+
+    def search_memos(
+        self, query: str, memos: list[Memo], scores: list[float] | None = None
+    ) -> SearchResult:
+        return self._inner.search_memos(query, memos, scores)
+
+    async def search_memos_async(
+        self, query: str, memos: list[Memo], scores: list[float] | None = None
+    ) -> SearchResult:
+        return await self._inner.search_memos_async(query, memos, scores)
+
+    async def stream_search_answer(
+        self, query: str, memos: list[Memo], scores: list[float] | None = None
+    ) -> AsyncIterator[str]:
+        async for text in self._inner.stream_search_answer(query, memos, scores):
+            yield text
+
+    def _key(self, content: str) -> str:
+        digest = hashlib.sha256(normalize_content(content).encode("utf-8"))
+        return f"{self._inner.prompt_version()}:{digest.hexdigest()}"
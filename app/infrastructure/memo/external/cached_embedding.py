@@ -0,0 +1,149 @@
+"""Content-addressed cache in front of an :class:`IEmbeddingClient`."""
+
+import asyncio
+import hashlib
+from pathlib import Path
+
+import numpy as np
+from numpy.typing import NDArray
+
+from app.domain.memo.services.embedding_client import IEmbeddingClient
+from app.infrastructure.memo.external.tiered_cache import (
+    DEFAULT_MAX_ENTRIES,
+    CacheStats,
+    DiskSchema,
+    TieredCache,
+)
+
+Vector = NDArray[np.float32]
+
+# Vectors are kept on disk as float64, the layout of earlier cache files
+_DISK_SCHEMA = DiskSchema[Vector](
+    table="embeddings",
+    column="vector",
+    column_type="BLOB",
+    encode=lambda vector: vector.astype(np.float64).tobytes(),
+    decode=lambda blob: np.frombuffer(blob, dtype=np.float64).astype(np.float32),
+)
+
+
+def _compact(vector: list[float]) -> Vector:
+    """``vector`` at the float32 precision entries are kept at."""
+    return np.asarray(vector, dtype=np.float32)
+
+
+def _as_list(vector: Vector) -> list[float]:
+    values: list[float] = vector.tolist()
+    return values
+
+
+class CachedEmbeddingClient(IEmbeddingClient):
+    """LRU-cached wrapper keyed on ``(model_id, sha256(text))``.
+
+    Lookups go memory -> disk (when ``disk_path`` is set) -> the wrapped
+    client. Concurrent requests for the same uncached text share one
+    computation: the first caller embeds it and the rest wait for its
+    result, from threads or coroutines alike. Batch calls send only their
+    misses to the wrapped client's own (async) batch method.
+
+    Entries are kept as float32 arrays, about 1.5 KB per 384-dimension
+    vector rather than the ~12 KB of a list of Python floats; vectors are
+    returned at that precision, which is what the stores keep anyway.
+    """
+
+    def __init__(
+        self,
+        inner: IEmbeddingClient,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        disk_path: Path | None = None,
+    ) -> None:
+        self._inner = inner
+        self._cache = TieredCache(_DISK_SCHEMA, max_entries, disk_path)
+
+    def model_id(self) -> str:
+        return self._inner.model_id()
+
+    def dimension(self) -> int:
+        return self._inner.dimension()
+
+    def stats(self) -> CacheStats:
+        return self._cache.stats()
+
+    def embed(self, text: str) -> list[float]:
+        key = self._key(text)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return _as_list(cached)
+        future, owner = self._cache.claim(key)
+        if not owner:
+            return _as_list(future.result())
+        try:
+            vector = _compact(self._inner.embed(text))
+        except BaseException as exc:
+            self._cache.fail(key, future, exc)
+            raise
+        self._cache.put_many([(key, vector)])
+        self._cache.resolve(key, future, vector)
+        return _as_list(vector)
+
+    async def embed_async(self, text: str) -> list[float]:
+        key = self._key(text)
+        cached = await self._cache.get_async(key)
+        if cached is not None:
+            return _as_list(cached)
+        future, owner = self._cache.claim(key)
+        if not owner:
+            return _as_list(await asyncio.wrap_future(future))
+        try:
+            vector = _compact(await self._inner.embed_async(text))
+        except BaseException as exc:
+            self._cache.fail(key, future, exc)
+            raise
+        await self._cache.put_many_async([(key, vector)])
+        self._cache.resolve(key, future, vector)
+        return _as_list(vector)
+
+    def embed_batch(self, texts: list[str]) -> list[list[float]]:
+        keys = [self._key(text) for text in texts]
+        found, missing = self._split(self._cache.get_many(keys))
+        if missing:
+            text_of = dict(zip(keys, texts, strict=True))
+            computed = self._inner.embed_batch([text_of[key] for key in missing])
+            stored = self._compact_batch(missing, computed)
+            self._cache.put_many(stored)
+            found.update(stored)
+        return [_as_list(found[key]) for key in keys]
+
+    async def embed_batch_async(self, texts: list[str]) -> list[list[float]]:
+        keys = [self._key(text) for text in texts]
+        found, missing = self._split(await self._cache.get_many_async(keys))
+        if missing:
+            text_of = dict(zip(keys, texts, strict=True))
+            computed = await self._inner.embed_batch_async(
+                [text_of[key] for key in missing]
+            )
+            stored = self._compact_batch(missing, computed)
+            await self._cache.put_many_async(stored)
+            found.update(stored)
+        return [_as_list(found[key]) for key in keys]
+
+    def _key(self, text: str) -> str:
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        return f"{self._inner.model_id()}:{digest}"
+
+    def _split(
+        self, cached: dict[str, Vector | None]
+    ) -> tuple[dict[str, Vector], list[str]]:
+        """Cached vectors by key, and the keys still to embed."""
+        found = {key: vector for key, vector in cached.items() if vector is not None}
+        missing = [key for key in cached if key not in found]
+        self._cache.count_misses(len(missing))
+        return found, missing
+
+    @staticmethod
+    def _compact_batch(
+        keys: list[str], vectors: list[list[float]]
+    ) -> list[tuple[str, Vector]]:
+        return [
+            (key, _compact(vector)) for key, vector in zip(keys, vectors, strict=True)
+        ]
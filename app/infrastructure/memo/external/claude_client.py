@@ -1,9 +1,11 @@
+import hashlib
 import json
 import logging
 import re
+from collections.abc import AsyncIterator
 
-from anthropic import Anthropic
-from anthropic.types import TextBlock
+from anthropic import Anthropic, AsyncAnthropic
+from anthropic.types import Message, TextBlock
 
 from app.domain.memo.entities.memo import Memo
 from app.domain.memo.services.ai_client import (
@@ -11,6 +13,7 @@ from app.domain.memo.services.ai_client import (
     MemoAnalysisResult,
     SearchResult,
 )
+from app.infrastructure.memo.external.context_packer import ContextBudget, pack_memos
 
 logger = logging.getLogger(__name__)
 
@@ -29,8 +32,19 @@ SEARCH_SYSTEM_PROMPT = (
     '形式: {"answer": "回答文", "related_memo_ids": ["id1", "id2"]}'
 )
 
+STREAM_SEARCH_SYSTEM_PROMPT = (
+    "あなたは優秀なメモ検索アシスタントです。"
+    "ユーザーのメモ一覧と検索クエリが与えられます。"
+    "クエリに文脈的に関連するメモを踏まえて回答してください。"
+    "回答文のみをプレーンテキストで返し、JSONやメモIDは含めないでください。"
+)
+
 MODEL = "claude-haiku-4-5-20251001"
 
+ANALYZE_PROMPT_VERSION = hashlib.sha256(
+    f"{MODEL}\n{ANALYZE_SYSTEM_PROMPT}".encode()
+).hexdigest()[:16]
+
 
 def _extract_json(text: str) -> dict:  # type: ignore[type-arg]
     """Extract JSON object from text that may contain markdown fences."""
@@ -54,11 +68,48 @@ def _extract_json(text: str) -> dict:  # type: ignore[type-arg]
     raise ValueError(msg)
 
 
+def _first_text(response: Message) -> str:
+    first_block = response.content[0]
+    if not isinstance(first_block, TextBlock):
+        msg = f"Expected TextBlock, got {type(first_block).__name__}"
+        raise TypeError(msg)
+    return first_block.text
+
+
+def _to_analysis(response: Message) -> MemoAnalysisResult:
+    parsed = _extract_json(_first_text(response))
+    return MemoAnalysisResult(
+        summary=parsed["summary"],
+        tags=parsed.get("tags", []),
+    )
+
+
+def _to_search_result(response: Message) -> SearchResult:
+    parsed = _extract_json(_first_text(response))
+    return SearchResult(
+        answer=parsed["answer"],
+        related_memo_ids=parsed.get("related_memo_ids", []),
+    )
+
+
 class ClaudeClient(IAIClient):
-    """Claude API implementation of IAIClient."""
+    """Claude API implementation of IAIClient.
+
+    The async methods use ``AsyncAnthropic`` so that analysis can run
+    alongside embedding without holding a worker thread. Search prompts are
+    packed into ``context_budget`` tokens, most relevant memos first, after
+    dropping memos whose retrieval score falls below the budget's cutoffs.
+    """
 
-    def __init__(self, api_key: str) -> None:
+    def __init__(
+        self, api_key: str, context_budget: ContextBudget | None = None
+    ) -> None:
         self._client = Anthropic(api_key=api_key)
+        self._async_client = AsyncAnthropic(api_key=api_key)
+        self._context_budget = context_budget or ContextBudget()
+
+    def prompt_version(self) -> str:
+        return ANALYZE_PROMPT_VERSION
 
     def analyze_memo(self, content: str) -> MemoAnalysisResult:
         response = self._client.messages.create(
@@ -67,45 +118,71 @@ class ClaudeClient(IAIClient):
             system=ANALYZE_SYSTEM_PROMPT,
             messages=[{"role": "user", "content": content}],
         )
+        return _to_analysis(response)
 
-        first_block = response.content[0]
-        if not isinstance(first_block, TextBlock):
-            msg = f"Expected TextBlock, got {type(first_block).__name__}"
-            raise TypeError(msg)
-
-        parsed = _extract_json(first_block.text)
-
-        return MemoAnalysisResult(
-            summary=parsed["summary"],
-            tags=parsed.get("tags", []),
+    async def analyze_memo_async(self, content: str) -> MemoAnalysisResult:
+        response = await self._async_client.messages.create(
+            model=MODEL,
+            max_tokens=1024,
+            system=ANALYZE_SYSTEM_PROMPT,
+            messages=[{"role": "user", "content": content}],
         )
+        return _to_analysis(response)
+
+    def _search_message(
+        self, query: str, memos: list[Memo], scores: list[float] | None
+    ) -> str:
+        packed = pack_memos(memos, self._context_budget, scores)
+        logger.info(
+            "Search context: %d tokens, %d/%d memos "
+            "(%d summarized, %d truncated, %d dropped, %d below score cutoff)",
+            packed.tokens,
+            len(packed.included),
+            len(memos),
+            packed.summarized,
+            packed.truncated,
+            packed.dropped,
+            packed.irrelevant,
+        )
+        return f"## メモ一覧\n{packed.text}\n\n## 検索クエリ\n{query}"
 
-    @staticmethod
-    def _format_memo(m: Memo) -> str:
-        summary = m.summary or "未生成"
-        tags = ", ".join(m.tags)
-        return f"ID: {m.id}\n内容: {m.content}\n要約: {summary}\nタグ: {tags}"
-
-    def search_memos(self, query: str, memos: list[Memo]) -> SearchResult:
-        memo_texts = "\n---\n".join(self._format_memo(m) for m in memos)
-
-        user_message = f"## メモ一覧\n{memo_texts}\n\n## 検索クエリ\n{query}"
-
+    def search_memos(
+        self, query: str, memos: list[Memo], scores: list[float] | None = None
+    ) -> SearchResult:
         response = self._client.messages.create(
             model=MODEL,
             max_tokens=2048,
             system=SEARCH_SYSTEM_PROMPT,
-            messages=[{"role": "user", "content": user_message}],
+            messages=[
+                {"role": "user", "content": self._search_message(query, memos, scores)}
+            ],
         )
+        return _to_search_result(response)
 
-        first_block = response.content[0]
-        if not isinstance(first_block, TextBlock):
-            msg = f"Expected TextBlock, got {type(first_block).__name__}"
-            raise TypeError(msg)
-
-        parsed = _extract_json(first_block.text)
-
-        return SearchResult(
-            answer=parsed["answer"],
-            related_memo_ids=parsed.get("related_memo_ids", []),
+    async def search_memos_async(
+        self, query: str, memos: list[Memo], scores: list[float] | None = None
+    ) -> SearchResult:
+        response = await self._async_client.messages.create(
+            model=MODEL,
+            max_tokens=2048,
+            system=SEARCH_SYSTEM_PROMPT,
+            messages=[
+                {"role": "user", "content": self._search_message(query, memos, scores)}
+            ],
         )
+        return _to_search_result(response)
+
+    async def stream_search_answer(
+        self, query: str, memos: list[Memo], scores: list[float] | None = None
+    ) -> AsyncIterator[str]:
+        # Plain-text prompt: a JSON answer could not be forwarded until parsed
+        async with self._async_client.messages.stream(
+            model=MODEL,
+            max_tokens=2048,
+            system=STREAM_SEARCH_SYSTEM_PROMPT,
+            messages=[
+                {"role": "user", "content": self._search_message(query, memos, scores)}
+            ],
+        ) as stream:
+            async for text in stream.text_stream:
+                yield text
@@ -0,0 +1,146 @@
+"""Fits retrieved memos into a token budget for the search prompt."""
+
+import math
+import re
+from dataclasses import dataclass, field
+
+from app.domain.memo.entities.memo import Memo
+
+_DEFAULT_BUDGET_TOKENS = 4000
+_DEFAULT_MEMO_TOKENS = 512
+_MIN_PARTIAL_TOKENS = 64
+_DEFAULT_MIN_SCORE = 0.0
+_DEFAULT_MIN_RELATIVE_SCORE = 0.5
+_SEPARATOR = "\n---\n"
+_ELLIPSIS = "…"
+
+# Hiragana, katakana, CJK ideographs and full-width forms: ~1 token each
+_WIDE_CHARS = re.compile(r"[぀-ヿ㐀-䶿一-鿿＀-￯]")
+_SENTENCE_END = re.compile(r"[。．！？!?\n]|\.\s")
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate Claude token count without a tokenizer round-trip.
+
+    Japanese characters are counted as one token each and everything else
+    as one token per four characters, which errs on the high side for both.
+    """
+    wide = len(_WIDE_CHARS.findall(text))
+    return wide + math.ceil((len(text) - wide) / 4)
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Shorten ``text`` to at most ``max_tokens``, ending on a sentence if one
+    closes in the second half of what fits."""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    low, high = 0, len(text)
+    while low < high:
+        mid = (low + high + 1) // 2
+        if estimate_tokens(text[:mid]) + 1 <= max_tokens:
+            low = mid
+        else:
+            high = mid - 1
+    cut = text[:low]
+    ends = [m.end() for m in _SENTENCE_END.finditer(cut)]
+    if ends and ends[-1] >= low // 2:
+        cut = cut[: ends[-1]]
+    return cut.rstrip() + _ELLIPSIS
+
+
+@dataclass(frozen=True)
+class ContextBudget:
+    """``total`` tokens for all memos; ``per_memo`` caps any single memo.
+
+    When retrieval scores are known, memos scoring below ``min_score``, or
+    below ``min_relative_score`` times the top hit's score, are left out
+    before any tokens are spent: the nearest neighbours of a query with no
+    good match are still returned, and would only pad the prompt.
+    """
+
+    total: int = _DEFAULT_BUDGET_TOKENS
+    per_memo: int = _DEFAULT_MEMO_TOKENS
+    min_score: float = _DEFAULT_MIN_SCORE
+    min_relative_score: float = _DEFAULT_MIN_RELATIVE_SCORE
+
+
+@dataclass
+class PackedContext:
+    text: str
+    tokens: int
+    included: list[Memo] = field(default_factory=list)
+    summarized: int = 0
+    truncated: int = 0
+    dropped: int = 0
+    irrelevant: int = 0
+
+
+def _block(memo: Memo, content: str | None) -> str:
+    lines = [f"ID: {memo.id}"]
+    if content is not None:
+        lines.append(f"内容: {content}")
+    lines.append(f"要約: {memo.summary or '未生成'}")
+    lines.append(f"タグ: {', '.join(memo.tags)}")
+    return "\n".join(lines)
+
+
+def _relevant(
+    memos: list[Memo], scores: list[float], budget: ContextBudget
+) -> list[Memo]:
+    """``memos`` whose score clears both of ``budget``'s score cutoffs."""
+    cutoff = budget.min_score
+    if scores and scores[0] > 0:
+        cutoff = max(cutoff, scores[0] * budget.min_relative_score)
+    return [memo for memo, score in zip(memos, scores, strict=True) if score >= cutoff]
+
+
+def pack_memos(
+    memos: list[Memo], budget: ContextBudget, scores: list[float] | None = None
+) -> PackedContext:
+    """Format ``memos`` (most relevant first) within ``budget``.
+
+    ``scores`` are the memos' similarities to the query, when retrieval
+    produced them; memos below the budget's score cutoffs are left out and
+    counted as ``irrelevant``. A memo over ``budget.per_memo`` is
+    represented by its summary alone when it has one, otherwise its content
+    is truncated. Memos are added in order until the budget runs out; the
+    first that does not fit is truncated into the remaining space if that
+    is worthwhile, and the rest of the tail is dropped.
+    """
+    packed = PackedContext(text="", tokens=0)
+    if scores is not None:
+        relevant = _relevant(memos, scores, budget)
+        packed.irrelevant = len(memos) - len(relevant)
+        memos = relevant
+    blocks: list[str] = []
+    separator_tokens = estimate_tokens(_SEPARATOR)
+
+    for position, memo in enumerate(memos):
+        overhead = separator_tokens if blocks else 0
+        remaining = budget.total - packed.tokens - overhead
+        block = _block(memo, memo.content)
+        tokens = estimate_tokens(block)
+
+        limit = min(budget.per_memo, remaining)
+        if tokens > limit and memo.summary:
+            summary_block = _block(memo, None)
+            if estimate_tokens(summary_block) <= limit:
+                block, tokens = summary_block, estimate_tokens(summary_block)
+                packed.summarized += 1
+        if tokens > limit:
+            frame = estimate_tokens(_block(memo, ""))
+            if limit - frame < _MIN_PARTIAL_TOKENS:
+                packed.dropped = len(memos) - position
+                break
+            block = _block(memo, truncate_to_tokens(memo.content, limit - frame))
+            tokens = estimate_tokens(block)
+            packed.truncated += 1
+
+        blocks.append(block)
+        packed.included.append(memo)
+        packed.tokens += overhead + tokens
+
+    # The running sum rounds each part up; report the packed text itself
+    packed.text = _SEPARATOR.join(blocks)
+    packed.tokens = estimate_tokens(packed.text)
+    return packed
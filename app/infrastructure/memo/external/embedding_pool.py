@@ -0,0 +1,110 @@
+"""Embedding on a pool of worker processes, fed by a micro-batcher."""
+
+import asyncio
+import multiprocessing
+import os
+from collections.abc import Callable
+from concurrent.futures import Future, ProcessPoolExecutor
+
+from app.domain.memo.services.embedding_client import IEmbeddingClient
+from app.infrastructure.memo.external.micro_batcher import MicroBatcher
+
+_DEFAULT_MAX_BATCH_SIZE = 32
+_DEFAULT_MAX_WAIT_MS = 5.0
+
+# Set in each worker process by _init_worker
+_worker_client: IEmbeddingClient | None = None
+
+
+def _init_worker(
+    factory: Callable[[], IEmbeddingClient], threads_per_worker: int
+) -> None:
+    global _worker_client
+    # Before the factory imports torch / onnxruntime, so their thread pools
+    # do not each claim every core
+    os.environ["OMP_NUM_THREADS"] = str(threads_per_worker)
+    os.environ["MKL_NUM_THREADS"] = str(threads_per_worker)
+    _worker_client = factory()
+
+
+def _client() -> IEmbeddingClient:
+    if _worker_client is None:
+        msg = "Embedding worker was not initialised"
+        raise RuntimeError(msg)
+    return _worker_client
+
+
+def _describe() -> tuple[str, int]:
+    return _client().model_id(), _client().dimension()
+
+
+def _encode(texts: list[str]) -> list[list[float]]:
+    return _client().embed_batch(texts)
+
+
+class ProcessPoolEmbeddingClient(IEmbeddingClient):
+    """Runs ``factory()``'s client in ``workers`` processes.
+
+    Each worker loads its own copy of the model, so encoding scales with
+    cores instead of contending for one model under the GIL. Concurrent
+    :meth:`embed` calls are grouped by a :class:`MicroBatcher` (at most
+    ``max_batch_size`` texts, waiting at most ``max_wait_ms`` for more), and
+    each batch is encoded in one worker call. ``factory`` must be picklable,
+    e.g. a class or a ``functools.partial`` of one.
+
+    Construction blocks until one worker has loaded its model.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], IEmbeddingClient],
+        workers: int,
+        max_batch_size: int = _DEFAULT_MAX_BATCH_SIZE,
+        max_wait_ms: float = _DEFAULT_MAX_WAIT_MS,
+    ) -> None:
+        threads = max(1, (os.cpu_count() or 1) // workers)
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers,
+            # fork would copy the parent's threads and any loaded model
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(factory, threads),
+        )
+        self._model_id, self._dimension = self._executor.submit(_describe).result()
+        self._max_batch_size = max_batch_size
+        self._batcher = MicroBatcher(
+            self._dispatch,
+            max_batch_size=max_batch_size,
+            max_wait_ms=max_wait_ms,
+            # One batch queued behind each running one keeps workers busy
+            max_in_flight=workers * 2,
+            name="embedding-batcher",
+        )
+
+    def embed(self, text: str) -> list[float]:
+        return self._batcher.submit(text).result()
+
+    async def embed_async(self, text: str) -> list[float]:
+        vector: list[float] = await asyncio.wrap_future(self._batcher.submit(text))
+        return vector
+
+    def embed_batch(self, texts: list[str]) -> list[list[float]]:
+        # Already batched: split across workers without waiting to coalesce
+        chunks = [
+            self._executor.submit(_encode, texts[start : start + self._max_batch_size])
+            for start in range(0, len(texts), self._max_batch_size)
+        ]
+        return [vector for chunk in chunks for vector in chunk.result()]
+
+    def model_id(self) -> str:
+        return self._model_id
+
+    def dimension(self) -> int:
+        return self._dimension
+
+    def shutdown(self) -> None:
+        self._batcher.close()
+        self._executor.shutdown()
+
+    def _dispatch(self, texts: list[str]) -> Future[list[list[float]]]:
+        return self._executor.submit(_encode, texts)
@@ -1,5 +1,3 @@
-from sentence_transformers import SentenceTransformer
-
 from app.domain.memo.services.embedding_client import IEmbeddingClient
 
 _DEFAULT_MODEL = "paraphrase-multilingual-MiniLM-L12-v2"
@@ -7,14 +5,29 @@ _DIMENSION = 384
 
 
 class LocalEmbeddingClient(IEmbeddingClient):
-    """Offline embedding using sentence-transformers."""
+    """Offline embedding using sentence-transformers.
+
+    sentence-transformers (and torch) are imported when the client is
+    constructed, not when this module is.
+    """
 
     def __init__(self, model_name: str = _DEFAULT_MODEL) -> None:
+        from sentence_transformers import SentenceTransformer
+
         self._model = SentenceTransformer(model_name)
+        self._model_name = model_name
 
     def embed(self, text: str) -> list[float]:
         vector = self._model.encode(text)
         return vector.tolist()
 
+    def embed_batch(self, texts: list[str]) -> list[list[float]]:
+        # One encode call lets the model pad and run the texts as a batch
+        embeddings: list[list[float]] = self._model.encode(texts).tolist()
+        return embeddings
+
+    def model_id(self) -> str:
+        return f"sentence-transformers/{self._model_name}"
+
     def dimension(self) -> int:
         return _DIMENSION
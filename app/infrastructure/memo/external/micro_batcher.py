@@ -0,0 +1,110 @@
+"""Collects concurrent single-text embed requests into bounded batches."""
+
+import queue
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Future
+
+_DEFAULT_MAX_BATCH_SIZE = 32
+_DEFAULT_MAX_WAIT_MS = 5.0
+_DEFAULT_MAX_IN_FLIGHT = 4
+
+
+class MicroBatcher:
+    """Groups texts submitted from any thread into calls to ``dispatch``.
+
+    A batch closes when it holds ``max_batch_size`` items or
+    ``max_wait_ms`` after its first item arrived, whichever comes first, so
+    a lone request waits at most ``max_wait_ms`` before it is sent. At most
+    ``max_in_flight`` batches are dispatched at once; while all are busy,
+    new items keep queueing and the next batch leaves fuller.
+
+    ``dispatch`` must return a future of one vector per text, in order.
+    """
+
+    def __init__(
+        self,
+        dispatch: Callable[[list[str]], Future[list[list[float]]]],
+        max_batch_size: int = _DEFAULT_MAX_BATCH_SIZE,
+        max_wait_ms: float = _DEFAULT_MAX_WAIT_MS,
+        max_in_flight: int = _DEFAULT_MAX_IN_FLIGHT,
+        name: str = "micro-batcher",
+    ) -> None:
+        self._dispatch = dispatch
+        self._max_batch_size = max_batch_size
+        self._max_wait = max_wait_ms / 1000
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+        self._queue: queue.SimpleQueue[tuple[str, Future[list[float]]] | None] = (
+            queue.SimpleQueue()
+        )
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, item: str) -> Future[list[float]]:
+        if self._closed:
+            msg = "MicroBatcher is closed"
+            raise RuntimeError(msg)
+        future: Future[list[float]] = Future()
+        self._queue.put((item, future))
+        return future
+
+    def close(self) -> None:
+        """Stop accepting items; queued items are still dispatched."""
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            deadline = time.monotonic() + self._max_wait
+            self._slots.acquire()
+            batch = [first]
+            stopping = False
+            while len(batch) < self._max_batch_size:
+                timeout = deadline - time.monotonic()
+                try:
+                    entry = (
+                        self._queue.get(timeout=timeout)
+                        if timeout > 0
+                        else self._queue.get_nowait()
+                    )
+                except queue.Empty:
+                    break
+                if entry is None:
+                    stopping = True
+                    break
+                batch.append(entry)
+            self._send(batch)
+            if stopping:
+                return
+
+    def _send(self, batch: list[tuple[str, Future[list[float]]]]) -> None:
+        futures = [future for _, future in batch]
+        try:
+            results = self._dispatch([item for item, _ in batch])
+        except Exception as exc:
+            self._slots.release()
+            for future in futures:
+                future.set_exception(exc)
+            return
+
+        def deliver(done: Future[list[list[float]]]) -> None:
+            self._slots.release()
+            exc = done.exception()
+            if exc is None and len(done.result()) != len(futures):
+                exc = ValueError(
+                    f"Batch of {len(futures)} returned {len(done.result())} results"
+                )
+            if exc is not None:
+                for future in futures:
+                    future.set_exception(exc)
+                return
+            for future, result in zip(futures, done.result(), strict=True):
+                future.set_result(result)
+
+        results.add_done_callback(deliver)
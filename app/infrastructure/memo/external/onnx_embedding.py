@@ -0,0 +1,86 @@
+"""Local embeddings on CPU ONNX Runtime with an int8-quantized model."""
+
+from pathlib import Path
+
+import numpy as np
+
+from app.domain.memo.services.embedding_client import IEmbeddingClient
+
+QUANTIZED_MODEL_FILE = "model_quantized.onnx"
+TOKENIZER_FILE = "tokenizer.json"
+
+_MODEL_NAME = "paraphrase-multilingual-MiniLM-L12-v2"
+_DIMENSION = 384
+# SentenceTransformer's max_seq_length for this model
+_MAX_LENGTH = 128
+_BATCH_SIZE = 32
+
+
+class OnnxEmbeddingClient(IEmbeddingClient):
+    """``paraphrase-multilingual-MiniLM-L12-v2`` without PyTorch.
+
+    Runs the int8 model written by
+    :func:`app.infrastructure.memo.external.onnx_export.export_quantized`
+    and mean-pools token states over the attention mask, as the
+    sentence-transformers pipeline does. Vectors have the same 384
+    dimensions as :class:`LocalEmbeddingClient` and differ from them only by
+    quantization error, but they are cached under their own model ID.
+    """
+
+    def __init__(
+        self,
+        model_dir: Path,
+        max_length: int = _MAX_LENGTH,
+        threads: int | None = None,
+    ) -> None:
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads is not None:
+            options.intra_op_num_threads = threads
+        self._session = ort.InferenceSession(
+            str(model_dir / QUANTIZED_MODEL_FILE),
+            options,
+            providers=["CPUExecutionProvider"],
+        )
+        self._input_names = {i.name for i in self._session.get_inputs()}
+
+        self._tokenizer = Tokenizer.from_file(str(model_dir / TOKENIZER_FILE))
+        self._tokenizer.enable_truncation(max_length)
+        pad_token = next(
+            t for t in ("<pad>", "[PAD]") if self._tokenizer.token_to_id(t) is not None
+        )
+        self._tokenizer.enable_padding(
+            pad_id=self._tokenizer.token_to_id(pad_token), pad_token=pad_token
+        )
+
+    def embed(self, text: str) -> list[float]:
+        return self.embed_batch([text])[0]
+
+    def embed_batch(self, texts: list[str]) -> list[list[float]]:
+        vectors: list[list[float]] = []
+        for start in range(0, len(texts), _BATCH_SIZE):
+            vectors.extend(self._encode(texts[start : start + _BATCH_SIZE]))
+        return vectors
+
+    def model_id(self) -> str:
+        return f"onnx-int8/{_MODEL_NAME}"
+
+    def dimension(self) -> int:
+        return _DIMENSION
+
+    def _encode(self, texts: list[str]) -> list[list[float]]:
+        encodings = self._tokenizer.encode_batch(texts)
+        input_ids = np.array([e.ids for e in encodings], dtype=np.int64)
+        attention = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+        feeds = {"input_ids": input_ids, "attention_mask": attention}
+        if "token_type_ids" in self._input_names:
+            feeds["token_type_ids"] = np.zeros_like(input_ids)
+
+        hidden = self._session.run(None, feeds)[0]
+        mask = attention[..., np.newaxis].astype(np.float32)
+        pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        vectors: list[list[float]] = pooled.tolist()
+        return vectors
@@ -0,0 +1,75 @@
+"""Export the local embedding model to int8-quantized ONNX.
+
+Needs sentence-transformers (for the PyTorch weights) and the ``onnx``
+extra. Run once per host image, then point ``ONNX_MODEL_DIR`` at the
+output::
+
+    python -m app.infrastructure.memo.external.onnx_export models/onnx-minilm
+"""
+
+import logging
+import sys
+from pathlib import Path
+
+from app.infrastructure.memo.external.onnx_embedding import (
+    QUANTIZED_MODEL_FILE,
+    TOKENIZER_FILE,
+)
+
+logger = logging.getLogger(__name__)
+
+_DEFAULT_MODEL = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
+_DEFAULT_OUTPUT_DIR = Path("models/onnx-minilm")
+_OPSET = 17
+
+
+def export_quantized(output_dir: Path, model_name: str = _DEFAULT_MODEL) -> Path:
+    """Write ``model_quantized.onnx`` and ``tokenizer.json`` to ``output_dir``.
+
+    The transformer is exported at fp32 with dynamic batch and sequence
+    axes, then its weights are quantized to int8 with dynamic (per-batch)
+    activation scaling, which needs no calibration data.
+    """
+    import torch
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    from sentence_transformers import SentenceTransformer
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    model = SentenceTransformer(model_name, device="cpu")
+    transformer = model[0].auto_model.eval()
+    model.tokenizer.save_pretrained(str(output_dir))
+    if not (output_dir / TOKENIZER_FILE).exists():
+        msg = f"{model_name} has no fast tokenizer; cannot write {TOKENIZER_FILE}"
+        raise RuntimeError(msg)
+
+    sample = model.tokenizer(["export"], return_tensors="pt")
+    fp32_path = output_dir / "model.onnx"
+    with torch.no_grad():
+        torch.onnx.export(
+            transformer,
+            (sample["input_ids"], sample["attention_mask"]),
+            str(fp32_path),
+            input_names=["input_ids", "attention_mask"],
+            output_names=["last_hidden_state"],
+            dynamic_axes={
+                name: {0: "batch", 1: "sequence"}
+                for name in ("input_ids", "attention_mask", "last_hidden_state")
+            },
+            opset_version=_OPSET,
+        )
+
+    quantized_path = output_dir / QUANTIZED_MODEL_FILE
+    quantize_dynamic(fp32_path, quantized_path, weight_type=QuantType.QInt8)
+    fp32_path.unlink()
+    logger.info(
+        "Exported %s to %s (%.1f MB)",
+        model_name,
+        quantized_path,
+        quantized_path.stat().st_size / 1e6,
+    )
+    return quantized_path
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    export_quantized(Path(sys.argv[1]) if len(sys.argv) > 1 else _DEFAULT_OUTPUT_DIR)
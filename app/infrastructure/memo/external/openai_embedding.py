@@ -1,24 +1,124 @@
-from openai import OpenAI
+import asyncio
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import httpx
+from openai import (
+    AsyncOpenAI,
+    DefaultAsyncHttpxClient,
+    DefaultHttpxClient,
+    OpenAI,
+)
+from openai.types import Embedding
 
 from app.domain.memo.services.embedding_client import IEmbeddingClient
+from app.infrastructure.memo.external.micro_batcher import MicroBatcher
 
 _DEFAULT_MODEL = "text-embedding-3-small"
 _DIMENSION = 1536
+# The embeddings endpoint accepts at most 2048 inputs per request
+_MAX_BATCH_INPUTS = 2048
+_DEFAULT_TIMEOUT_SECONDS = 10.0
+_DEFAULT_MAX_RETRIES = 3
+_DEFAULT_MAX_CONNECTIONS = 10
+_DEFAULT_COALESCE_BATCH_SIZE = 256
+_DEFAULT_COALESCE_WAIT_MS = 10.0
+_DEFAULT_MAX_IN_FLIGHT = 4
+
+
+def _in_order(data: list[Embedding]) -> list[list[float]]:
+    return [item.embedding for item in sorted(data, key=lambda item: item.index)]
 
 
 class OpenAIEmbeddingClient(IEmbeddingClient):
-    """OpenAI API implementation of IEmbeddingClient."""
+    """OpenAI API implementation of IEmbeddingClient.
+
+    Concurrent :meth:`embed` / :meth:`embed_async` calls are merged into
+    multi-input requests of up to ``coalesce_batch_size`` texts, waiting at
+    most ``coalesce_wait_ms`` for company, with ``max_in_flight`` requests
+    outstanding. Requests share a keep-alive connection pool, time out
+    after ``timeout`` seconds and are retried up to ``max_retries`` times
+    with the SDK's exponential backoff (honouring ``Retry-After``).
+    """
 
-    def __init__(self, api_key: str, model: str = _DEFAULT_MODEL) -> None:
-        self._client = OpenAI(api_key=api_key)
+    def __init__(
+        self,
+        api_key: str,
+        model: str = _DEFAULT_MODEL,
+        base_url: str | None = None,
+        timeout: float = _DEFAULT_TIMEOUT_SECONDS,
+        max_retries: int = _DEFAULT_MAX_RETRIES,
+        max_connections: int = _DEFAULT_MAX_CONNECTIONS,
+        coalesce_batch_size: int = _DEFAULT_COALESCE_BATCH_SIZE,
+        coalesce_wait_ms: float = _DEFAULT_COALESCE_WAIT_MS,
+        max_in_flight: int = _DEFAULT_MAX_IN_FLIGHT,
+    ) -> None:
+        limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+        )
+        self._client = OpenAI(
+            api_key=api_key,
+            base_url=base_url,
+            timeout=timeout,
+            max_retries=max_retries,
+            http_client=DefaultHttpxClient(limits=limits),
+        )
+        self._async_client = AsyncOpenAI(
+            api_key=api_key,
+            base_url=base_url,
+            timeout=timeout,
+            max_retries=max_retries,
+            http_client=DefaultAsyncHttpxClient(limits=limits),
+        )
         self._model = model
+        self._requests = ThreadPoolExecutor(
+            max_workers=max_in_flight, thread_name_prefix="openai-embedding"
+        )
+        self._batcher = MicroBatcher(
+            self._dispatch,
+            max_batch_size=min(coalesce_batch_size, _MAX_BATCH_INPUTS),
+            max_wait_ms=coalesce_wait_ms,
+            max_in_flight=max_in_flight,
+            name="openai-embedding-batcher",
+        )
 
     def embed(self, text: str) -> list[float]:
-        response = self._client.embeddings.create(
-            model=self._model,
-            input=text,
-        )
-        return response.data[0].embedding
+        return self._batcher.submit(text).result()
+
+    async def embed_async(self, text: str) -> list[float]:
+        vector: list[float] = await asyncio.wrap_future(self._batcher.submit(text))
+        return vector
+
+    def embed_batch(self, texts: list[str]) -> list[list[float]]:
+        vectors: list[list[float]] = []
+        for start in range(0, len(texts), _MAX_BATCH_INPUTS):
+            response = self._client.embeddings.create(
+                model=self._model,
+                input=texts[start : start + _MAX_BATCH_INPUTS],
+            )
+            vectors.extend(_in_order(response.data))
+        return vectors
+
+    async def embed_batch_async(self, texts: list[str]) -> list[list[float]]:
+        vectors: list[list[float]] = []
+        for start in range(0, len(texts), _MAX_BATCH_INPUTS):
+            response = await self._async_client.embeddings.create(
+                model=self._model,
+                input=texts[start : start + _MAX_BATCH_INPUTS],
+            )
+            vectors.extend(_in_order(response.data))
+        return vectors
+
+    def model_id(self) -> str:
+        return f"openai/{self._model}"
 
     def dimension(self) -> int:
         return _DIMENSION
+
+    def close(self) -> None:
+        self._batcher.close()
+        self._requests.shutdown()
+        self._client.close()
+
+    def _dispatch(self, texts: list[str]) -> Future[list[list[float]]]:
+        return self._requests.submit(self.embed_batch, texts)
@@ -1,7 +1,5 @@
 """PCA-based dimensionality reduction for embedding vectors."""
 
-from sklearn.decomposition import PCA  # type: ignore[import-untyped]
-
 
 def reduce_to_3d(
     embeddings: list[list[float]],
@@ -23,6 +21,9 @@ def reduce_to_3d(
     if count == 1:
         return [{"x": 0.0, "y": 0.0, "z": 0.0}]
 
+    # scikit-learn takes seconds to import; only the 3D graph needs it
+    from sklearn.decomposition import PCA  # type: ignore[import-untyped]
+
     n_components = min(3, count)
     pca = PCA(n_components=n_components)
     reduced = pca.fit_transform(embeddings)
@@ -0,0 +1,196 @@
+"""Memory LRU over an optional SQLite table, shared by the client caches."""
+
+import asyncio
+import sqlite3
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from concurrent.futures import Future
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+DEFAULT_MAX_ENTRIES = 10_000
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    hits: int
+    disk_hits: int
+    misses: int
+    coalesced: int
+    entries: int
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+@dataclass(frozen=True)
+class DiskSchema[T]:
+    """SQLite table a :class:`TieredCache` persists to, and its value codec."""
+
+    table: str
+    column: str
+    column_type: str
+    encode: Callable[[T], bytes | str]
+    decode: Callable[[Any], T]
+
+
+class _DiskStore[T]:
+    """SQLite table of ``key -> encoded value`` that survives restarts."""
+
+    def __init__(self, path: Path, schema: DiskSchema[T]) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._schema = schema
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {schema.table} "
+                f"(key TEXT PRIMARY KEY, {schema.column} {schema.column_type} NOT NULL)"
+            )
+            self._conn.commit()
+
+    def get(self, key: str) -> T | None:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {self._schema.column} FROM {self._schema.table} "  # noqa: S608
+                "WHERE key = ?",
+                (key,),
+            ).fetchone()
+        if row is None:
+            return None
+        return self._schema.decode(row[0])
+
+    def put_many(self, items: list[tuple[str, T]]) -> None:
+        with self._lock:
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO {self._schema.table} "
+                f"(key, {self._schema.column}) VALUES (?, ?)",
+                [(key, self._schema.encode(value)) for key, value in items],
+            )
+            self._conn.commit()
+
+
+class TieredCache[T]:
+    """LRU of ``max_entries`` values over an optional SQLite table.
+
+    Lookups go memory -> disk (when ``disk_path`` is set); disk hits are
+    promoted into memory. Callers that compute a missing value first
+    :meth:`claim` its key, so concurrent requests for the same key share one
+    computation whether they come from threads or coroutines.
+
+    Values are handed out as stored; callers copy them when they are
+    mutable.
+    """
+
+    def __init__(
+        self,
+        schema: DiskSchema[T],
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        disk_path: Path | None = None,
+    ) -> None:
+        self._max_entries = max_entries
+        self._disk = _DiskStore(disk_path, schema) if disk_path is not None else None
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, T] = OrderedDict()
+        self._in_flight: dict[str, Future[T]] = {}
+        self._hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+        self._coalesced = 0
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                hits=self._hits,
+                disk_hits=self._disk_hits,
+                misses=self._misses,
+                coalesced=self._coalesced,
+                entries=len(self._entries),
+            )
+
+    def get(self, key: str) -> T | None:
+        """The cached value for ``key``; a miss is counted by :meth:`claim`."""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return value
+        if self._disk is not None:
+            value = self._disk.get(key)
+            if value is not None:
+                with self._lock:
+                    self._hits += 1
+                    self._disk_hits += 1
+                    self._remember(key, value)
+                return value
+        return None
+
+    async def get_async(self, key: str) -> T | None:
+        # Only the SQLite tier blocks; memory lookups stay on the event loop
+        if self._disk is not None:
+            return await asyncio.to_thread(self.get, key)
+        return self.get(key)
+
+    def get_many(self, keys: list[str]) -> dict[str, T | None]:
+        """:meth:`get` for each distinct key, in first-seen order."""
+        return {key: self.get(key) for key in dict.fromkeys(keys)}
+
+    async def get_many_async(self, keys: list[str]) -> dict[str, T | None]:
+        if self._disk is not None:
+            return await asyncio.to_thread(self.get_many, keys)
+        return self.get_many(keys)
+
+    def put_many(self, items: list[tuple[str, T]]) -> None:
+        with self._lock:
+            for key, value in items:
+                self._remember(key, value)
+        if self._disk is not None:
+            self._disk.put_many(items)
+
+    async def put_many_async(self, items: list[tuple[str, T]]) -> None:
+        if self._disk is not None:
+            await asyncio.to_thread(self.put_many, items)
+        else:
+            self.put_many(items)
+
+    def count_misses(self, count: int) -> None:
+        """Record misses computed without :meth:`claim`, e.g. in a batch."""
+        with self._lock:
+            self._misses += count
+
+    def claim(self, key: str) -> tuple[Future[T], bool]:
+        """Return the in-flight future for ``key`` and whether we own it.
+
+        The owner computes the value and passes it to :meth:`resolve`, or
+        its exception to :meth:`fail`; everyone else waits on the future.
+        """
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is not None:
+                self._coalesced += 1
+                return future, False
+            future = Future()
+            self._in_flight[key] = future
+            self._misses += 1
+            return future, True
+
+    def resolve(self, key: str, future: Future[T], value: T) -> None:
+        with self._lock:
+            self._in_flight.pop(key, None)
+        future.set_result(value)
+
+    def fail(self, key: str, future: Future[T], exc: BaseException) -> None:
+        with self._lock:
+            self._in_flight.pop(key, None)
+        future.set_exception(exc)
+
+    def _remember(self, key: str, value: T) -> None:
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
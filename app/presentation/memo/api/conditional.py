@@ -0,0 +1,51 @@
+"""ETags from the repository's dataset version, and If-None-Match checks.
+
+Every memo write moves the dataset version, so a list or graph response
+served at one version is still current for as long as the version holds.
+Routes check ``If-None-Match`` against the version before reading any
+memo and answer 304 when the client's copy is current.
+
+The tags are weak because GZipMiddleware may re-encode the body. They
+carry a ``variant`` for responses that differ at the same URL, such as
+the negotiated 3D graph encodings.
+"""
+
+from fastapi import Response
+
+# Browsers revalidate on every use and replay the ETag in If-None-Match
+_REVALIDATE = "no-cache"
+
+
+def etag_for(version: int | None, variant: str) -> str | None:
+    """Weak ETag for ``variant`` at ``version``; None if the version is unknown."""
+    if version is None:
+        return None
+    return f'W/"{variant}-{version}"'
+
+
+def is_not_modified(if_none_match: str | None, etag: str | None) -> bool:
+    """Whether ``If-None-Match`` names ``etag`` (weak comparison) or is ``*``."""
+    if if_none_match is None or etag is None:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(
+        _opaque(candidate) == _opaque(etag) for candidate in if_none_match.split(",")
+    )
+
+
+def not_modified(etag: str, headers: dict[str, str] | None = None) -> Response:
+    return Response(
+        status_code=304, headers={**(headers or {}), **validator_headers(etag)}
+    )
+
+
+def validator_headers(etag: str | None) -> dict[str, str]:
+    if etag is None:
+        return {}
+    return {"ETag": etag, "Cache-Control": _REVALIDATE}
+
+
+def _opaque(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
@@ -1,29 +1,79 @@
+import asyncio
+import json
+import logging
+import threading
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from uuid import UUID
 
-from fastapi import Depends, FastAPI, HTTPException
+from fastapi import Depends, FastAPI, Header, HTTPException, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import StreamingResponse
 
-from app.application.memo.memo_usecase import MemoUsecase
-from app.di.memo import container
+from app.application.memo.enrichment import EnrichmentQueueFullError
+from app.application.memo.memo_usecase import GraphMode, MemoUsecase
+from app.di.memo import Container, container
+from app.domain.memo.repositories.memo_repository import MemoCursor
+from app.infrastructure.memo.external.cached_embedding import CachedEmbeddingClient
 from app.infrastructure.memo.external.pca_reducer import reduce_to_3d
+from app.presentation.memo.api.conditional import (
+    etag_for,
+    is_not_modified,
+    not_modified,
+    validator_headers,
+)
+from app.presentation.memo.api.serialization import (
+    GRAPH_3D_BINARY_MEDIA_TYPE,
+    JSONBytesResponse,
+    graph_3d_binary,
+    graph_3d_json,
+    graph_json,
+    memos_json,
+)
 from app.presentation.memo.schemas.memo_schemas import (
+    MAX_SYNC_BATCH_SIZE,
     CreateMemoRequest,
-    Graph3DNodeResponse,
+    CreateMemosRequest,
+    EmbeddingCacheStatsResponse,
     Graph3DResponse,
-    GraphEdgeResponse,
-    GraphNodeResponse,
     GraphResponse,
+    HealthResponse,
     MemoResponse,
-    Position3DResponse,
     SearchRequest,
     SearchResponse,
     UpdateMemoRequest,
 )
 
+logger = logging.getLogger(__name__)
+
+_MAX_GRAPH_DEGREE = 100
+_DEFAULT_PAGE_SIZE = 100
+_MAX_PAGE_SIZE = 500
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+# Graph and memo list bodies compress well; small ones are not worth it
+_GZIP_MINIMUM_SIZE = 1024
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    # Warm up off the event loop so probes are answered while the model loads
+    stop = threading.Event()
+    threading.Thread(
+        target=container.warmup_with_retry,
+        args=(stop,),
+        name="container-warmup",
+        daemon=True,
+    ).start()
+    yield
+    stop.set()
+
+
 app = FastAPI(
     title="AI-Contextual Memo (ACM)",
     description="AI-powered memo app with semantic search",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -34,103 +84,212 @@ app.add_middleware(
     ],
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag"],
 )
+# Starlette leaves text/event-stream uncompressed, so SSE still flushes per event
+app.add_middleware(GZipMiddleware, minimum_size=_GZIP_MINIMUM_SIZE)
 
 
 def get_memo_usecase() -> MemoUsecase:
     return container.memo_usecase
 
 
+def get_container() -> Container:
+    return container
+
+
+def _accepts(accept: str | None, media_type: str) -> bool:
+    if accept is None:
+        return False
+    return any(
+        part.split(";", 1)[0].strip() == media_type for part in accept.split(",")
+    )
+
+
+def get_embedding_cache() -> CachedEmbeddingClient | None:
+    return container.embedding_cache
+
+
+@app.get("/health/live", response_model=HealthResponse)
+def liveness() -> HealthResponse:
+    return HealthResponse(status="ok")
+
+
+@app.get("/health/ready", response_model=HealthResponse)
+def readiness(
+    response: Response, deps: Container = Depends(get_container)
+) -> HealthResponse:
+    """200 once the container has warmed up, 503 until then."""
+    if not deps.is_ready:
+        response.status_code = 503
+        return HealthResponse(status="starting")
+    return HealthResponse(status="ready")
+
+
 @app.post("/memos", response_model=MemoResponse, status_code=201)
-def create_memo(
+async def create_memo(
     request: CreateMemoRequest,
+    response: Response,
+    background: bool = False,
     usecase: MemoUsecase = Depends(get_memo_usecase),
 ) -> MemoResponse:
-    memo = usecase.create_memo(request.content)
+    if background:
+        try:
+            memo = await asyncio.to_thread(
+                usecase.create_memo_deferred, request.content
+            )
+        except EnrichmentQueueFullError as exc:
+            raise HTTPException(status_code=503, detail=str(exc)) from exc
+        response.status_code = 202
+    else:
+        memo = await usecase.create_memo_async(request.content)
     return MemoResponse(
         id=memo.id,
         content=memo.content,
         summary=memo.summary,
         tags=memo.tags,
         created_at=memo.created_at,
+        enrichment_status=memo.enrichment_status,
     )
 
 
+@app.post("/memos/batch", response_model=list[MemoResponse], status_code=201)
+async def create_memos(
+    request: CreateMemosRequest,
+    background: bool = False,
+    usecase: MemoUsecase = Depends(get_memo_usecase),
+) -> JSONBytesResponse:
+    """Create up to ``MAX_SYNC_BATCH_SIZE`` enriched memos, all or none.
+
+    With ``background=true`` up to ``MAX_BATCH_SIZE`` memos are stored as
+    pending and answered with 202, even when the batch is larger than the
+    enrichment queue (the rest wait for a slot); 503 means the queue had no
+    room at all. Each memo's ``enrichment_status`` then reports whether its
+    enrichment succeeded.
+    """
+    if background:
+        try:
+            memos = await asyncio.to_thread(
+                usecase.create_memos_deferred, request.contents
+            )
+        except EnrichmentQueueFullError as exc:
+            raise HTTPException(status_code=503, detail=str(exc)) from exc
+        return JSONBytesResponse(memos_json(memos), status_code=202)
+    if len(request.contents) > MAX_SYNC_BATCH_SIZE:
+        raise HTTPException(
+            status_code=422,
+            detail=(
+                f"At most {MAX_SYNC_BATCH_SIZE} memos per synchronous batch; "
+                "use background=true for larger imports"
+            ),
+        )
+    memos = await usecase.create_memos_async(request.contents)
+    return JSONBytesResponse(memos_json(memos), status_code=201)
+
+
 @app.get("/memos", response_model=list[MemoResponse])
 def get_memos(
+    limit: int = Query(default=_DEFAULT_PAGE_SIZE, ge=1, le=_MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    if_none_match: str | None = Header(default=None),
     usecase: MemoUsecase = Depends(get_memo_usecase),
-) -> list[MemoResponse]:
-    memos = usecase.get_all_memos()
-    return [
-        MemoResponse(
-            id=m.id,
-            content=m.content,
-            summary=m.summary,
-            tags=m.tags,
-            created_at=m.created_at,
-        )
-        for m in memos
-    ]
+) -> Response:
+    """One page of memos, newest first.
+
+    When more memos follow, the ``X-Next-Cursor`` header carries the
+    ``cursor`` value for the next page. Pages carry an ETag of the dataset
+    version and are answered with 304 while it still matches.
+    """
+    try:
+        after = MemoCursor.decode(cursor) if cursor is not None else None
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    etag = etag_for(usecase.get_dataset_version(), "memos")
+    if etag is not None and is_not_modified(if_none_match, etag):
+        return not_modified(etag)
+    page = usecase.get_memo_page(limit, after)
+    response = JSONBytesResponse(
+        memos_json(page.memos), headers=validator_headers(etag)
+    )
+    if page.next_cursor is not None:
+        response.headers[NEXT_CURSOR_HEADER] = page.next_cursor.encode()
+    return response
 
 
 @app.get("/memos/graph", response_model=GraphResponse)
 def get_graph(
+    mode: GraphMode = GraphMode.EXACT,
+    k: int | None = Query(default=None, ge=1, le=_MAX_GRAPH_DEGREE),
+    measure_recall: bool = False,
+    if_none_match: str | None = Header(default=None),
     usecase: MemoUsecase = Depends(get_memo_usecase),
-) -> GraphResponse:
-    graph = usecase.get_graph_data()
-    return GraphResponse(
-        nodes=[
-            GraphNodeResponse(
-                id=n.id,
-                label=n.label,
-                content=n.content,
-                tags=n.tags,
-                created_at=n.created_at,
-            )
-            for n in graph.nodes
-        ],
-        edges=[
-            GraphEdgeResponse(source=e.source, target=e.target, similarity=e.similarity)
-            for e in graph.edges
-        ],
-    )
+) -> Response:
+    etag = etag_for(usecase.get_dataset_version(), "graph")
+    if etag is not None and is_not_modified(if_none_match, etag):
+        return not_modified(etag)
+    graph = usecase.get_graph_data(mode=mode, k=k, measure_recall=measure_recall)
+    return JSONBytesResponse(graph_json(graph), headers=validator_headers(etag))
 
 
-@app.get("/memos/graph/3d", response_model=Graph3DResponse)
+@app.get(
+    "/memos/graph/3d",
+    response_model=Graph3DResponse,
+    responses={200: {"content": {GRAPH_3D_BINARY_MEDIA_TYPE: {}}}},
+)
 def get_graph_3d(
+    mode: GraphMode = GraphMode.EXACT,
+    k: int | None = Query(default=None, ge=1, le=_MAX_GRAPH_DEGREE),
+    measure_recall: bool = False,
+    include_content: bool = True,
+    accept: str | None = Header(default=None),
+    if_none_match: str | None = Header(default=None),
     usecase: MemoUsecase = Depends(get_memo_usecase),
-) -> Graph3DResponse:
-    graph = usecase.get_graph_3d_data(reduce_fn=reduce_to_3d)
-    return Graph3DResponse(
-        nodes=[
-            Graph3DNodeResponse(
-                id=n.id,
-                label=n.label,
-                content=n.content,
-                tags=n.tags,
-                created_at=n.created_at,
-                position=Position3DResponse(
-                    x=n.position.x,
-                    y=n.position.y,
-                    z=n.position.z,
-                ),
-            )
-            for n in graph.nodes
-        ],
-        edges=[
-            GraphEdgeResponse(source=e.source, target=e.target, similarity=e.similarity)
-            for e in graph.edges
-        ],
+) -> Response:
+    binary = _accepts(accept, GRAPH_3D_BINARY_MEDIA_TYPE)
+    vary = {"Vary": "Accept"}
+    etag = etag_for(
+        usecase.get_dataset_version(), "graph3d-binary" if binary else "graph3d"
+    )
+    if etag is not None and is_not_modified(if_none_match, etag):
+        return not_modified(etag, vary)
+    graph = usecase.get_graph_3d_data(
+        reduce_fn=reduce_to_3d, mode=mode, k=k, measure_recall=measure_recall
+    )
+    headers = {**vary, **validator_headers(etag)}
+    if binary:
+        return Response(
+            graph_3d_binary(graph, include_content),
+            media_type=GRAPH_3D_BINARY_MEDIA_TYPE,
+            headers=headers,
+        )
+    return JSONBytesResponse(graph_3d_json(graph, include_content), headers=headers)
+
+
+@app.get("/memos/{memo_id}", response_model=MemoResponse)
+def get_memo(
+    memo_id: UUID,
+    usecase: MemoUsecase = Depends(get_memo_usecase),
+) -> MemoResponse:
+    memo = usecase.get_memo_by_id(memo_id)
+    if memo is None:
+        raise HTTPException(status_code=404, detail="Memo not found")
+    return MemoResponse(
+        id=memo.id,
+        content=memo.content,
+        summary=memo.summary,
+        tags=memo.tags,
+        created_at=memo.created_at,
+        enrichment_status=memo.enrichment_status,
     )
 
 
 @app.patch("/memos/{memo_id}", response_model=MemoResponse)
-def update_memo(
+async def update_memo(
     memo_id: UUID,
     request: UpdateMemoRequest,
     usecase: MemoUsecase = Depends(get_memo_usecase),
 ) -> MemoResponse:
-    memo = usecase.update_memo(memo_id, request.content)
+    memo = await usecase.update_memo_async(memo_id, request.content)
     if memo is None:
         raise HTTPException(status_code=404, detail="Memo not found")
     return MemoResponse(
@@ -139,6 +298,7 @@ def update_memo(
         summary=memo.summary,
         tags=memo.tags,
         created_at=memo.created_at,
+        enrichment_status=memo.enrichment_status,
     )
 
 
@@ -153,12 +313,65 @@ def delete_memo(
 
 
 @app.post("/memos/search", response_model=SearchResponse)
-def search_memos(
+async def search_memos(
     request: SearchRequest,
     usecase: MemoUsecase = Depends(get_memo_usecase),
 ) -> SearchResponse:
-    result = usecase.search_memos(request.query)
+    result = await usecase.search_memos_async(request.query)
     return SearchResponse(
         answer=result.answer,
         related_memo_ids=result.related_memo_ids,
     )
+
+
+def _sse(event: str, data: object) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@app.post("/memos/search/stream")
+async def search_memos_stream(
+    request: SearchRequest,
+    usecase: MemoUsecase = Depends(get_memo_usecase),
+) -> StreamingResponse:
+    """Stream a search answer as Server-Sent Events.
+
+    Events: ``related`` (``related_memo_ids``, sent once retrieval is done),
+    then ``token`` (``text``) per answer chunk, then ``done``, or ``error``
+    if generation fails part-way.
+    """
+    stream = await usecase.search_memos_stream(request.query)
+
+    async def events() -> AsyncIterator[str]:
+        yield _sse("related", {"related_memo_ids": stream.related_memo_ids})
+        try:
+            async for text in stream.answer:
+                yield _sse("token", {"text": text})
+        except Exception:
+            logger.exception("Streaming search failed")
+            yield _sse("error", {"detail": "Search answer generation failed"})
+            return
+        yield _sse("done", {})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.get("/metrics/embedding-cache", response_model=EmbeddingCacheStatsResponse)
+def get_embedding_cache_stats(
+    cache: CachedEmbeddingClient | None = Depends(get_embedding_cache),
+) -> EmbeddingCacheStatsResponse:
+    if cache is None:
+        return EmbeddingCacheStatsResponse(enabled=False)
+    stats = cache.stats()
+    return EmbeddingCacheStatsResponse(
+        enabled=True,
+        hits=stats.hits,
+        disk_hits=stats.disk_hits,
+        misses=stats.misses,
+        coalesced=stats.coalesced,
+        entries=stats.entries,
+        hit_rate=stats.hit_rate,
+    )
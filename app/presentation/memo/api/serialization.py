@@ -0,0 +1,123 @@
+"""Direct JSON serialization of usecase results for large responses.
+
+Building a ``*Response`` model per node and letting FastAPI validate and
+serialize it again through ``response_model`` costs more than producing the
+JSON. These adapters serialize the domain ``Memo`` and the usecase graph
+dataclasses to bytes in pydantic-core without validating them. The wire
+schema is the same as the ``*Response`` models in ``memo_schemas``, which
+stay declared on the routes for OpenAPI.
+
+``graph_3d_binary`` is the compact alternative for ``/memos/graph/3d``,
+served when the client asks for ``GRAPH_3D_BINARY_MEDIA_TYPE``. All
+integers and floats are little-endian::
+
+    header      "ACG3" u16 version, u16 flags, u32 nodes, u32 edges,
+                f32 recall (NaN when absent), u32 node table bytes
+    positions   f32[nodes * 3]   x, y, z per node
+    sources     u32[edges]       index into the node table
+    targets     u32[edges]
+    similarity  f32[edges]
+    node table  UTF-8 JSON of columns: ids, labels, tags, created_at and,
+                when flags has HAS_CONTENT, content
+
+Every section before the node table starts on a 4-byte boundary, so a
+client can view them as typed arrays without copying.
+"""
+
+import math
+import struct
+from enum import IntFlag
+
+import numpy as np
+from fastapi import Response
+from pydantic import TypeAdapter
+from pydantic_core import to_json
+
+from app.application.memo.memo_usecase import Graph3DData, GraphData
+from app.domain.memo.entities.memo import Memo
+
+_MEMOS = TypeAdapter(list[Memo])
+_GRAPH = TypeAdapter(GraphData)
+_GRAPH_3D = TypeAdapter(Graph3DData)
+# MemoResponse is Memo without its embedding
+_MEMO_EXCLUDE = {"__all__": {"embedding"}}
+_GRAPH_3D_EXCLUDE_CONTENT = {"nodes": {"__all__": {"content"}}}
+
+GRAPH_3D_BINARY_MEDIA_TYPE = "application/vnd.acm.graph3d"
+GRAPH_3D_BINARY_VERSION = 1
+_GRAPH_3D_MAGIC = b"ACG3"
+_GRAPH_3D_HEADER = struct.Struct("<4sHHIIfI")
+
+
+class Graph3DFlags(IntFlag):
+    HAS_CONTENT = 1
+    HAS_RECALL = 2
+
+
+class JSONBytesResponse(Response):
+    """Response whose body is already-serialized JSON."""
+
+    media_type = "application/json"
+
+
+def memos_json(memos: list[Memo]) -> bytes:
+    """Same JSON as ``list[MemoResponse]``."""
+    return _MEMOS.dump_json(memos, exclude=_MEMO_EXCLUDE)
+
+
+def graph_json(graph: GraphData) -> bytes:
+    """Same JSON as ``GraphResponse``."""
+    return _GRAPH.dump_json(graph)
+
+
+def graph_3d_json(graph: Graph3DData, include_content: bool = True) -> bytes:
+    """Same JSON as ``Graph3DResponse``; nodes lack ``content`` if not included."""
+    if include_content:
+        return _GRAPH_3D.dump_json(graph)
+    return _GRAPH_3D.dump_json(graph, exclude=_GRAPH_3D_EXCLUDE_CONTENT)
+
+
+def graph_3d_binary(graph: Graph3DData, include_content: bool = True) -> bytes:
+    """``graph`` in the columnar layout described in the module docstring."""
+    index = {node.id: i for i, node in enumerate(graph.nodes)}
+    positions = np.array(
+        [(n.position.x, n.position.y, n.position.z) for n in graph.nodes],
+        dtype="<f4",
+    )
+    sources = np.array([index[e.source] for e in graph.edges], dtype="<u4")
+    targets = np.array([index[e.target] for e in graph.edges], dtype="<u4")
+    similarities = np.array([e.similarity for e in graph.edges], dtype="<f4")
+
+    columns: dict[str, list[object]] = {
+        "ids": [n.id for n in graph.nodes],
+        "labels": [n.label for n in graph.nodes],
+        "tags": [n.tags for n in graph.nodes],
+        "created_at": [n.created_at for n in graph.nodes],
+    }
+    flags = Graph3DFlags(0)
+    if include_content:
+        columns["content"] = [n.content for n in graph.nodes]
+        flags |= Graph3DFlags.HAS_CONTENT
+    if graph.recall is not None:
+        flags |= Graph3DFlags.HAS_RECALL
+    table = to_json(columns)
+
+    header = _GRAPH_3D_HEADER.pack(
+        _GRAPH_3D_MAGIC,
+        GRAPH_3D_BINARY_VERSION,
+        flags,
+        len(graph.nodes),
+        len(graph.edges),
+        math.nan if graph.recall is None else graph.recall,
+        len(table),
+    )
+    return b"".join(
+        (
+            header,
+            positions.tobytes(),
+            sources.tobytes(),
+            targets.tobytes(),
+            similarities.tobytes(),
+            table,
+        )
+    )
@@ -3,17 +3,29 @@ from uuid import UUID
 
 from pydantic import BaseModel, Field
 
+from app.domain.memo.entities.memo import EnrichmentStatus
+
 
 class CreateMemoRequest(BaseModel):
     content: str
 
 
+# Synchronous batches must finish within one request; see MAX_SYNC_BATCH_SIZE
+MAX_BATCH_SIZE = 10_000
+MAX_SYNC_BATCH_SIZE = 100
+
+
+class CreateMemosRequest(BaseModel):
+    contents: list[str] = Field(min_length=1, max_length=MAX_BATCH_SIZE)
+
+
 class MemoResponse(BaseModel):
     id: UUID
     content: str
     summary: str | None = None
     tags: list[str] = Field(default_factory=list)
     created_at: datetime
+    enrichment_status: EnrichmentStatus = EnrichmentStatus.COMPLETED
 
 
 class UpdateMemoRequest(BaseModel):
@@ -46,6 +58,7 @@ class GraphEdgeResponse(BaseModel):
 class GraphResponse(BaseModel):
     nodes: list[GraphNodeResponse] = Field(default_factory=list)
     edges: list[GraphEdgeResponse] = Field(default_factory=list)
+    recall: float | None = None
 
 
 class Position3DResponse(BaseModel):
@@ -57,7 +70,8 @@ class Position3DResponse(BaseModel):
 class Graph3DNodeResponse(BaseModel):
     id: str
     label: str
-    content: str
+    # Left out when requested with include_content=false
+    content: str | None = None
     tags: list[str] = Field(default_factory=list)
     created_at: datetime
     position: Position3DResponse
@@ -66,3 +80,18 @@ class Graph3DNodeResponse(BaseModel):
 class Graph3DResponse(BaseModel):
     nodes: list[Graph3DNodeResponse] = Field(default_factory=list)
     edges: list[GraphEdgeResponse] = Field(default_factory=list)
+    recall: float | None = None
+
+
+class EmbeddingCacheStatsResponse(BaseModel):
+    enabled: bool
+    hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    coalesced: int = 0
+    entries: int = 0
+    hit_rate: float = 0.0
+
+
+class HealthResponse(BaseModel):
+    status: str
@@ -0,0 +1,178 @@
+"""Per-node cost of serializing graph and memo responses.
+
+Compares the previous path, which built a ``*Response`` model per node and
+let FastAPI validate it against ``response_model`` and ``json.dumps`` the
+result, with the direct pydantic-core path in
+``app.presentation.memo.api.serialization``, then the body size of each
+``/memos/graph/3d`` encoding before and after gzip::
+
+    uv run python -m benchmarks.serialization [nodes ...]
+"""
+
+import gzip
+import json
+import random
+import sys
+import timeit
+from collections.abc import Callable
+from datetime import datetime, timedelta
+from typing import Any
+
+from pydantic import TypeAdapter
+
+from app.application.memo.memo_usecase import (
+    Graph3DData,
+    Graph3DNode,
+    GraphEdge,
+    Position3D,
+)
+from app.domain.memo.entities.memo import Memo
+from app.presentation.memo.api.serialization import (
+    graph_3d_binary,
+    graph_3d_json,
+    memos_json,
+)
+from app.presentation.memo.schemas.memo_schemas import (
+    Graph3DNodeResponse,
+    Graph3DResponse,
+    GraphEdgeResponse,
+    MemoResponse,
+    Position3DResponse,
+)
+
+_DEFAULT_SIZES = (1_000, 10_000)
+_EDGES_PER_NODE = 5
+_CONTENT = "メモの本文。" * 20
+
+
+def _graph(size: int) -> Graph3DData:
+    rng = random.Random(0)
+    start = datetime(2026, 1, 1)
+    nodes = [
+        Graph3DNode(
+            id=f"memo-{i}",
+            label=_CONTENT[:30],
+            content=_CONTENT,
+            created_at=start + timedelta(seconds=i),
+            position=Position3D(x=rng.random(), y=rng.random(), z=rng.random()),
+            tags=["python", "memo"],
+        )
+        for i in range(size)
+    ]
+    edges = [
+        GraphEdge(
+            source=f"memo-{i}",
+            target=f"memo-{rng.randrange(size)}",
+            similarity=round(rng.random(), 4),
+        )
+        for i in range(size)
+        for _ in range(_EDGES_PER_NODE)
+    ]
+    return Graph3DData(nodes=nodes, edges=edges)
+
+
+def _fastapi_render(adapter: TypeAdapter[Any], value: object) -> bytes:
+    """What FastAPI does with a returned model and a ``response_model``."""
+    validated = adapter.validate_python(value, from_attributes=True)
+    content = adapter.dump_python(validated, mode="json")
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode()
+
+
+_GRAPH_RESPONSE = TypeAdapter(Graph3DResponse)
+_MEMOS_RESPONSE = TypeAdapter(list[MemoResponse])
+
+
+def _legacy_graph(graph: Graph3DData) -> bytes:
+    response = Graph3DResponse(
+        nodes=[
+            Graph3DNodeResponse(
+                id=n.id,
+                label=n.label,
+                content=n.content,
+                tags=n.tags,
+                created_at=n.created_at,
+                position=Position3DResponse(
+                    x=n.position.x, y=n.position.y, z=n.position.z
+                ),
+            )
+            for n in graph.nodes
+        ],
+        edges=[
+            GraphEdgeResponse(source=e.source, target=e.target, similarity=e.similarity)
+            for e in graph.edges
+        ],
+        recall=graph.recall,
+    )
+    return _fastapi_render(_GRAPH_RESPONSE, response)
+
+
+def _legacy_memos(memos: list[Memo]) -> bytes:
+    responses = [
+        MemoResponse(
+            id=m.id,
+            content=m.content,
+            summary=m.summary,
+            tags=m.tags,
+            created_at=m.created_at,
+            enrichment_status=m.enrichment_status,
+        )
+        for m in memos
+    ]
+    return _fastapi_render(_MEMOS_RESPONSE, responses)
+
+
+def _per_item_us(fn: Callable[[], bytes], items: int) -> float:
+    runs = 5
+    best = min(timeit.repeat(fn, number=1, repeat=runs))
+    return best / items * 1e6
+
+
+def main(sizes: list[int]) -> None:
+    print(f"{'payload':<22}{'nodes':>8}{'legacy us':>12}{'fast us':>10}{'speedup':>9}")
+    for size in sizes:
+        graph = _graph(size)
+        memos = [
+            Memo(content=n.content, tags=n.tags, created_at=n.created_at)
+            for n in graph.nodes
+        ]
+        cases = [
+            (
+                f"graph/3d (+{_EDGES_PER_NODE} edges)",
+                lambda g=graph: _legacy_graph(g),
+                lambda g=graph: graph_3d_json(g),
+            ),
+            (
+                "graph/3d binary",
+                lambda g=graph: _legacy_graph(g),
+                lambda g=graph: graph_3d_binary(g),
+            ),
+            ("memos", lambda m=memos: _legacy_memos(m), lambda m=memos: memos_json(m)),
+        ]
+        for name, legacy, fast in cases:
+            slow_us = _per_item_us(legacy, size)
+            fast_us = _per_item_us(fast, size)
+            print(
+                f"{name:<22}{size:>8}{slow_us:>12.2f}{fast_us:>10.2f}"
+                f"{slow_us / fast_us:>8.1f}x"
+            )
+
+    print(f"\n{'graph/3d body':<22}{'nodes':>8}{'raw KiB':>12}{'gzip KiB':>10}")
+    for size in sizes:
+        graph = _graph(size)
+        bodies = [
+            ("json", graph_3d_json(graph)),
+            ("json, no content", graph_3d_json(graph, include_content=False)),
+            ("binary", graph_3d_binary(graph)),
+            ("binary, no content", graph_3d_binary(graph, include_content=False)),
+        ]
+        for name, body in bodies:
+            print(
+                f"{name:<22}{size:>8}{len(body) / 1024:>12.0f}"
+                f"{len(gzip.compress(body)) / 1024:>10.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or list(_DEFAULT_SIZES))
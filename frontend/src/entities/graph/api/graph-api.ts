@@ -1,5 +1,10 @@
 import { apiClient } from "@/shared/api";
 import type { GraphData, Graph3DData } from "@/entities/graph/model";
+import {
+  GRAPH_3D_BINARY_MEDIA_TYPE,
+  decodeGraph3DColumns,
+  toGraph3DData,
+} from "./graph-binary";
 
 export const graphApi = {
   getGraph: async (): Promise<GraphData> => {
@@ -7,7 +12,10 @@ export const graphApi = {
     return data;
   },
   getGraph3D: async (): Promise<Graph3DData> => {
-    const { data } = await apiClient.get<Graph3DData>("/memos/graph/3d");
-    return data;
+    const { data } = await apiClient.get<ArrayBuffer>("/memos/graph/3d", {
+      headers: { Accept: GRAPH_3D_BINARY_MEDIA_TYPE },
+      responseType: "arraybuffer",
+    });
+    return toGraph3DData(decodeGraph3DColumns(data));
   },
 };
@@ -0,0 +1,81 @@
+import type {
+  Graph3DColumns,
+  Graph3DData,
+  Graph3DNodeTable,
+} from "@/entities/graph/model";
+
+// Mirrors app/presentation/memo/api/serialization.py
+export const GRAPH_3D_BINARY_MEDIA_TYPE = "application/vnd.acm.graph3d";
+const MAGIC = "ACG3";
+const VERSION = 1;
+const HEADER_BYTES = 24;
+const HAS_CONTENT = 1;
+const HAS_RECALL = 2;
+
+/** Views the typed-array sections of the buffer in place, without copying. */
+export function decodeGraph3DColumns(buffer: ArrayBuffer): Graph3DColumns {
+  const view = new DataView(buffer);
+  const magic = String.fromCharCode(
+    ...new Uint8Array(buffer, 0, MAGIC.length),
+  );
+  const version = view.getUint16(4, true);
+  if (magic !== MAGIC || version !== VERSION) {
+    throw new Error(`Unsupported 3D graph payload: ${magic} v${version}`);
+  }
+  const flags = view.getUint16(6, true);
+  const nodeCount = view.getUint32(8, true);
+  const edgeCount = view.getUint32(12, true);
+  const recall = view.getFloat32(16, true);
+  const tableBytes = view.getUint32(20, true);
+
+  let offset = HEADER_BYTES;
+  const positions = new Float32Array(buffer, offset, nodeCount * 3);
+  offset += positions.byteLength;
+  const sources = new Uint32Array(buffer, offset, edgeCount);
+  offset += sources.byteLength;
+  const targets = new Uint32Array(buffer, offset, edgeCount);
+  offset += targets.byteLength;
+  const similarities = new Float32Array(buffer, offset, edgeCount);
+  offset += similarities.byteLength;
+  const table: Graph3DNodeTable = JSON.parse(
+    new TextDecoder().decode(new Uint8Array(buffer, offset, tableBytes)),
+  );
+
+  return {
+    positions,
+    sources,
+    targets,
+    similarities,
+    ids: table.ids,
+    labels: table.labels,
+    tags: table.tags,
+    created_at: table.created_at,
+    content: flags & HAS_CONTENT ? (table.content ?? null) : null,
+    recall: flags & HAS_RECALL ? recall : null,
+  };
+}
+
+/** Expands the columns into the same shape as the JSON response. */
+export function toGraph3DData(columns: Graph3DColumns): Graph3DData {
+  const { positions, sources, targets, similarities, ids } = columns;
+  return {
+    nodes: ids.map((id, i) => ({
+      id,
+      label: columns.labels[i],
+      content: columns.content?.[i] ?? "",
+      tags: columns.tags[i],
+      created_at: columns.created_at[i],
+      position: {
+        x: positions[i * 3],
+        y: positions[i * 3 + 1],
+        z: positions[i * 3 + 2],
+      },
+    })),
+    edges: Array.from(sources, (source, e) => ({
+      source: ids[source],
+      target: ids[targets[e]],
+      similarity: similarities[e],
+    })),
+    recall: columns.recall,
+  };
+}
@@ -1 +1,6 @@
 export { graphApi } from "./graph-api";
+export {
+  GRAPH_3D_BINARY_MEDIA_TYPE,
+  decodeGraph3DColumns,
+  toGraph3DData,
+} from "./graph-binary";
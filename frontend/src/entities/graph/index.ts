@@ -6,4 +6,6 @@ export type {
   Position3D,
   Graph3DNode,
   Graph3DData,
+  Graph3DColumns,
+  Graph3DNodeTable,
 } from "./model";
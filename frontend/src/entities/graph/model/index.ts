@@ -5,4 +5,6 @@ export type {
   Position3D,
   Graph3DNode,
   Graph3DData,
+  Graph3DColumns,
+  Graph3DNodeTable,
 } from "./types";
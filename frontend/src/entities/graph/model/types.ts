@@ -15,6 +15,7 @@ export type GraphEdge = {
 export type GraphData = {
   nodes: GraphNode[];
   edges: GraphEdge[];
+  recall?: number | null;
 };
 
 export type Position3D = {
@@ -35,4 +36,27 @@ export type Graph3DNode = {
 export type Graph3DData = {
   nodes: Graph3DNode[];
   edges: GraphEdge[];
+  recall?: number | null;
+};
+
+export type Graph3DNodeTable = {
+  ids: string[];
+  labels: string[];
+  tags: string[][];
+  created_at: string[];
+  content?: string[];
+};
+
+/** Binary /memos/graph/3d payload; edge endpoints index into `ids`. */
+export type Graph3DColumns = {
+  positions: Float32Array;
+  sources: Uint32Array;
+  targets: Uint32Array;
+  similarities: Float32Array;
+  ids: string[];
+  labels: string[];
+  tags: string[][];
+  created_at: string[];
+  content: string[] | null;
+  recall: number | null;
 };
@@ -1,10 +1,25 @@
 import { apiClient } from "@/shared/api";
-import type { Memo, SearchResult } from "@/entities/memo/model";
+import type { Memo, MemoPage, SearchResult } from "@/entities/memo/model";
+
+const PAGE_SIZE = 500;
 
 export const memoApi = {
+  getPage: async (cursor?: string, limit = PAGE_SIZE): Promise<MemoPage> => {
+    const { data, headers } = await apiClient.get<Memo[]>("/memos", {
+      params: { limit, cursor },
+    });
+    return { memos: data, nextCursor: headers["x-next-cursor"] ?? null };
+  },
+
   getAll: async (): Promise<Memo[]> => {
-    const { data } = await apiClient.get<Memo[]>("/memos");
-    return data;
+    const memos: Memo[] = [];
+    let cursor: string | undefined;
+    do {
+      const page = await memoApi.getPage(cursor);
+      memos.push(...page.memos);
+      cursor = page.nextCursor ?? undefined;
+    } while (cursor);
+    return memos;
   },
 
   create: async (content: string): Promise<Memo> => {
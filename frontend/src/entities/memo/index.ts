@@ -1,2 +1,2 @@
 export { memoApi } from "./api";
-export type { Memo, SearchResult } from "./model";
+export type { Memo, MemoPage, SearchResult } from "./model";
@@ -1 +1 @@
-export type { Memo, SearchResult } from "./types";
+export type { EnrichmentStatus, Memo, MemoPage, SearchResult } from "./types";
@@ -1,9 +1,17 @@
+export type EnrichmentStatus = "pending" | "completed" | "failed";
+
 export type Memo = {
   id: string;
   content: string;
   summary: string | null;
   tags: string[];
   created_at: string;
+  enrichment_status: EnrichmentStatus;
+};
+
+export type MemoPage = {
+  memos: Memo[];
+  nextCursor: string | null;
 };
 
 export type SearchResult = {
@@ -1,3 +1,5 @@
+import threading
+
 import pytest
 
 from app.domain.memo.entities.memo import Memo
@@ -18,20 +20,52 @@ class StubAIClient(IAIClient):
             tags=["test-tag"],
         )
 
-    def search_memos(self, query: str, memos: list[Memo]) -> SearchResult:
+    def search_memos(
+        self, query: str, memos: list[Memo], scores: list[float] | None = None
+    ) -> SearchResult:
         return SearchResult(
             answer=f"Search result for: {query}",
             related_memo_ids=[str(m.id) for m in memos[:2]],
         )
 
 
+class CountingAIClient(StubAIClient):
+    """Stub AI client that records the analyses and searches it serves.
+
+    Clearing ``gate`` holds analyses until it is set again.
+    """
+
+    def __init__(self, version: str = "v1") -> None:
+        self.version = version
+        self.calls: list[str] = []
+        self.searches = 0
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def prompt_version(self) -> str:
+        return self.version
+
+    def analyze_memo(self, content: str) -> MemoAnalysisResult:
+        self.gate.wait(timeout=5)
+        self.calls.append(content)
+        return super().analyze_memo(content)
+
+    def search_memos(
+        self, query: str, memos: list[Memo], scores: list[float] | None = None
+    ) -> SearchResult:
+        self.searches += 1
+        return super().search_memos(query, memos, scores)
+
+
 class FailingAIClient(IAIClient):
     """AI client that always raises an error for error handling tests."""
 
     def analyze_memo(self, content: str) -> MemoAnalysisResult:
         raise RuntimeError("AI service unavailable")
 
-    def search_memos(self, query: str, memos: list[Memo]) -> SearchResult:
+    def search_memos(
+        self, query: str, memos: list[Memo], scores: list[float] | None = None
+    ) -> SearchResult:
         raise RuntimeError("AI service unavailable")
 
 
@@ -53,6 +87,11 @@ def stub_ai_client() -> StubAIClient:
     return StubAIClient()
 
 
+@pytest.fixture
+def counting_ai_client() -> CountingAIClient:
+    return CountingAIClient()
+
+
 @pytest.fixture
 def failing_ai_client() -> FailingAIClient:
     return FailingAIClient()
@@ -69,6 +69,44 @@ class TestCreateMemoAPI:
         assert response.status_code == 422
 
 
+@pytest.mark.integration
+class TestCreateMemosBatchAPI:
+    def test_複数メモを一括作成できる(self, client: TestClient) -> None:
+        response = client.post("/memos/batch", json={"contents": ["a", "b", "c"]})
+
+        assert response.status_code == 201
+        assert [m["content"] for m in response.json()] == ["a", "b", "c"]
+        assert len(client.get("/memos").json()) == 3
+
+    def test_空のリストは422を返す(self, client: TestClient) -> None:
+        response = client.post("/memos/batch", json={"contents": []})
+        assert response.status_code == 422
+
+    def test_同期の上限を超える件数は422を返し何も保存しない(
+        self, client: TestClient
+    ) -> None:
+        response = client.post(
+            "/memos/batch", json={"contents": [str(i) for i in range(101)]}
+        )
+
+        assert response.status_code == 422
+        assert client.get("/memos").json() == []
+
+    def test_backgroundを指定すると202で全件pendingが返る(
+        self, client: TestClient
+    ) -> None:
+        contents = [str(i) for i in range(101)]
+
+        response = client.post(
+            "/memos/batch", params={"background": True}, json={"contents": contents}
+        )
+
+        assert response.status_code == 202
+        body = response.json()
+        assert [m["content"] for m in body] == contents
+        assert {m["enrichment_status"] for m in body} == {"pending"}
+
+
 @pytest.mark.integration
 class TestGetMemosAPI:
     def test_メモ一覧が取得できる(self, client: TestClient) -> None:
@@ -81,12 +119,50 @@ class TestGetMemosAPI:
         data = response.json()
         assert len(data) == 2
 
+    def test_limitを超える分は次ページのカーソルで取得できる(
+        self, client: TestClient
+    ) -> None:
+        client.post("/memos/batch", json={"contents": ["a", "b", "c"]})
+
+        first = client.get("/memos", params={"limit": 2})
+        cursor = first.headers["X-Next-Cursor"]
+        second = client.get("/memos", params={"limit": 2, "cursor": cursor})
+
+        assert len(first.json()) == 2
+        assert len(second.json()) == 1
+        assert "X-Next-Cursor" not in second.headers
+
+    def test_不正なカーソルは400を返す(self, client: TestClient) -> None:
+        response = client.get("/memos", params={"cursor": "broken"})
+
+        assert response.status_code == 400
+
     def test_メモが空の場合は空リストを返す(self, client: TestClient) -> None:
         response = client.get("/memos")
 
         assert response.status_code == 200
         assert response.json() == []
 
+    def test_IDでメモとエンリッチ状態が取得できる(self, client: TestClient) -> None:
+        created = client.post("/memos", json={"content": "memo"}).json()
+
+        response = client.get(f"/memos/{created['id']}")
+
+        assert response.status_code == 200
+        assert response.json()["enrichment_status"] == "completed"
+
+    def test_存在しないIDの取得は404を返す(self, client: TestClient) -> None:
+        response = client.get("/memos/00000000-0000-0000-0000-000000000000")
+        assert response.status_code == 404
+
+    def test_backgroundを指定すると202でpendingが返る(self, client: TestClient) -> None:
+        response = client.post("/memos?background=true", json={"content": "later"})
+
+        assert response.status_code == 202
+        data = response.json()
+        assert data["enrichment_status"] == "pending"
+        assert data["summary"] is None
+
 
 @pytest.mark.integration
 class TestSearchMemosAPI:
@@ -104,6 +180,97 @@ class TestSearchMemosAPI:
         response = client.post("/memos/search", json={})
         assert response.status_code == 422
 
+    def test_ストリーミング検索は関連IDの後に回答を送る(
+        self, client: TestClient
+    ) -> None:
+        memo_id = client.post("/memos", json={"content": "Python tips"}).json()["id"]
+
+        response = client.post("/memos/search/stream", json={"query": "Python"})
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = [
+            line.removeprefix("event: ")
+            for line in response.text.splitlines()
+            if line.startswith("event: ")
+        ]
+        assert events == ["related", "token", "done"]
+        assert memo_id in response.text
+
+
+@pytest.mark.integration
+class TestGraph3DAPI:
+    def test_Acceptでバイナリ形式を選べる(self, client: TestClient) -> None:
+        client.post("/memos/batch", json={"contents": ["a", "b", "c"]})
+
+        response = client.get(
+            "/memos/graph/3d",
+            headers={"Accept": "application/vnd.acm.graph3d"},
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/vnd.acm.graph3d"
+        assert "Accept" in response.headers["vary"]
+        assert response.content[:4] == b"ACG3"
+
+    def test_include_contentがfalseならノードにcontentがない(
+        self, client: TestClient
+    ) -> None:
+        client.post("/memos/batch", json={"contents": ["a", "b", "c"]})
+
+        response = client.get("/memos/graph/3d", params={"include_content": False})
+
+        assert response.status_code == 200
+        assert all("content" not in node for node in response.json()["nodes"])
+
+    def test_大きな応答はgzipで圧縮される(self, client: TestClient) -> None:
+        client.post("/memos/batch", json={"contents": ["x" * 500] * 5})
+
+        response = client.get("/memos", headers={"Accept-Encoding": "gzip"})
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert len(response.json()) == 5
+
+
+@pytest.mark.integration
+class TestConditionalGetAPI:
+    @pytest.mark.parametrize("path", ["/memos", "/memos/graph", "/memos/graph/3d"])
+    def test_ETagが一致すれば304を返す(self, client: TestClient, path: str) -> None:
+        client.post("/memos/batch", json={"contents": ["a", "b", "c"]})
+        etag = client.get(path).headers["etag"]
+
+        response = client.get(path, headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+
+    def test_メモを追加するとETagが変わり200を返す(self, client: TestClient) -> None:
+        client.post("/memos", json={"content": "first"})
+        etag = client.get("/memos").headers["etag"]
+        client.post("/memos", json={"content": "second"})
+
+        response = client.get("/memos", headers={"If-None-Match": etag})
+
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+        assert len(response.json()) == 2
+
+    def test_3Dグラフは形式ごとに別のETagになる(self, client: TestClient) -> None:
+        client.post("/memos/batch", json={"contents": ["a", "b", "c"]})
+        json_etag = client.get("/memos/graph/3d").headers["etag"]
+
+        response = client.get(
+            "/memos/graph/3d",
+            headers={
+                "Accept": "application/vnd.acm.graph3d",
+                "If-None-Match": json_etag,
+            },
+        )
+
+        assert response.status_code == 200
+        assert response.headers["etag"] != json_etag
+
 
 @pytest.mark.integration
 class TestUpdateMemoAPI:
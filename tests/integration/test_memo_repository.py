@@ -1,12 +1,25 @@
+import math
+from datetime import datetime, timedelta
 from uuid import uuid4
 
 import pytest
+from sqlalchemy import text
 from sqlalchemy.orm import Session, sessionmaker
 
-from app.domain.memo.entities.memo import Memo
+from app.domain.memo.entities.memo import EnrichmentStatus, Memo
+from app.infrastructure.memo.db.database import create_session_factory
+from app.infrastructure.memo.db.quantization import VectorPrecision
 from app.infrastructure.memo.db.repositories.memo_repository_impl import (
     PostgresMemoRepository,
 )
+from app.infrastructure.memo.db.vector_index import (
+    INDEX_NAME,
+    VectorIndexConfig,
+    VectorIndexMethod,
+    ensure_vector_index,
+    rebuild_vector_index,
+)
+from tests.integration.conftest import TEST_DATABASE_URL
 
 
 @pytest.fixture
@@ -45,6 +58,38 @@ class TestPostgresMemoRepository:
         assert len(all_memos) == 2
         assert all_memos[0].created_at >= all_memos[1].created_at
 
+    def test_カーソルで作成日時の降順にページ分割できる(
+        self, repository: PostgresMemoRepository
+    ) -> None:
+        base = datetime(2026, 1, 1)
+        memos = [
+            Memo(content=str(i), created_at=base + timedelta(minutes=i // 2))
+            for i in range(5)
+        ]
+        repository.save_many(memos)
+
+        first = repository.get_page(3)
+        assert first.next_cursor is not None
+        second = repository.get_page(3, after=first.next_cursor)
+
+        expected = sorted(memos, key=lambda m: (m.created_at, m.id), reverse=True)
+        assert [m.id for m in first.memos + second.memos] == [m.id for m in expected]
+        assert second.next_cursor is None
+
+    def test_メタデータの読み込みはembeddingを含まない(
+        self, repository: PostgresMemoRepository
+    ) -> None:
+        memo = Memo(content="vector", tags=["t"], embedding=[1.0] + [0.0] * 383)
+        repository.save(memo)
+
+        listed = repository.get_all_metadata()
+        page = repository.get_page(10)
+
+        assert [m.id for m in listed] == [memo.id]
+        assert listed[0].tags == ["t"]
+        assert listed[0].embedding is None
+        assert page.memos == listed
+
     def test_存在しないIDはNoneを返す(self, repository: PostgresMemoRepository) -> None:
         result = repository.get_by_id(uuid4())
         assert result is None
@@ -89,6 +134,19 @@ class TestPostgresMemoRepository:
         result = repository.delete(uuid4())
         assert result is False
 
+    def test_複数のメモを一度に削除しバージョンは一回だけ進む(
+        self, repository: PostgresMemoRepository
+    ) -> None:
+        memos = [Memo(content=f"bulk {i}") for i in range(3)]
+        repository.save_many(memos)
+        before = repository.version()
+
+        deleted = repository.delete_many([m.id for m in memos] + [uuid4()])
+
+        assert deleted == 3
+        assert repository.get_all() == []
+        assert repository.version() == before + 1
+
     def test_空のリポジトリからget_allは空リストを返す(
         self, repository: PostgresMemoRepository
     ) -> None:
@@ -137,3 +195,409 @@ class TestPostgresMemoRepository:
         ids = [m.id for m in results]
         assert memo_with.id in ids
         assert memo_without.id not in ids
+
+
+@pytest.mark.integration
+class TestSaveIfPending:
+    def test_pendingで内容が同じときだけ保存される(
+        self, repository: PostgresMemoRepository
+    ) -> None:
+        pending = Memo(content="draft", enrichment_status=EnrichmentStatus.PENDING)
+        repository.save(pending)
+        enriched = pending.model_copy(
+            update={
+                "summary": "要約",
+                "embedding": [1.0] + [0.0] * 383,
+                "enrichment_status": EnrichmentStatus.COMPLETED,
+            }
+        )
+
+        assert repository.get_pending_ids() == [pending.id]
+        assert repository.save_if_pending(enriched) is True
+        assert repository.save_if_pending(enriched) is False
+        assert repository.get_pending_ids() == []
+        stored = repository.get_by_id(pending.id)
+        assert stored is not None
+        assert stored.summary == "要約"
+
+    def test_編集済みのメモは上書きしない(
+        self, repository: PostgresMemoRepository
+    ) -> None:
+        pending = Memo(content="draft", enrichment_status=EnrichmentStatus.PENDING)
+        repository.save(pending)
+        repository.save(pending.model_copy(update={"content": "edited"}))
+        version = repository.version()
+
+        stale = pending.model_copy(
+            update={"summary": "古い", "enrichment_status": EnrichmentStatus.COMPLETED}
+        )
+
+        assert repository.save_if_pending(stale) is False
+        stored = repository.get_by_id(pending.id)
+        assert stored is not None
+        assert stored.content == "edited"
+        assert repository.version() == version
+
+
+@pytest.mark.integration
+class TestDatasetVersion:
+    def test_保存と削除でバージョンが増え読み取りでは変わらない(
+        self, repository: PostgresMemoRepository
+    ) -> None:
+        assert repository.version() == 0
+        memo = Memo(content="versioned")
+
+        repository.save(memo)
+        saved = repository.version()
+        repository.save_many([Memo(content="a"), Memo(content="b")])
+        batched = repository.version()
+        repository.get_all_metadata()
+        repository.delete(uuid4())
+        unchanged = repository.version()
+        repository.delete(memo.id)
+
+        assert 0 < saved < batched == unchanged < repository.version()
+
+
+def _angle_embedding(degrees: float) -> list[float]:
+    radians = math.radians(degrees)
+    return [math.cos(radians), math.sin(radians)] + [0.0] * 382
+
+
+def _index_definition(session_factory: sessionmaker[Session]) -> str | None:
+    with session_factory() as session:
+        return session.execute(
+            text("SELECT indexdef FROM pg_indexes WHERE indexname = :name"),
+            {"name": INDEX_NAME},
+        ).scalar_one_or_none()
+
+
+@pytest.mark.integration
+class TestVectorIndex:
+    def test_HNSWインデックスが作成される(
+        self, test_session_factory: sessionmaker[Session]
+    ) -> None:
+        engine = test_session_factory.kw["bind"]
+
+        ensure_vector_index(engine, VectorIndexConfig())
+
+        definition = _index_definition(test_session_factory)
+        assert definition is not None
+        assert "hnsw" in definition
+        assert "vector_cosine_ops" in definition
+
+    def test_行数がlistsに満たなければIVFFlatインデックスは作らない(
+        self, test_session_factory: sessionmaker[Session]
+    ) -> None:
+        engine = test_session_factory.kw["bind"]
+        config = VectorIndexConfig(method=VectorIndexMethod.IVFFLAT, lists=3)
+        repository = PostgresMemoRepository(test_session_factory, config)
+        repository.save(Memo(content="a", embedding=[1.0] + [0.0] * 383))
+
+        ensure_vector_index(engine, config)
+        assert _index_definition(test_session_factory) is None
+
+        for i in range(2):
+            repository.save(
+                Memo(content=f"b{i}", embedding=[0.0, 1.0 + i] + [0.0] * 382)
+            )
+        ensure_vector_index(engine, config)
+        definition = _index_definition(test_session_factory)
+        assert definition is not None
+        assert "ivfflat" in definition
+
+    def test_他のプロセスが構築中ならインデックスを作らない(
+        self, test_session_factory: sessionmaker[Session]
+    ) -> None:
+        engine = test_session_factory.kw["bind"]
+        holder = engine.execution_options(isolation_level="AUTOCOMMIT").connect()
+        try:
+            holder.execute(
+                text("SELECT pg_advisory_lock(hashtext(:name))"), {"name": INDEX_NAME}
+            )
+
+            ensure_vector_index(engine, VectorIndexConfig())
+
+            assert _index_definition(test_session_factory) is None
+        finally:
+            holder.close()
+
+        ensure_vector_index(engine, VectorIndexConfig())
+        assert _index_definition(test_session_factory) is not None
+
+    def test_無効なインデックスは作り直される(
+        self, test_session_factory: sessionmaker[Session]
+    ) -> None:
+        engine = test_session_factory.kw["bind"]
+        ensure_vector_index(engine, VectorIndexConfig())
+        with test_session_factory() as session:
+            session.execute(
+                text(
+                    "UPDATE pg_index SET indisvalid = false "
+                    "WHERE indexrelid = CAST(:name AS regclass)"
+                ),
+                {"name": INDEX_NAME},
+            )
+            session.commit()
+
+        ensure_vector_index(engine, VectorIndexConfig())
+
+        with test_session_factory() as session:
+            valid = session.execute(
+                text(
+                    "SELECT indisvalid FROM pg_index "
+                    "WHERE indexrelid = CAST(:name AS regclass)"
+                ),
+                {"name": INDEX_NAME},
+            ).scalar_one()
+        assert valid is True
+
+    def test_再構築でIVFFlatに切り替えられる(
+        self, test_session_factory: sessionmaker[Session]
+    ) -> None:
+        engine = test_session_factory.kw["bind"]
+        ensure_vector_index(engine, VectorIndexConfig())
+
+        rebuild_vector_index(
+            engine, VectorIndexConfig(method=VectorIndexMethod.IVFFLAT, lists=1)
+        )
+
+        definition = _index_definition(test_session_factory)
+        assert definition is not None
+        assert "ivfflat" in definition
+
+    @pytest.mark.parametrize("method", list(VectorIndexMethod))
+    def test_インデックス経由でもベクトル検索ができる(
+        self,
+        test_session_factory: sessionmaker[Session],
+        method: VectorIndexMethod,
+    ) -> None:
+        config = VectorIndexConfig(method=method, lists=1)
+        repository = PostgresMemoRepository(test_session_factory, config)
+        memo_a = Memo(content="a", embedding=[1.0] + [0.0] * 383)
+        memo_b = Memo(content="b", embedding=[0.0] + [1.0] + [0.0] * 382)
+        repository.save(memo_a)
+        repository.save(memo_b)
+        ensure_vector_index(test_session_factory.kw["bind"], config)
+
+        results = repository.search_by_vector([1.0] + [0.0] * 383, limit=1)
+
+        assert [m.content for m in results] == ["a"]
+
+    def test_halfvecインデックスで検索し元の精度で並べ直す(
+        self, test_session_factory: sessionmaker[Session]
+    ) -> None:
+        config = VectorIndexConfig(precision=VectorPrecision.FLOAT16)
+        rebuild_vector_index(test_session_factory.kw["bind"], config)
+        repository = PostgresMemoRepository(test_session_factory, config)
+        memo_a = Memo(content="a", embedding=[1.0] + [0.0] * 383)
+        memo_b = Memo(content="b", embedding=[0.0] + [1.0] + [0.0] * 382)
+        memo_c = Memo(content="c", embedding=[0.9, 0.1] + [0.0] * 382)
+        for memo in (memo_a, memo_b, memo_c):
+            repository.save(memo)
+
+        results = repository.search_by_vector([1.0] + [0.0] * 383, limit=2)
+
+        definition = _index_definition(test_session_factory)
+        assert definition is not None
+        assert "halfvec_cosine_ops" in definition
+        assert [m.content for m in results] == ["a", "c"]
+        assert results[1].embedding == pytest.approx([0.9, 0.1] + [0.0] * 382)
+
+    def test_int8はpgvectorでは指定できない(self) -> None:
+        with pytest.raises(ValueError, match="int8"):
+            VectorIndexConfig(precision=VectorPrecision.INT8)
+
+
+@pytest.mark.integration
+class TestMemoEdges:
+    def test_保存時に類似メモとのエッジが作られる(
+        self, repository: PostgresMemoRepository
+    ) -> None:
+        memo_a = Memo(content="a", embedding=[1.0] + [0.0] * 383)
+        memo_b = Memo(content="b", embedding=[0.9] + [0.1] + [0.0] * 382)
+        memo_c = Memo(content="c", embedding=[0.0] + [1.0] + [0.0] * 382)
+        for memo in (memo_a, memo_b, memo_c):
+            repository.save(memo)
+
+        graph = repository.get_similarity_graph(0.9, k=10)
+
+        assert graph is not None
+        memos, edges = graph
+        assert {m.id for m in memos} == {memo_a.id, memo_b.id, memo_c.id}
+        assert all(m.embedding is None for m in memos)
+        assert [{e.source_id, e.target_id} for e in edges] == [{memo_a.id, memo_b.id}]
+        assert edges[0].similarity > 0.99
+
+    def test_削除したメモのエッジはカスケードで消える(
+        self, repository: PostgresMemoRepository
+    ) -> None:
+        memo_a = Memo(content="a", embedding=[1.0] + [0.0] * 383)
+        memo_b = Memo(content="b", embedding=[1.0] + [0.01] + [0.0] * 382)
+        repository.save(memo_a)
+        repository.save(memo_b)
+
+        repository.delete(memo_a.id)
+
+        graph = repository.get_similarity_graph(0.5, k=10)
+        assert graph is not None
+        assert graph[1] == []
+
+    def test_下限未満の閾値ではNoneを返す(
+        self, repository: PostgresMemoRepository
+    ) -> None:
+        assert repository.get_similarity_graph(0.1, k=10) is None
+
+    def test_既存データからエッジを再構築できる(
+        self, test_session_factory: sessionmaker[Session]
+    ) -> None:
+        repository = PostgresMemoRepository(test_session_factory, edge_floor=0.9)
+        memo_a = Memo(content="a", embedding=[1.0] + [0.0] * 383)
+        memo_b = Memo(content="b", embedding=[1.0] + [0.2] + [0.0] * 382)
+        repository.save(memo_a)
+        repository.save(memo_b)
+
+        lowered = PostgresMemoRepository(test_session_factory, edge_floor=0.5)
+        assert lowered.get_similarity_graph(0.5, k=10) is None
+
+        lowered.rebuild_edges()
+
+        graph = lowered.get_similarity_graph(0.5, k=10)
+        assert graph is not None
+        assert len(graph[1]) == 1
+
+    def test_再構築はバッチをまたいで近傍をつなぎ上限数に収める(
+        self, test_session_factory: sessionmaker[Session]
+    ) -> None:
+        # Above every pair's similarity, so saving links nothing
+        writer = PostgresMemoRepository(test_session_factory, edge_floor=0.99999)
+        memos = [
+            Memo(content=str(i), embedding=[1.0] + [0.01 * i * i] + [0.0] * 382)
+            for i in range(5)
+        ]
+        writer.save_many(memos)
+        backfill = PostgresMemoRepository(
+            test_session_factory, edge_floor=0.5, edge_neighbours=1
+        )
+
+        backfill.rebuild_edges(batch_size=2)
+
+        graph = backfill.get_similarity_graph(0.5, k=1)
+        assert graph is not None
+        pairs = {frozenset((e.source_id, e.target_id)) for e in graph[1]}
+        # Each memo keeps its single nearest neighbour
+        assert pairs == {frozenset((memos[i].id, memos[i + 1].id)) for i in range(4)}
+
+    def test_kなしや近傍数を超えるkでは保存済みエッジを使わない(
+        self, test_session_factory: sessionmaker[Session]
+    ) -> None:
+        repository = PostgresMemoRepository(
+            test_session_factory, edge_floor=0.5, edge_neighbours=5
+        )
+
+        assert repository.get_similarity_graph(0.5) is None
+        assert repository.get_similarity_graph(0.5, k=6) is None
+        assert repository.get_similarity_graph(0.5, k=5) == ([], [])
+
+    def test_再保存しても他のメモが見つけたエッジは残る(
+        self, test_session_factory: sessionmaker[Session]
+    ) -> None:
+        repository = PostgresMemoRepository(
+            test_session_factory, edge_floor=0.5, edge_neighbours=1
+        )
+        memo_a = Memo(content="a", embedding=_angle_embedding(0))
+        memo_b = Memo(content="b", embedding=_angle_embedding(-3))
+        # c's nearest is a, but a's nearest is b
+        memo_c = Memo(content="c", embedding=_angle_embedding(7))
+        for memo in (memo_a, memo_b, memo_c):
+            repository.save(memo)
+
+        repository.save(memo_a.model_copy(update={"content": "a2"}))
+
+        graph = repository.get_similarity_graph(0.5, k=1)
+        assert graph is not None
+        pairs = {frozenset((e.source_id, e.target_id)) for e in graph[1]}
+        assert pairs == {
+            frozenset((memo_a.id, memo_b.id)),
+            frozenset((memo_a.id, memo_c.id)),
+        }
+
+    def test_再保存で他のメモが見つけたエッジの類似度が更新される(
+        self, test_session_factory: sessionmaker[Session]
+    ) -> None:
+        repository = PostgresMemoRepository(
+            test_session_factory, edge_floor=0.5, edge_neighbours=1
+        )
+        memo_a = Memo(content="a", embedding=_angle_embedding(0))
+        memo_b = Memo(content="b", embedding=_angle_embedding(-3))
+        memo_c = Memo(content="c", embedding=_angle_embedding(7))
+        for memo in (memo_a, memo_b, memo_c):
+            repository.save(memo)
+
+        repository.save(memo_a.model_copy(update={"embedding": _angle_embedding(-5)}))
+
+        graph = repository.get_similarity_graph(0.5, k=1)
+        assert graph is not None
+        similarity = {
+            frozenset((e.source_id, e.target_id)): e.similarity for e in graph[1]
+        }
+        assert similarity[frozenset((memo_a.id, memo_c.id))] == pytest.approx(
+            math.cos(math.radians(12)), abs=1e-4
+        )
+
+    def test_空のテーブルでは再構築なしでエッジを使える(
+        self, test_session_factory: sessionmaker[Session]
+    ) -> None:
+        repository = PostgresMemoRepository(test_session_factory, edge_floor=0.7)
+
+        assert repository.get_similarity_graph(0.7, k=10) == ([], [])
+
+    def test_一括保存でバッチ内外のエッジが作られる(
+        self, repository: PostgresMemoRepository
+    ) -> None:
+        existing = Memo(content="existing", embedding=[1.0] + [0.0] * 383)
+        repository.save(existing)
+        batch = [
+            Memo(content="near", embedding=[1.0] + [0.05] + [0.0] * 382),
+            Memo(content="nearer", embedding=[1.0] + [0.01] + [0.0] * 382),
+            Memo(content="far", embedding=[0.0] + [1.0] + [0.0] * 382),
+        ]
+
+        repository.save_many(batch)
+
+        assert len(repository.get_all()) == 4
+        graph = repository.get_similarity_graph(0.9, k=10)
+        assert graph is not None
+        pairs = {frozenset((e.source_id, e.target_id)) for e in graph[1]}
+        assert pairs == {
+            frozenset((existing.id, batch[0].id)),
+            frozenset((existing.id, batch[1].id)),
+            frozenset((batch[0].id, batch[1].id)),
+        }
+
+
+@pytest.mark.integration
+class TestSchemaUpgrades:
+    def test_既存テーブルに後から追加したインデックスを並行作成する(
+        self, test_session_factory: sessionmaker[Session]
+    ) -> None:
+        engine = test_session_factory.kw["bind"]
+        with engine.connect() as conn:
+            conn.execute(text("DROP INDEX ix_memos_created_at_id"))
+            conn.execute(text("DROP INDEX ix_memos_pending"))
+            conn.commit()
+
+        create_session_factory(TEST_DATABASE_URL, wait_for_index=True)
+
+        with engine.connect() as conn:
+            indexes = conn.execute(
+                text(
+                    "SELECT c.relname, i.indisvalid FROM pg_index i "
+                    "JOIN pg_class c ON c.oid = i.indexrelid "
+                    "WHERE c.relname IN ('ix_memos_created_at_id', 'ix_memos_pending')"
+                )
+            ).all()
+        assert sorted(tuple(row) for row in indexes) == [
+            ("ix_memos_created_at_id", True),
+            ("ix_memos_pending", True),
+        ]
@@ -0,0 +1,118 @@
+import json
+import os
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.application.memo.memo_usecase import MemoUsecase
+from app.di.memo import Container
+from app.presentation.memo.api.memo_api import app, get_container
+
+# Generous enough for a cold CI runner; heavy imports alone used to take ~7s
+_IMPORT_BUDGET_SECONDS = 4.0
+
+_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import app.presentation.memo.api.memo_api as api
+print(json.dumps({
+    "seconds": time.perf_counter() - started,
+    "built": api.container._memo_usecase is not None,
+    "loaded": [m for m in ("sklearn", "sentence_transformers", "torch", "anthropic")
+               if m in sys.modules],
+}))
+"""
+
+
+@pytest.fixture
+def no_external_services(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("DATABASE_URL", "")
+    monkeypatch.setenv("EMBEDDING_PROVIDER", "")
+
+
+@pytest.mark.unit
+class TestStartup:
+    def test_APIのimportは重い依存を読み込まない(self) -> None:
+        result = subprocess.run(
+            [sys.executable, "-c", _PROBE],
+            capture_output=True,
+            check=True,
+            cwd=Path(__file__).parents[3],
+            env={**os.environ, "DATABASE_URL": "", "EMBEDDING_PROVIDER": ""},
+            text=True,
+        )
+        probe = json.loads(result.stdout.strip().splitlines()[-1])
+
+        assert probe["loaded"] == []
+        assert probe["built"] is False
+        assert probe["seconds"] < _IMPORT_BUDGET_SECONDS
+
+
+@pytest.mark.unit
+class TestContainer:
+    def test_初回アクセスまで構築されない(self, no_external_services: None) -> None:
+        container = Container()
+
+        assert container.is_ready is False
+        assert container._memo_usecase is None
+
+        usecase = container.memo_usecase
+
+        assert container.memo_usecase is usecase
+
+    def test_ウォームアップ後にreadyになる(self, no_external_services: None) -> None:
+        container = Container()
+        client = TestClient(app)
+        app.dependency_overrides[get_container] = lambda: container
+        try:
+            assert client.get("/health/ready").status_code == 503
+
+            container.warmup()
+
+            response = client.get("/health/ready")
+            assert response.status_code == 200
+            assert response.json() == {"status": "ready"}
+        finally:
+            app.dependency_overrides.clear()
+
+    def test_ウォームアップに失敗しても再試行してreadyになる(
+        self, no_external_services: None, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        container = Container()
+        build = container._build
+        attempts: list[int] = []
+
+        def flaky_build() -> MemoUsecase:
+            attempts.append(1)
+            if len(attempts) < 3:
+                msg = "database is not up yet"
+                raise ConnectionError(msg)
+            return build()
+
+        monkeypatch.setattr(container, "_build", flaky_build)
+
+        container.warmup_with_retry(threading.Event(), initial_delay=0.01)
+
+        assert container.is_ready is True
+        assert len(attempts) == 3
+
+    def test_停止されると再試行をやめる(
+        self, no_external_services: None, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        container = Container()
+
+        def failing_build() -> MemoUsecase:
+            msg = "database is down"
+            raise ConnectionError(msg)
+
+        monkeypatch.setattr(container, "_build", failing_build)
+        stop = threading.Event()
+        stop.set()
+
+        container.warmup_with_retry(stop, initial_delay=10.0)
+
+        assert container.is_ready is False
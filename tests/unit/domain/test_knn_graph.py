@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+
+from app.domain.memo.services.knn_graph import (
+    approximate_knn_edges,
+    edge_recall,
+    exact_knn_edges,
+)
+from app.domain.memo.services.similarity import (
+    FloatMatrix,
+    normalize_rows,
+    threshold_pairs,
+)
+
+
+def _clustered_matrix(count: int, clusters: int, seed: int = 0) -> FloatMatrix:
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, 64))
+    labels = rng.integers(0, clusters, count)
+    return normalize_rows(centers[labels] + 0.5 * rng.standard_normal((count, 64)))
+
+
+@pytest.mark.unit
+class TestExactKnnGraph:
+    def test_kが十分大きければ閾値ペアと一致する(self) -> None:
+        matrix = _clustered_matrix(60, 4)
+
+        rows, cols, _ = exact_knn_edges(matrix, 0.3, k=60)
+        expected_rows, expected_cols, _ = threshold_pairs(matrix, 0.3)
+
+        assert rows.tolist() == expected_rows.tolist()
+        assert cols.tolist() == expected_cols.tolist()
+
+    def test_各ノードが選ぶ近傍はk件以下になる(self) -> None:
+        matrix = _clustered_matrix(200, 2)
+
+        rows, cols, sims = exact_knn_edges(matrix, 0.0, k=3)
+
+        # Each node picks at most k, so the edge count is bounded by n * k
+        assert len(rows) <= 200 * 3
+        assert np.all(rows < cols)
+        assert np.all(sims >= 0.0)
+        assert len(rows) < len(threshold_pairs(matrix, 0.0)[0])
+
+    def test_閾値未満のペアはエッジにならない(self) -> None:
+        matrix = normalize_rows([[1.0, 0.0], [0.0, 1.0]])
+
+        rows, _, _ = exact_knn_edges(matrix, 0.5, k=5)
+
+        assert rows.size == 0
+
+
+@pytest.mark.unit
+class TestApproximateKnnGraph:
+    def test_厳密版に対する再現率が高い(self) -> None:
+        matrix = _clustered_matrix(2000, 40)
+
+        exact = exact_knn_edges(matrix, 0.3, k=10)
+        approximate = approximate_knn_edges(matrix, 0.3, k=10)
+
+        assert edge_recall(approximate, exact, 2000) >= 0.9
+
+    def test_同じシードなら結果が再現する(self) -> None:
+        matrix = _clustered_matrix(300, 5)
+
+        first = approximate_knn_edges(matrix, 0.3, k=5, seed=7)
+        second = approximate_knn_edges(matrix, 0.3, k=5, seed=7)
+
+        assert first[0].tolist() == second[0].tolist()
+        assert first[1].tolist() == second[1].tolist()
+
+    def test_ノード数が2未満なら空になる(self) -> None:
+        rows, cols, sims = approximate_knn_edges(normalize_rows([[1.0, 0.0]]), 0.0, k=3)
+
+        assert rows.size == cols.size == sims.size == 0
+
+    def test_厳密版が空なら再現率は1(self) -> None:
+        empty = exact_knn_edges(normalize_rows([[1.0, 0.0], [0.0, 1.0]]), 0.9, k=1)
+
+        assert edge_recall(empty, empty, 2) == 1.0
@@ -4,6 +4,7 @@ from uuid import UUID, uuid4
 import pytest
 
 from app.domain.memo.entities.memo import Memo
+from app.domain.memo.repositories.memo_repository import MemoCursor
 
 
 @pytest.mark.unit
@@ -51,3 +52,16 @@ class TestMemo:
 
         assert memo.summary == "updated summary"
         assert memo.tags == ["new-tag"]
+
+
+@pytest.mark.unit
+class TestMemoCursor:
+    def test_エンコードしたカーソルを復元できる(self) -> None:
+        cursor = MemoCursor(created_at=datetime(2026, 2, 18, 12, 0, 0, 123), id=uuid4())
+
+        assert MemoCursor.decode(cursor.encode()) == cursor
+
+    @pytest.mark.parametrize("token", ["", "not base64!", "bm9waXBl"])
+    def test_不正なカーソルはValueErrorになる(self, token: str) -> None:
+        with pytest.raises(ValueError, match="Invalid cursor"):
+            MemoCursor.decode(token)
@@ -0,0 +1,83 @@
+import math
+import random
+
+import numpy as np
+import pytest
+
+from app.domain.memo.services.similarity import (
+    cosine_similarity,
+    normalize_rows,
+    pairwise_similarity,
+    query_similarity,
+    threshold_pairs,
+    top_k,
+)
+
+
+def _random_vectors(count: int, dim: int, seed: int = 0) -> list[list[float]]:
+    rng = random.Random(seed)
+    return [[rng.uniform(-1.0, 1.0) for _ in range(dim)] for _ in range(count)]
+
+
+@pytest.mark.unit
+class TestBatchSimilarity:
+    def test_正規化後の行ノルムが1になる(self) -> None:
+        matrix = normalize_rows([[3.0, 4.0], [0.0, 2.0]])
+
+        assert matrix.dtype == np.float32
+        assert np.allclose(np.linalg.norm(matrix, axis=1), 1.0)
+
+    def test_ゼロベクトルは類似度0になる(self) -> None:
+        matrix = normalize_rows([[0.0, 0.0], [1.0, 0.0]])
+
+        scores = query_similarity([1.0, 0.0], matrix)
+
+        assert scores[0] == 0.0
+        assert scores[1] == pytest.approx(1.0)
+
+    def test_ペアワイズ行列がスカラー版と一致する(self) -> None:
+        vectors = _random_vectors(6, 8)
+
+        sims = pairwise_similarity(normalize_rows(vectors))
+
+        for i in range(6):
+            for j in range(6):
+                expected = cosine_similarity(vectors[i], vectors[j])
+                assert sims[i, j] == pytest.approx(expected, abs=1e-5)
+
+    def test_閾値以上のペアだけが上三角で返る(self) -> None:
+        vectors = _random_vectors(40, 4, seed=1)
+        threshold = 0.5
+
+        rows, cols, sims = threshold_pairs(
+            normalize_rows(vectors), threshold, block_rows=7
+        )
+
+        expected = {
+            (i, j)
+            for i in range(40)
+            for j in range(i + 1, 40)
+            if cosine_similarity(vectors[i], vectors[j]) >= threshold + 1e-5
+        }
+        found = set(zip(rows.tolist(), cols.tolist(), strict=True))
+        assert expected <= found
+        assert all(i < j for i, j in found)
+        assert np.all(sims >= threshold)
+
+    def test_ペアが行優先順で返る(self) -> None:
+        vectors = [[1.0, 0.0], [math.cos(0.1), math.sin(0.1)], [1.0, 0.01]]
+
+        rows, cols, _ = threshold_pairs(normalize_rows(vectors), 0.9)
+
+        assert list(zip(rows.tolist(), cols.tolist(), strict=True)) == [
+            (0, 1),
+            (0, 2),
+            (1, 2),
+        ]
+
+    def test_top_kが類似度の降順で返る(self) -> None:
+        scores = np.array([0.1, 0.9, 0.5, 0.7], dtype=np.float32)
+
+        assert top_k(scores, 2).tolist() == [1, 3]
+        assert top_k(scores, 10).tolist() == [1, 3, 2, 0]
+        assert top_k(scores, 0).tolist() == []
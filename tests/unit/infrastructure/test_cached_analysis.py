@@ -0,0 +1,100 @@
+import asyncio
+import threading
+from pathlib import Path
+
+import pytest
+
+from app.domain.memo.services.ai_client import MemoAnalysisResult
+from app.infrastructure.memo.external.cached_analysis import (
+    CachedAIClient,
+    normalize_content,
+)
+from tests.conftest import CountingAIClient
+
+
+@pytest.mark.unit
+class TestCachedAIClient:
+    def test_同じ内容は一度だけ解析される(self) -> None:
+        inner = CountingAIClient()
+        client = CachedAIClient(inner)
+
+        first = client.analyze_memo("hello")
+        second = client.analyze_memo("hello")
+
+        assert first == second
+        assert inner.calls == ["hello"]
+        assert client.stats().hit_rate == 0.5
+
+    def test_空白や全角の違いは同じ内容とみなす(self) -> None:
+        inner = CountingAIClient()
+        client = CachedAIClient(inner)
+
+        client.analyze_memo("ＡＢＣ  memo\n")
+        client.analyze_memo("ABC memo")
+
+        assert inner.calls == ["ＡＢＣ  memo\n"]
+        assert normalize_content("ＡＢＣ  memo\n") == "ABC memo"
+
+    def test_プロンプトが変われば再解析される(self, tmp_path: Path) -> None:
+        path = tmp_path / "analysis.sqlite"
+        CachedAIClient(CountingAIClient("v1"), disk_path=path).analyze_memo("x")
+        inner = CountingAIClient("v2")
+
+        CachedAIClient(inner, disk_path=path).analyze_memo("x")
+
+        assert inner.calls == ["x"]
+
+    def test_ディスク層は再起動後も使われる(self, tmp_path: Path) -> None:
+        path = tmp_path / "analysis.sqlite"
+        original = CachedAIClient(CountingAIClient(), disk_path=path)
+        analysis = original.analyze_memo("persist")
+        inner = CountingAIClient()
+
+        restarted = CachedAIClient(inner, disk_path=path)
+
+        assert asyncio.run(restarted.analyze_memo_async("persist")) == analysis
+        assert inner.calls == []
+
+    def test_返り値を変更してもキャッシュは汚れない(self) -> None:
+        client = CachedAIClient(CountingAIClient())
+
+        client.analyze_memo("tags").tags.append("mutated")
+
+        assert client.analyze_memo("tags").tags == ["test-tag"]
+
+    def test_同時リクエストは一つの解析にまとめられる(self) -> None:
+        inner = CountingAIClient()
+        inner.gate.clear()
+        client = CachedAIClient(inner)
+        results: list[MemoAnalysisResult] = []
+        threads = [
+            threading.Thread(target=lambda: results.append(client.analyze_memo("x")))
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        while client.stats().coalesced < 3:
+            threading.Event().wait(0.01)
+        inner.gate.set()
+        for thread in threads:
+            thread.join(timeout=5)
+
+        assert inner.calls == ["x"]
+        assert len(results) == 4
+        assert all(r == results[0] for r in results)
+        assert len({id(r.tags) for r in results}) == 4
+
+    def test_非同期の同時リクエストもまとめられる(self) -> None:
+        inner = CountingAIClient()
+        client = CachedAIClient(inner)
+
+        async def scenario() -> list[MemoAnalysisResult]:
+            return await asyncio.gather(
+                *(client.analyze_memo_async("q") for _ in range(5))
+            )
+
+        results = asyncio.run(scenario())
+
+        assert inner.calls == ["q"]
+        assert client.stats().coalesced == 4
+        assert all(r == results[0] for r in results)
@@ -0,0 +1,156 @@
+import asyncio
+import threading
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from app.infrastructure.memo.external.cached_embedding import CachedEmbeddingClient
+from tests.conftest import StubEmbeddingClient
+
+
+class CountingEmbeddingClient(StubEmbeddingClient):
+    def __init__(self, model: str = "stub") -> None:
+        self.model = model
+        self.calls: list[str] = []
+        self.batches: list[list[str]] = []
+        self.async_batches: list[list[str]] = []
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def model_id(self) -> str:
+        return self.model
+
+    def embed(self, text: str) -> list[float]:
+        self.gate.wait(timeout=5)
+        self.calls.append(text)
+        return super().embed(text)
+
+    def embed_batch(self, texts: list[str]) -> list[list[float]]:
+        self.batches.append(texts)
+        return [StubEmbeddingClient.embed(self, t) for t in texts]
+
+    async def embed_batch_async(self, texts: list[str]) -> list[list[float]]:
+        self.async_batches.append(texts)
+        return [StubEmbeddingClient.embed(self, t) for t in texts]
+
+
+@pytest.mark.unit
+class TestCachedEmbeddingClient:
+    def test_同じテキストは一度だけ計算される(self) -> None:
+        inner = CountingEmbeddingClient()
+        cache = CachedEmbeddingClient(inner)
+
+        first = cache.embed("hello")
+        second = cache.embed("hello")
+
+        assert first == second
+        assert inner.calls == ["hello"]
+        stats = cache.stats()
+        assert (stats.hits, stats.misses) == (1, 1)
+        assert stats.hit_rate == 0.5
+
+    def test_LRUで古いエントリから追い出される(self) -> None:
+        inner = CountingEmbeddingClient()
+        cache = CachedEmbeddingClient(inner, max_entries=2)
+
+        cache.embed("a")
+        cache.embed("b")
+        cache.embed("a")
+        cache.embed("c")
+        cache.embed("a")
+        cache.embed("b")
+
+        assert inner.calls == ["a", "b", "c", "b"]
+        assert cache.stats().entries == 2
+
+    def test_モデルが違えば別のキーになる(self, tmp_path: Path) -> None:
+        path = tmp_path / "cache.sqlite"
+        CachedEmbeddingClient(CountingEmbeddingClient("m1"), disk_path=path).embed("x")
+        inner = CountingEmbeddingClient("m2")
+
+        CachedEmbeddingClient(inner, disk_path=path).embed("x")
+
+        assert inner.calls == ["x"]
+
+    def test_ディスク層は再起動後も使われる(self, tmp_path: Path) -> None:
+        path = tmp_path / "cache.sqlite"
+        original = CachedEmbeddingClient(CountingEmbeddingClient(), disk_path=path)
+        vector = original.embed("persist")
+        inner = CountingEmbeddingClient()
+        restarted = CachedEmbeddingClient(inner, disk_path=path)
+
+        assert restarted.embed("persist") == vector
+        assert inner.calls == []
+        assert restarted.stats().disk_hits == 1
+
+    def test_同時リクエストは一つの計算にまとめられる(self) -> None:
+        inner = CountingEmbeddingClient()
+        inner.gate.clear()
+        cache = CachedEmbeddingClient(inner)
+        results: list[list[float]] = []
+        threads = [
+            threading.Thread(target=lambda: results.append(cache.embed("same")))
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        while cache.stats().coalesced < 3:
+            threading.Event().wait(0.01)
+        inner.gate.set()
+        for thread in threads:
+            thread.join(timeout=5)
+
+        assert inner.calls == ["same"]
+        assert len(results) == 4
+        assert all(r == results[0] for r in results)
+
+    def test_非同期の同時リクエストもまとめられる(self) -> None:
+        inner = CountingEmbeddingClient()
+        cache = CachedEmbeddingClient(inner)
+
+        async def scenario() -> list[list[float]]:
+            return await asyncio.gather(*(cache.embed_async("q") for _ in range(5)))
+
+        results = asyncio.run(scenario())
+
+        assert inner.calls == ["q"]
+        assert cache.stats().coalesced == 4
+        assert all(r == results[0] for r in results)
+
+    def test_バッチは未キャッシュ分だけを一括計算する(self) -> None:
+        inner = CountingEmbeddingClient()
+        cache = CachedEmbeddingClient(inner)
+        cache.embed("a")
+
+        vectors = cache.embed_batch(["a", "b", "c", "b"])
+
+        assert inner.batches == [["b", "c"]]
+        assert vectors[1] == vectors[3]
+        assert vectors[0] == cache.embed("a")
+
+    def test_非同期バッチは未キャッシュ分だけを一度の非同期呼び出しで計算する(
+        self, tmp_path: Path
+    ) -> None:
+        inner = CountingEmbeddingClient()
+        cache = CachedEmbeddingClient(inner, disk_path=tmp_path / "cache.sqlite")
+        cache.embed("a")
+
+        vectors = asyncio.run(cache.embed_batch_async(["a", "b", "c", "b"]))
+
+        assert inner.async_batches == [["b", "c"]]
+        assert inner.batches == []
+        assert vectors[1] == vectors[3]
+        assert vectors == cache.embed_batch(["a", "b", "c", "b"])
+        assert cache.stats().misses == 3
+
+    def test_エントリはfloat32配列で保持される(self) -> None:
+        cache = CachedEmbeddingClient(CountingEmbeddingClient())
+
+        vector = cache.embed("compact")
+
+        entry = cache._cache.get(cache._key("compact"))
+        assert entry is not None
+        assert entry.dtype == np.float32
+        assert vector == entry.tolist()
+        assert cache.embed("compact") == vector
@@ -0,0 +1,104 @@
+import pytest
+
+from app.domain.memo.entities.memo import Memo
+from app.infrastructure.memo.external.context_packer import (
+    ContextBudget,
+    estimate_tokens,
+    pack_memos,
+    truncate_to_tokens,
+)
+
+
+@pytest.mark.unit
+class TestEstimateTokens:
+    def test_日本語は1文字1トークンで数える(self) -> None:
+        assert estimate_tokens("日本語のメモ") == 6
+
+    def test_英語は4文字で1トークンとして数える(self) -> None:
+        assert estimate_tokens("abcdefgh") == 2
+        assert estimate_tokens("") == 0
+
+
+@pytest.mark.unit
+class TestTruncateToTokens:
+    def test_上限内ならそのまま返す(self) -> None:
+        assert truncate_to_tokens("短いメモ", 10) == "短いメモ"
+
+    def test_文の区切りで切り詰める(self) -> None:
+        text = "最初の文です。二番目の文です。三番目の文はとても長く続きます"
+
+        truncated = truncate_to_tokens(text, 18)
+
+        assert truncated == "最初の文です。二番目の文です。…"
+        assert estimate_tokens(truncated) <= 18
+
+
+@pytest.mark.unit
+class TestPackMemos:
+    def test_予算内ならすべて全文で含める(self) -> None:
+        memos = [Memo(content="Python tips"), Memo(content="Rust tips")]
+
+        packed = pack_memos(memos, ContextBudget(total=1000))
+
+        assert packed.included == memos
+        assert "内容: Python tips" in packed.text
+        assert packed.tokens == estimate_tokens(packed.text)
+
+    def test_長いメモは要約で代替される(self) -> None:
+        memo = Memo(content="長" * 1000, summary="短い要約")
+
+        packed = pack_memos([memo], ContextBudget(per_memo=100))
+
+        assert "内容:" not in packed.text
+        assert "要約: 短い要約" in packed.text
+        assert packed.summarized == 1
+
+    def test_要約がなければ本文を切り詰める(self) -> None:
+        memo = Memo(content="長" * 1000)
+
+        packed = pack_memos([memo], ContextBudget(per_memo=200))
+
+        assert packed.truncated == 1
+        assert packed.tokens <= 200
+        assert packed.text.count("長") < 1000
+
+    def test_予算を超えた末尾は切り捨てられる(self) -> None:
+        memos = [Memo(content="あ" * 300) for _ in range(5)]
+
+        packed = pack_memos(memos, ContextBudget(total=1000, per_memo=512))
+
+        assert packed.included == memos[:3]
+        assert packed.dropped == 2
+        assert packed.tokens <= 1000
+
+    def test_上位ヒットに比べてスコアが低いメモは含めない(self) -> None:
+        memos = [Memo(content=f"memo {i}") for i in range(4)]
+
+        packed = pack_memos(
+            memos, ContextBudget(min_relative_score=0.5), scores=[0.8, 0.6, 0.39, 0.1]
+        )
+
+        assert packed.included == memos[:2]
+        assert packed.irrelevant == 2
+        assert packed.dropped == 0
+
+    def test_絶対スコアの下限を下回るメモは含めない(self) -> None:
+        memos = [Memo(content="weak"), Memo(content="weaker")]
+
+        packed = pack_memos(
+            memos,
+            ContextBudget(min_score=0.3, min_relative_score=0.0),
+            scores=[0.25, 0.2],
+        )
+
+        assert packed.included == []
+        assert packed.irrelevant == 2
+        assert packed.text == ""
+
+    def test_スコアがなければ予算だけで詰める(self) -> None:
+        memos = [Memo(content="a"), Memo(content="b")]
+
+        packed = pack_memos(memos, ContextBudget(min_score=0.9))
+
+        assert packed.included == memos
+        assert packed.irrelevant == 0
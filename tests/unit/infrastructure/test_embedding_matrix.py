@@ -0,0 +1,87 @@
+from uuid import uuid4
+
+import numpy as np
+import pytest
+
+from app.infrastructure.memo.db.embedding_matrix import EmbeddingMatrix
+
+
+@pytest.mark.unit
+class TestEmbeddingMatrix:
+    def test_行は正規化されたfloat32で保持される(self) -> None:
+        store = EmbeddingMatrix()
+        store.upsert(uuid4(), [3.0, 4.0])
+
+        assert store.matrix.dtype == np.float32
+        assert np.allclose(store.matrix, [[0.6, 0.8]])
+
+    def test_元のベクトルを復元できる(self) -> None:
+        store = EmbeddingMatrix()
+        memo_id = uuid4()
+        store.upsert(memo_id, [3.0, 4.0])
+
+        assert store.get(memo_id) == pytest.approx([3.0, 4.0])
+        assert store.get(uuid4()) is None
+
+    def test_削除は末尾行との入れ替えで詰められる(self) -> None:
+        store = EmbeddingMatrix()
+        a, b, c = uuid4(), uuid4(), uuid4()
+        store.upsert(a, [1.0, 0.0])
+        store.upsert(b, [0.0, 1.0])
+        store.upsert(c, [1.0, 1.0])
+
+        assert store.remove(a) is True
+
+        assert store.ids == [c, b]
+        assert store.get(c) == pytest.approx([1.0, 1.0])
+        assert len(store.matrix) == 2
+        assert store.remove(a) is False
+
+    def test_容量を超えても追加できる(self) -> None:
+        store = EmbeddingMatrix()
+        ids = [uuid4() for _ in range(200)]
+        for i, memo_id in enumerate(ids):
+            store.upsert(memo_id, [float(i + 1), 1.0])
+
+        assert len(store) == 200
+        assert store.get(ids[150]) == pytest.approx([151.0, 1.0])
+
+    def test_同じIDの更新は行を上書きする(self) -> None:
+        store = EmbeddingMatrix()
+        memo_id = uuid4()
+        store.upsert(memo_id, [1.0, 0.0])
+        store.upsert(memo_id, [0.0, 2.0])
+
+        assert len(store) == 1
+        assert store.get(memo_id) == pytest.approx([0.0, 2.0])
+
+    def test_総当たり検索が類似度順に返る(self) -> None:
+        store = EmbeddingMatrix()
+        a, b, c = uuid4(), uuid4(), uuid4()
+        store.upsert(a, [1.0, 0.0])
+        store.upsert(b, [0.0, 1.0])
+        store.upsert(c, [0.9, 0.1])
+
+        results = store.search([1.0, 0.0], 2)
+
+        assert [memo_id for memo_id, _ in results] == [a, c]
+        assert results[0][1] == pytest.approx(1.0)
+
+    def test_候補だけを厳密な類似度で並べ直す(self) -> None:
+        store = EmbeddingMatrix()
+        a, b, c = uuid4(), uuid4(), uuid4()
+        store.upsert(a, [1.0, 0.0])
+        store.upsert(b, [0.0, 1.0])
+        store.upsert(c, [0.9, 0.1])
+
+        results = store.rerank([1.0, 0.0], [b, c, uuid4()], 2)
+
+        assert [memo_id for memo_id, _ in results] == [c, b]
+        assert results[1][1] == pytest.approx(0.0)
+
+    def test_次元が異なるベクトルはエラーになる(self) -> None:
+        store = EmbeddingMatrix()
+        store.upsert(uuid4(), [1.0, 0.0])
+
+        with pytest.raises(ValueError, match="dimension"):
+            store.upsert(uuid4(), [1.0, 0.0, 0.0])
@@ -0,0 +1,106 @@
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import pytest
+
+from app.infrastructure.memo.external.embedding_pool import ProcessPoolEmbeddingClient
+from app.infrastructure.memo.external.micro_batcher import MicroBatcher
+from tests.conftest import StubEmbeddingClient
+
+
+class PidEmbeddingClient(StubEmbeddingClient):
+    """Deterministic across processes; the last value is the worker's PID."""
+
+    def embed(self, text: str) -> list[float]:
+        return [float(len(text)), 1.0, 0.0, float(os.getpid())]
+
+    def dimension(self) -> int:
+        return 4
+
+
+class RecordingDispatcher:
+    def __init__(self, delay: float = 0.0) -> None:
+        self.batches: list[list[str]] = []
+        self._delay = delay
+        self._executor = ThreadPoolExecutor(max_workers=2)
+
+    def __call__(self, texts: list[str]) -> Future[list[list[float]]]:
+        self.batches.append(texts)
+        return self._executor.submit(self._encode, texts)
+
+    def _encode(self, texts: list[str]) -> list[list[float]]:
+        time.sleep(self._delay)
+        return [[float(len(t))] for t in texts]
+
+
+@pytest.mark.unit
+class TestMicroBatcher:
+    def test_同時リクエストはまとめて処理される(self) -> None:
+        dispatcher = RecordingDispatcher(delay=0.05)
+        batcher = MicroBatcher(dispatcher, max_batch_size=8, max_in_flight=1)
+
+        futures = [batcher.submit("x" * n) for n in range(20)]
+        results = [f.result(timeout=5) for f in futures]
+        batcher.close()
+
+        assert results == [[float(n)] for n in range(20)]
+        assert all(len(batch) <= 8 for batch in dispatcher.batches)
+        assert len(dispatcher.batches) < 20
+
+    def test_単独のリクエストは待ち時間の上限で送られる(self) -> None:
+        batcher = MicroBatcher(RecordingDispatcher(), max_wait_ms=20)
+
+        started = time.monotonic()
+        batcher.submit("alone").result(timeout=5)
+        elapsed = time.monotonic() - started
+        batcher.close()
+
+        assert elapsed < 1.0
+
+    def test_処理の失敗はバッチ内の全リクエストに伝わる(self) -> None:
+        def dispatch(texts: list[str]) -> Future[list[list[float]]]:
+            future: Future[list[list[float]]] = Future()
+            future.set_exception(RuntimeError("model crashed"))
+            return future
+
+        batcher = MicroBatcher(dispatch)
+        futures = [batcher.submit(t) for t in ("a", "b")]
+
+        for future in futures:
+            with pytest.raises(RuntimeError, match="model crashed"):
+                future.result(timeout=5)
+        batcher.close()
+
+    def test_閉じた後は受け付けない(self) -> None:
+        batcher = MicroBatcher(RecordingDispatcher())
+        batcher.close()
+
+        with pytest.raises(RuntimeError):
+            batcher.submit("late")
+
+
+@pytest.mark.unit
+class TestProcessPoolEmbeddingClient:
+    def test_ワーカープロセスで埋め込みが計算される(self) -> None:
+        client = ProcessPoolEmbeddingClient(PidEmbeddingClient, workers=2)
+        try:
+            results: list[list[float]] = []
+            threads = [
+                threading.Thread(target=lambda t=t: results.append(client.embed(t)))
+                for t in ("a", "bb", "ccc", "dddd")
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join(timeout=30)
+
+            batch = client.embed_batch(["xy", "z"])
+        finally:
+            client.shutdown()
+
+        assert client.dimension() == 4
+        assert sorted(r[0] for r in results) == [1.0, 2.0, 3.0, 4.0]
+        assert [v[0] for v in batch] == [2.0, 1.0]
+        assert all(r[3] != os.getpid() for r in [*results, *batch])
@@ -0,0 +1,97 @@
+from uuid import UUID, uuid4
+
+import numpy as np
+import pytest
+
+from app.domain.memo.services.similarity import normalize_rows, top_k
+from app.infrastructure.memo.db.hnsw_index import HnswIndex, HnswParams
+from app.infrastructure.memo.db.quantization import VectorPrecision
+
+
+def _clustered_vectors(count: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((20, 32))
+    labels = rng.integers(0, 20, count)
+    return normalize_rows(centers[labels] + 0.5 * rng.standard_normal((count, 32)))
+
+
+def _build(vectors: np.ndarray, params: HnswParams) -> tuple[HnswIndex, list[UUID]]:
+    index = HnswIndex(params)
+    ids = [uuid4() for _ in range(len(vectors))]
+    for memo_id, vector in zip(ids, vectors, strict=True):
+        index.add(memo_id, vector.tolist())
+    return index, ids
+
+
+@pytest.mark.unit
+class TestHnswIndex:
+    def test_グラフ探索の結果が厳密検索とほぼ一致する(self) -> None:
+        vectors = _clustered_vectors(600)
+        index, ids = _build(vectors, HnswParams())
+        queries = _clustered_vectors(30, seed=1)
+
+        hits = 0
+        for query in queries:
+            expected = {ids[i] for i in top_k(vectors @ query, 5).tolist()}
+            found = {memo_id for memo_id, _ in index.search(query.tolist(), 5)}
+            hits += len(expected & found)
+
+        assert hits / (30 * 5) >= 0.95
+
+    @pytest.mark.parametrize(
+        "precision", [VectorPrecision.FLOAT16, VectorPrecision.INT8]
+    )
+    def test_低精度で保持しても厳密検索とほぼ一致する(
+        self, precision: VectorPrecision
+    ) -> None:
+        vectors = _clustered_vectors(600)
+        index, ids = _build(vectors, HnswParams(precision=precision))
+        queries = _clustered_vectors(30, seed=1)
+
+        hits = 0
+        for query in queries:
+            expected = {ids[i] for i in top_k(vectors @ query, 5).tolist()}
+            found = {memo_id for memo_id, _ in index.search(query.tolist(), 5)}
+            hits += len(expected & found)
+
+        assert hits / (30 * 5) >= 0.9
+
+    def test_削除したラベルは結果に含まれない(self) -> None:
+        vectors = _clustered_vectors(300)
+        index, ids = _build(vectors, HnswParams())
+
+        for memo_id in ids[:100]:
+            assert index.remove(memo_id) is True
+
+        found = {memo_id for memo_id, _ in index.search(vectors[0].tolist(), 20)}
+        assert len(index) == 200
+        assert found.isdisjoint(ids[:100])
+        assert index.remove(ids[0]) is False
+
+    def test_削除が過半数を超えても検索できる(self) -> None:
+        vectors = _clustered_vectors(200)
+        index, ids = _build(vectors, HnswParams())
+
+        for memo_id in ids[:150]:
+            index.remove(memo_id)
+
+        results = index.search(vectors[180].tolist(), 1)
+        assert results[0][0] == ids[180]
+
+    def test_同じラベルで追加するとベクトルが置き換わる(self) -> None:
+        index = HnswIndex()
+        memo_id = uuid4()
+        index.add(memo_id, [1.0, 0.0])
+        index.add(memo_id, [0.0, 1.0])
+
+        results = index.search([0.0, 1.0], 1)
+
+        assert len(index) == 1
+        assert results[0][1] == pytest.approx(1.0)
+
+    def test_次元が異なるベクトルはエラーになる(self) -> None:
+        index = HnswIndex()
+        index.add(uuid4(), [1.0, 0.0])
+
+        with pytest.raises(ValueError, match="dimension"):
+            index.add(uuid4(), [1.0, 0.0, 0.0])
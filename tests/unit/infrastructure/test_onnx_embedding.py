@@ -0,0 +1,60 @@
+import os
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from app.infrastructure.memo.external.onnx_embedding import (
+    QUANTIZED_MODEL_FILE,
+    OnnxEmbeddingClient,
+)
+
+pytest.importorskip("onnxruntime")
+pytest.importorskip("sentence_transformers")
+
+_SENTENCES = [
+    "Pythonの型ヒントについてのメモ",
+    "明日の会議は10時から",
+    "Rust ownership and borrowing rules",
+    "短い",
+]
+
+
+@pytest.fixture(scope="module")
+def model_dir(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    """``ONNX_MODEL_DIR`` if it holds an export, else a fresh export."""
+    configured = Path(os.environ.get("ONNX_MODEL_DIR", "models/onnx-minilm"))
+    if (configured / QUANTIZED_MODEL_FILE).exists():
+        return configured
+    from app.infrastructure.memo.external.onnx_export import export_quantized
+
+    output = tmp_path_factory.mktemp("onnx")
+    try:
+        export_quantized(output)
+    except OSError as exc:
+        pytest.skip(f"Model download unavailable: {exc}")
+    return output
+
+
+@pytest.mark.network
+class TestOnnxEmbeddingClient:
+    def test_PyTorch版とほぼ同じベクトルを返す(self, model_dir: Path) -> None:
+        from app.infrastructure.memo.external.local_embedding import (
+            LocalEmbeddingClient,
+        )
+
+        reference = np.array(LocalEmbeddingClient().embed_batch(_SENTENCES))
+        onnx = np.array(OnnxEmbeddingClient(model_dir).embed_batch(_SENTENCES))
+
+        assert onnx.shape == (len(_SENTENCES), 384)
+        cosine = (reference * onnx).sum(axis=1) / (
+            np.linalg.norm(reference, axis=1) * np.linalg.norm(onnx, axis=1)
+        )
+        assert cosine.min() > 0.98
+
+    def test_単体とバッチで同じ結果になる(self, model_dir: Path) -> None:
+        client = OnnxEmbeddingClient(model_dir)
+
+        batch = client.embed_batch(_SENTENCES)
+
+        np.testing.assert_allclose(client.embed(_SENTENCES[0]), batch[0], atol=1e-4)
@@ -0,0 +1,129 @@
+import asyncio
+import json
+import threading
+from collections.abc import Generator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.infrastructure.memo.external.openai_embedding import OpenAIEmbeddingClient
+
+
+class StubEmbeddingsServer(ThreadingHTTPServer):
+    """Minimal ``POST /v1/embeddings`` that records each request's inputs."""
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.requests: list[list[str]] = []
+        self.connections: set[int] = set()
+        self.failures_left = 0
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/v1"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: StubEmbeddingsServer
+
+    def do_POST(self) -> None:
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.connections.add(self.client_address[1])
+        if self.server.failures_left > 0:
+            self.server.failures_left -= 1
+            self._send(429, {"error": {"message": "rate limited"}}, retry=True)
+            return
+        inputs = body["input"] if isinstance(body["input"], list) else [body["input"]]
+        self.server.requests.append(inputs)
+        data = [
+            {"object": "embedding", "index": i, "embedding": [float(len(text)), 1.0]}
+            for i, text in reversed(list(enumerate(inputs)))
+        ]
+        self._send(
+            200,
+            {
+                "object": "list",
+                "data": data,
+                "model": body["model"],
+                "usage": {"prompt_tokens": 1, "total_tokens": 1},
+            },
+        )
+
+    def _send(self, status: int, payload: object, retry: bool = False) -> None:
+        raw = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(raw)))
+        if retry:
+            self.send_header("retry-after-ms", "10")
+        self.end_headers()
+        self.wfile.write(raw)
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+
+@pytest.fixture
+def server() -> Generator[StubEmbeddingsServer]:
+    server = StubEmbeddingsServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def make_client(server: StubEmbeddingsServer, **kwargs: int) -> OpenAIEmbeddingClient:
+    return OpenAIEmbeddingClient(
+        api_key="test", base_url=server.base_url, coalesce_wait_ms=50, **kwargs
+    )
+
+
+@pytest.mark.unit
+class TestOpenAIEmbeddingClient:
+    def test_同時のembedは一つのリクエストにまとめられる(
+        self, server: StubEmbeddingsServer
+    ) -> None:
+        client = make_client(server)
+
+        async def scenario() -> list[list[float]]:
+            texts = ["a", "bb", "ccc", "dddd"]
+            return await asyncio.gather(*(client.embed_async(t) for t in texts))
+
+        vectors = asyncio.run(scenario())
+        client.close()
+
+        assert [v[0] for v in vectors] == [1.0, 2.0, 3.0, 4.0]
+        assert len(server.requests) == 1
+        assert sorted(server.requests[0]) == ["a", "bb", "ccc", "dddd"]
+
+    def test_レート制限は再試行される(self, server: StubEmbeddingsServer) -> None:
+        server.failures_left = 2
+        client = make_client(server, max_retries=3)
+
+        vector = client.embed("retry")
+        client.close()
+
+        assert vector == [5.0, 1.0]
+        assert server.requests == [["retry"]]
+
+    def test_再試行の上限を超えるとエラーになる(
+        self, server: StubEmbeddingsServer
+    ) -> None:
+        server.failures_left = 5
+        client = make_client(server, max_retries=1)
+
+        with pytest.raises(Exception, match="rate limited"):
+            client.embed("give up")
+        client.close()
+
+    def test_接続は再利用される(self, server: StubEmbeddingsServer) -> None:
+        client = make_client(server, max_in_flight=1)
+
+        for text in ("one", "two", "three"):
+            client.embed(text)
+        client.close()
+
+        assert len(server.requests) == 3
+        assert len(server.connections) == 1
@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from app.domain.memo.services.similarity import normalize_rows
+from app.infrastructure.memo.db.quantization import CompactRows, VectorPrecision
+
+
+def _filled(precision: VectorPrecision, vectors: np.ndarray) -> CompactRows:
+    rows = CompactRows(vectors.shape[1], precision, capacity=len(vectors))
+    for row, unit in enumerate(vectors):
+        rows.set(row, unit)
+    return rows
+
+
+@pytest.mark.unit
+class TestCompactRows:
+    def test_float16は半分_int8は約4分の1のメモリで保持する(self) -> None:
+        vectors = normalize_rows(np.random.default_rng(0).standard_normal((100, 384)))
+
+        full = _filled(VectorPrecision.FLOAT32, vectors).nbytes
+        half = _filled(VectorPrecision.FLOAT16, vectors).nbytes
+        quarter = _filled(VectorPrecision.INT8, vectors).nbytes
+
+        assert half == full // 2
+        assert quarter == 100 * (384 + 4)
+
+    @pytest.mark.parametrize(
+        ("precision", "tolerance"),
+        [
+            (VectorPrecision.FLOAT32, 1e-6),
+            (VectorPrecision.FLOAT16, 1e-3),
+            (VectorPrecision.INT8, 1e-2),
+        ],
+    )
+    def test_類似度の誤差が精度ごとの許容範囲に収まる(
+        self, precision: VectorPrecision, tolerance: float
+    ) -> None:
+        rng = np.random.default_rng(1)
+        vectors = normalize_rows(rng.standard_normal((200, 384)))
+        query = normalize_rows(rng.standard_normal((1, 384)))[0]
+        rows = _filled(precision, vectors)
+
+        approx = rows.similarities(slice(0, 200), query)
+
+        assert np.abs(approx - vectors @ query).max() < tolerance
+
+    def test_int8でゼロベクトルはゼロのまま保持される(self) -> None:
+        rows = CompactRows(3, VectorPrecision.INT8, capacity=1)
+        rows.set(0, np.zeros(3, dtype=np.float32))
+
+        assert rows.decode([0]).tolist() == [[0.0, 0.0, 0.0]]
+
+    def test_同じベクトルは変更なしと判定される(self) -> None:
+        unit = normalize_rows([[3.0, 4.0]])[0]
+        rows = CompactRows(2, VectorPrecision.INT8, capacity=1)
+        rows.set(0, unit)
+
+        assert rows.equals(0, unit) is True
+        assert rows.equals(0, normalize_rows([[4.0, 3.0]])[0]) is False
+
+    def test_拡張しても既存の行が保たれる(self) -> None:
+        rows = CompactRows(2, VectorPrecision.FLOAT16, capacity=1)
+        rows.set(0, normalize_rows([[1.0, 0.0]])[0])
+
+        rows.resize(4)
+
+        assert len(rows) == 4
+        assert rows.decode([0]).tolist() == [[1.0, 0.0]]
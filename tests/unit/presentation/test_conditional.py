@@ -0,0 +1,36 @@
+import pytest
+
+from app.presentation.memo.api.conditional import (
+    etag_for,
+    is_not_modified,
+    not_modified,
+)
+
+
+@pytest.mark.unit
+class TestConditional:
+    def test_バージョンと種別から弱いETagを作る(self) -> None:
+        assert etag_for(7, "graph") == 'W/"graph-7"'
+        assert etag_for(None, "graph") is None
+
+    def test_If_None_Matchが一致すれば未更新とみなす(self) -> None:
+        etag = 'W/"memos-7"'
+
+        assert is_not_modified('W/"memos-7"', etag)
+        assert is_not_modified('"memos-7"', etag)
+        assert is_not_modified('W/"memos-6", W/"memos-7"', etag)
+        assert is_not_modified("*", etag)
+
+    def test_一致しないかヘッダやETagがなければ更新ありとみなす(self) -> None:
+        assert not is_not_modified('W/"memos-6"', 'W/"memos-7"')
+        assert not is_not_modified('W/"graph-7"', 'W/"memos-7"')
+        assert not is_not_modified(None, 'W/"memos-7"')
+        assert not is_not_modified("*", None)
+
+    def test_304は本文なしでETagを返す(self) -> None:
+        response = not_modified('W/"memos-7"', {"Vary": "Accept"})
+
+        assert response.status_code == 304
+        assert response.body == b""
+        assert response.headers["etag"] == 'W/"memos-7"'
+        assert response.headers["vary"] == "Accept"
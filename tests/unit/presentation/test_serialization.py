@@ -0,0 +1,182 @@
+import json
+import math
+import struct
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from app.application.memo.memo_usecase import (
+    Graph3DData,
+    Graph3DNode,
+    GraphData,
+    GraphEdge,
+    GraphNode,
+    Position3D,
+)
+from app.domain.memo.entities.memo import EnrichmentStatus, Memo
+from app.presentation.memo.api.serialization import (
+    GRAPH_3D_BINARY_VERSION,
+    Graph3DFlags,
+    graph_3d_binary,
+    graph_3d_json,
+    graph_json,
+    memos_json,
+)
+from app.presentation.memo.schemas.memo_schemas import (
+    Graph3DResponse,
+    GraphResponse,
+    MemoResponse,
+)
+
+_CREATED_AT = datetime(2026, 2, 18, 12, 0, 0, 123456)
+_EDGES = [GraphEdge(source="a", target="b", similarity=0.8123)]
+_HEADER = struct.Struct("<4sHHIIfI")
+
+
+def _graph_3d(recall: float | None = None) -> Graph3DData:
+    return Graph3DData(
+        nodes=[
+            Graph3DNode(
+                id=node_id,
+                label=node_id.upper(),
+                content=f"{node_id}の本文",
+                created_at=_CREATED_AT,
+                position=Position3D(x=i + 0.5, y=-1.25, z=2.0 * i),
+                tags=["t"],
+            )
+            for i, node_id in enumerate(["a", "b"])
+        ],
+        edges=_EDGES,
+        recall=recall,
+    )
+
+
+def _decode(body: bytes) -> dict[str, object]:
+    magic, version, flags, nodes, edges, recall, table_len = _HEADER.unpack_from(body)
+    offset = _HEADER.size
+    positions = np.frombuffer(body, "<f4", nodes * 3, offset).reshape(nodes, 3)
+    offset += positions.nbytes
+    sources = np.frombuffer(body, "<u4", edges, offset)
+    offset += sources.nbytes
+    targets = np.frombuffer(body, "<u4", edges, offset)
+    offset += targets.nbytes
+    similarities = np.frombuffer(body, "<f4", edges, offset)
+    offset += similarities.nbytes
+    assert len(body) == offset + table_len
+    return {
+        "magic": magic,
+        "version": version,
+        "flags": Graph3DFlags(flags),
+        "recall": recall,
+        "positions": positions,
+        "sources": sources,
+        "targets": targets,
+        "similarities": similarities,
+        "table": json.loads(body[offset:]),
+    }
+
+
+@pytest.mark.unit
+class TestFastSerialization:
+    def test_メモ一覧はMemoResponseと同じJSONになりembeddingを含まない(
+        self,
+    ) -> None:
+        memos = [
+            Memo(
+                content="メモ",
+                summary="要約",
+                tags=["t"],
+                embedding=[0.1, 0.2],
+                created_at=_CREATED_AT,
+                enrichment_status=EnrichmentStatus.PENDING,
+            ),
+            Memo(content="plain"),
+        ]
+
+        expected = [
+            json.loads(MemoResponse.model_validate(m.model_dump()).model_dump_json())
+            for m in memos
+        ]
+
+        assert json.loads(memos_json(memos)) == expected
+
+    def test_グラフはGraphResponseと同じJSONになる(self) -> None:
+        graph = GraphData(
+            nodes=[GraphNode(id="a", label="A", content="c", created_at=_CREATED_AT)],
+            edges=_EDGES,
+            recall=0.95,
+        )
+
+        expected = GraphResponse.model_validate(graph, from_attributes=True)
+
+        assert json.loads(graph_json(graph)) == json.loads(expected.model_dump_json())
+
+    def test_3DグラフはGraph3DResponseと同じJSONになる(self) -> None:
+        graph = Graph3DData(
+            nodes=[
+                Graph3DNode(
+                    id="a",
+                    label="A",
+                    content="c",
+                    created_at=_CREATED_AT,
+                    position=Position3D(x=0.5, y=-1.25, z=2.0),
+                    tags=["t"],
+                )
+            ],
+            edges=_EDGES,
+        )
+
+        expected = Graph3DResponse.model_validate(graph, from_attributes=True)
+
+        assert json.loads(graph_3d_json(graph)) == json.loads(
+            expected.model_dump_json()
+        )
+
+    def test_3DグラフはcontentなしのJSONにできる(self) -> None:
+        nodes = json.loads(graph_3d_json(_graph_3d(), include_content=False))["nodes"]
+
+        assert all("content" not in node for node in nodes)
+        assert [node["label"] for node in nodes] == ["A", "B"]
+
+
+@pytest.mark.unit
+class TestGraph3DBinary:
+    def test_座標と辺が型付き配列としてノード表と一緒に復元できる(self) -> None:
+        decoded = _decode(graph_3d_binary(_graph_3d(recall=0.9)))
+
+        assert decoded["magic"] == b"ACG3"
+        assert decoded["version"] == GRAPH_3D_BINARY_VERSION
+        assert decoded["flags"] == Graph3DFlags.HAS_CONTENT | Graph3DFlags.HAS_RECALL
+        assert decoded["recall"] == pytest.approx(0.9)
+        np.testing.assert_array_equal(
+            decoded["positions"], [[0.5, -1.25, 0.0], [1.5, -1.25, 2.0]]
+        )
+        assert decoded["sources"].tolist() == [0]
+        assert decoded["targets"].tolist() == [1]
+        assert decoded["similarities"][0] == pytest.approx(0.8123)
+        assert decoded["table"] == {
+            "ids": ["a", "b"],
+            "labels": ["A", "B"],
+            "tags": [["t"], ["t"]],
+            "created_at": [_CREATED_AT.isoformat()] * 2,
+            "content": ["aの本文", "bの本文"],
+        }
+
+    def test_contentを含めない場合はフラグと列が落ちる(self) -> None:
+        decoded = _decode(graph_3d_binary(_graph_3d(), include_content=False))
+
+        assert decoded["flags"] == Graph3DFlags(0)
+        assert math.isnan(decoded["recall"])
+        assert "content" not in decoded["table"]
+
+    def test_空のグラフはヘッダとノード表だけになる(self) -> None:
+        decoded = _decode(graph_3d_binary(Graph3DData()))
+
+        assert decoded["positions"].shape == (0, 3)
+        assert decoded["table"]["ids"] == []
+
+    def test_JSONより小さい(self) -> None:
+        graph = _graph_3d()
+
+        assert len(graph_3d_binary(graph)) < len(graph_3d_json(graph))
@@ -0,0 +1,240 @@
+import math
+import random
+import threading
+from collections.abc import Callable
+from uuid import UUID
+
+import pytest
+
+from app.application.memo.edge_cache import SimilarityEdgeCache
+from app.application.memo.memo_usecase import GraphEdge, MemoUsecase
+from app.domain.memo.entities.memo import Memo
+from app.domain.memo.services.embedding_client import IEmbeddingClient
+from app.domain.memo.services.similarity import FloatMatrix
+from app.infrastructure.memo.db.repositories.in_memory_memo_repository import (
+    InMemoryMemoRepository,
+)
+from tests.conftest import StubAIClient
+
+
+class AngleEmbeddingClient(IEmbeddingClient):
+    """Embeds content "<angle>" as a unit vector at that angle in the XY plane."""
+
+    def embed(self, text: str) -> list[float]:
+        rad = math.radians(float(text))
+        return [math.cos(rad), math.sin(rad), 0.0]
+
+    def dimension(self) -> int:
+        return 3
+
+
+@pytest.fixture
+def repository() -> InMemoryMemoRepository:
+    return InMemoryMemoRepository()
+
+
+@pytest.fixture
+def usecase(
+    repository: InMemoryMemoRepository, stub_ai_client: StubAIClient
+) -> MemoUsecase:
+    return MemoUsecase(
+        repository=repository,
+        ai_client=stub_ai_client,
+        embedding_client=AngleEmbeddingClient(),
+        edge_cache=SimilarityEdgeCache(),
+    )
+
+
+def _pairs(edges: list[GraphEdge]) -> set[frozenset[str]]:
+    return {frozenset((e.source, e.target)) for e in edges}
+
+
+@pytest.mark.unit
+class TestSimilarityEdgeCache:
+    @pytest.mark.parametrize(("threshold", "k"), [(0.2, None), (0.5, 3), (0.8, 1)])
+    def test_キャッシュ経由のエッジが再計算と一致する(
+        self,
+        repository: InMemoryMemoRepository,
+        stub_ai_client: StubAIClient,
+        threshold: float,
+        k: int | None,
+    ) -> None:
+        rng = random.Random(0)
+        for i in range(40):
+            vector = [rng.uniform(-1.0, 1.0) for _ in range(8)]
+            repository.save(Memo(content=f"m{i}", embedding=vector))
+        uncached = MemoUsecase(repository=repository, ai_client=stub_ai_client)
+        cached = MemoUsecase(
+            repository=repository,
+            ai_client=stub_ai_client,
+            edge_cache=SimilarityEdgeCache(),
+        )
+
+        expected = uncached.get_graph_data(threshold=threshold, k=k)
+        actual = cached.get_graph_data(threshold=threshold, k=k)
+
+        if k is None:
+            assert actual.edges == expected.edges
+        else:
+            assert _pairs(actual.edges) == _pairs(expected.edges)
+
+    def test_作成と更新と削除がエッジに反映される(self, usecase: MemoUsecase) -> None:
+        memo_a = usecase.create_memo("0")
+        assert usecase.get_graph_data(threshold=0.9).edges == []
+
+        memo_b = usecase.create_memo("10")
+        edges = usecase.get_graph_data(threshold=0.9).edges
+        assert _pairs(edges) == {frozenset((str(memo_a.id), str(memo_b.id)))}
+
+        usecase.update_memo(memo_b.id, "90")
+        assert usecase.get_graph_data(threshold=0.9).edges == []
+
+        memo_c = usecase.create_memo("5")
+        usecase.delete_memo(memo_a.id)
+        edges = usecase.get_graph_data(threshold=0.9).edges
+        assert edges == []
+        assert {n.id for n in usecase.get_graph_data(threshold=0.9).nodes} == {
+            str(memo_b.id),
+            str(memo_c.id),
+        }
+
+    def test_書き込みは全ペアの再計算をしない(
+        self, repository: InMemoryMemoRepository, stub_ai_client: StubAIClient
+    ) -> None:
+        cache = SimilarityEdgeCache()
+        usecase = MemoUsecase(
+            repository=repository,
+            ai_client=stub_ai_client,
+            embedding_client=AngleEmbeddingClient(),
+            edge_cache=cache,
+        )
+        for angle in range(5):
+            usecase.create_memo(str(angle))
+        usecase.get_graph_data(threshold=0.9)
+        floor = cache.floor
+
+        usecase.create_memo("3")
+
+        assert cache.floor == floor
+        assert len(cache) == 6
+        assert len(usecase.get_graph_data(threshold=0.9).edges) == 15
+
+    def test_リポジトリへの直接書き込みを検知して再構築する(
+        self, repository: InMemoryMemoRepository, usecase: MemoUsecase
+    ) -> None:
+        usecase.create_memo("0")
+        usecase.get_graph_data(threshold=0.9)
+
+        repository.save(Memo(content="direct", embedding=[1.0, 0.01, 0.0]))
+
+        graph = usecase.get_graph_data(threshold=0.9)
+        assert len(graph.nodes) == 2
+        assert len(graph.edges) == 1
+
+    def test_下限より低い閾値で読むと再構築される(self, usecase: MemoUsecase) -> None:
+        usecase.create_memo("0")
+        usecase.create_memo("60")
+        assert usecase.get_graph_data(threshold=0.9).edges == []
+
+        graph = usecase.get_graph_data(threshold=0.4)
+
+        assert len(graph.edges) == 1
+        assert graph.edges[0].similarity == pytest.approx(0.5, abs=1e-4)
+
+    def test_変更がなければグラフ読み込みでembeddingを読まない(
+        self, stub_ai_client: StubAIClient
+    ) -> None:
+        repository = _CountingMatrixRepository()
+        usecase = MemoUsecase(
+            repository=repository,
+            ai_client=stub_ai_client,
+            embedding_client=AngleEmbeddingClient(),
+            edge_cache=SimilarityEdgeCache(),
+        )
+        usecase.create_memo("0")
+        usecase.create_memo("10")
+        usecase.get_graph_data(threshold=0.9)
+        assert repository.matrix_reads == 1
+
+        usecase.create_memo("5")
+        graph = usecase.get_graph_data(threshold=0.9)
+
+        assert len(graph.edges) == 3
+        assert repository.matrix_reads == 1
+
+    @pytest.mark.parametrize("edge_cache", [SimilarityEdgeCache(), None])
+    def test_グラフ読み込みはメモ本体と一緒にembeddingを読まない(
+        self, stub_ai_client: StubAIClient, edge_cache: SimilarityEdgeCache | None
+    ) -> None:
+        usecase = MemoUsecase(
+            repository=_MetadataOnlyRepository(),
+            ai_client=stub_ai_client,
+            embedding_client=AngleEmbeddingClient(),
+            edge_cache=edge_cache,
+        )
+        usecase.create_memo("0")
+        usecase.create_memo("10")
+
+        graph = usecase.get_graph_data(threshold=0.9)
+
+        assert len(graph.edges) == 1
+
+    def test_再構築中の書き込みは再構築に上書きされない(
+        self, stub_ai_client: StubAIClient
+    ) -> None:
+        repository = _WriteDuringSnapshotRepository()
+        usecase = MemoUsecase(
+            repository=repository,
+            ai_client=stub_ai_client,
+            embedding_client=AngleEmbeddingClient(),
+            edge_cache=SimilarityEdgeCache(),
+        )
+        memo_a = usecase.create_memo("0")
+        memo_b = usecase.create_memo("90")
+        repository.during_snapshot = lambda: usecase.update_memo(memo_b.id, "5")
+
+        usecase.get_graph_data(threshold=0.9)
+        assert repository.writer is not None
+        repository.writer.join(timeout=5)
+
+        edges = usecase.get_graph_data(threshold=0.9).edges
+        assert _pairs(edges) == {frozenset((str(memo_a.id), str(memo_b.id)))}
+
+
+class _WriteDuringSnapshotRepository(InMemoryMemoRepository):
+    """Starts one concurrent write between the two reads of a graph snapshot."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.during_snapshot: Callable[[], object] | None = None
+        self.writer: threading.Thread | None = None
+
+    def get_all_metadata(self) -> list[Memo]:
+        if self.during_snapshot is not None:
+            self.writer = threading.Thread(target=self.during_snapshot)
+            self.during_snapshot = None
+            self.writer.start()
+            self.writer.join(timeout=0.2)
+        return super().get_all_metadata()
+
+
+class _MetadataOnlyRepository(InMemoryMemoRepository):
+    """Fails reads that materialise every memo's embedding."""
+
+    def get_all(self) -> list[Memo]:
+        msg = "get_all loads embeddings"
+        raise AssertionError(msg)
+
+
+class _CountingMatrixRepository(InMemoryMemoRepository):
+    """Counts reads of the embedding matrix."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.matrix_reads = 0
+
+    def get_embedding_matrix(
+        self, normalized: bool = True
+    ) -> tuple[list[UUID], FloatMatrix]:
+        self.matrix_reads += 1
+        return super().get_embedding_matrix(normalized)
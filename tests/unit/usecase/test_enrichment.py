@@ -0,0 +1,278 @@
+import threading
+from collections.abc import Callable, Generator
+
+import pytest
+
+from app.application.memo.enrichment import (
+    EnrichmentQueueFullError,
+    EnrichmentWorkerPool,
+)
+from app.application.memo.memo_usecase import MemoUsecase
+from app.domain.memo.entities.memo import EnrichmentStatus, Memo
+from app.domain.memo.services.ai_client import MemoAnalysisResult
+from app.infrastructure.memo.db.repositories.in_memory_memo_repository import (
+    InMemoryMemoRepository,
+)
+from tests.conftest import FailingAIClient, StubAIClient, StubEmbeddingClient
+
+
+class FlakyAIClient(StubAIClient):
+    """Fails the first ``failures`` analyses, then succeeds."""
+
+    def __init__(self, failures: int) -> None:
+        self.failures = failures
+        self.calls = 0
+
+    def analyze_memo(self, content: str) -> MemoAnalysisResult:
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise RuntimeError("temporary outage")
+        return super().analyze_memo(content)
+
+
+class EditDuringAnalysisAIClient(StubAIClient):
+    """Runs ``edit`` while the first analysis is in progress."""
+
+    def __init__(self, edit: Callable[[], None]) -> None:
+        self.edit: Callable[[], None] | None = edit
+
+    def analyze_memo(self, content: str) -> MemoAnalysisResult:
+        if self.edit is not None:
+            edit, self.edit = self.edit, None
+            edit()
+        return super().analyze_memo(content)
+
+
+@pytest.fixture
+def repository() -> InMemoryMemoRepository:
+    return InMemoryMemoRepository()
+
+
+@pytest.fixture
+def pool() -> Generator[EnrichmentWorkerPool]:
+    pool = EnrichmentWorkerPool(max_workers=2, max_attempts=3, backoff_seconds=0.0)
+    yield pool
+    pool.shutdown()
+
+
+@pytest.mark.unit
+class TestEnrichmentWorkerPool:
+    def test_失敗したジョブは再試行される(self, pool: EnrichmentWorkerPool) -> None:
+        attempts: list[int] = []
+
+        def job() -> None:
+            attempts.append(1)
+            if len(attempts) < 3:
+                raise RuntimeError("retry me")
+
+        pool.submit(job, on_failure=lambda _: None).result(timeout=5)
+
+        assert len(attempts) == 3
+
+    def test_再試行を使い切るとon_failureが呼ばれる(
+        self, pool: EnrichmentWorkerPool
+    ) -> None:
+        failures: list[Exception] = []
+
+        def job() -> None:
+            raise RuntimeError("always")
+
+        pool.submit(job, on_failure=failures.append).result(timeout=5)
+
+        assert [str(e) for e in failures] == ["always"]
+
+    def test_上限を超えて投入するとエラーになる(self) -> None:
+        pool = EnrichmentWorkerPool(max_workers=1, max_pending=1)
+        release = threading.Event()
+        pool.submit(release.wait, on_failure=lambda _: None)
+
+        with pytest.raises(EnrichmentQueueFullError):
+            pool.submit(lambda: None, on_failure=lambda _: None)
+
+        release.set()
+        pool.shutdown()
+
+    def test_一括投入は上限を超えた分も空きを待って実行される(self) -> None:
+        pool = EnrichmentWorkerPool(max_workers=1, max_pending=2)
+        ran: list[int] = []
+        jobs = [(lambda i=i: ran.append(i), lambda _: None) for i in range(5)]
+
+        pool.submit_many(jobs)
+        pool.shutdown()
+
+        assert ran == [0, 1, 2, 3, 4]
+
+    def test_一括投入は空きが1つもなければ何も入れない(self) -> None:
+        pool = EnrichmentWorkerPool(max_workers=1, max_pending=1)
+        release = threading.Event()
+        pool.submit(release.wait, on_failure=lambda _: None)
+        ran: list[int] = []
+
+        with pytest.raises(EnrichmentQueueFullError):
+            pool.submit_many([(lambda: ran.append(0), lambda _: None)])
+
+        release.set()
+        pool.shutdown()
+        assert ran == []
+
+
+@pytest.mark.unit
+class TestDeferredCreate:
+    def test_即座にpendingで保存されバックグラウンドで完了する(
+        self,
+        repository: InMemoryMemoRepository,
+        pool: EnrichmentWorkerPool,
+        stub_embedding_client: StubEmbeddingClient,
+    ) -> None:
+        usecase = MemoUsecase(
+            repository=repository,
+            ai_client=FlakyAIClient(failures=1),
+            embedding_client=stub_embedding_client,
+            enrichment_pool=pool,
+        )
+
+        memo = usecase.create_memo_deferred("later")
+        assert memo.enrichment_status is EnrichmentStatus.PENDING
+        assert memo.summary is None
+        pool.shutdown()
+
+        stored = repository.get_by_id(memo.id)
+        assert stored is not None
+        assert stored.enrichment_status is EnrichmentStatus.COMPLETED
+        assert stored.summary == "Summary of: later"
+        assert stored.embedding is not None
+
+    def test_再試行を使い切るとfailedになる(
+        self,
+        repository: InMemoryMemoRepository,
+        pool: EnrichmentWorkerPool,
+        failing_ai_client: FailingAIClient,
+    ) -> None:
+        usecase = MemoUsecase(
+            repository=repository,
+            ai_client=failing_ai_client,
+            enrichment_pool=pool,
+        )
+
+        memo = usecase.create_memo_deferred("doomed")
+        pool.shutdown()
+
+        stored = repository.get_by_id(memo.id)
+        assert stored is not None
+        assert stored.enrichment_status is EnrichmentStatus.FAILED
+        assert stored.content == "doomed"
+
+    def test_更新済みのメモは再エンリッチされない(
+        self, repository: InMemoryMemoRepository, stub_ai_client: StubAIClient
+    ) -> None:
+        usecase = MemoUsecase(repository=repository, ai_client=stub_ai_client)
+        memo = usecase.create_memo("original")
+        usecase.update_memo(memo.id, "edited")
+
+        assert usecase.enrich_memo(memo.id) is None
+        stored = repository.get_by_id(memo.id)
+        assert stored is not None
+        assert stored.summary == "Summary of: edited"
+
+    def test_解析中に編集されたメモはエンリッチ結果で上書きされない(
+        self, repository: InMemoryMemoRepository
+    ) -> None:
+        draft = Memo(content="draft", enrichment_status=EnrichmentStatus.PENDING)
+        repository.save(draft)
+        edited = draft.model_copy(
+            update={
+                "content": "edited",
+                "summary": "手動",
+                "enrichment_status": EnrichmentStatus.COMPLETED,
+            }
+        )
+        usecase = MemoUsecase(
+            repository=repository,
+            ai_client=EditDuringAnalysisAIClient(lambda: repository.save(edited)),
+        )
+
+        assert usecase.enrich_memo(draft.id) is None
+        stored = repository.get_by_id(draft.id)
+        assert stored is not None
+        assert stored.content == "edited"
+        assert stored.summary == "手動"
+
+    def test_再起動で失われたpendingのメモを再投入して完了させる(
+        self, repository: InMemoryMemoRepository, stub_ai_client: StubAIClient
+    ) -> None:
+        left_over = [
+            Memo(content=c, enrichment_status=EnrichmentStatus.PENDING)
+            for c in ("one", "two", "three")
+        ]
+        for memo in left_over:
+            repository.save(memo)
+        repository.save(Memo(content="done"))
+        # One slot: the rest wait instead of failing with a full queue
+        pool = EnrichmentWorkerPool(max_workers=1, max_pending=1)
+        usecase = MemoUsecase(
+            repository=repository, ai_client=stub_ai_client, enrichment_pool=pool
+        )
+
+        queued = usecase.resume_pending_enrichment()
+        pool.shutdown()
+
+        assert queued == 3
+        assert repository.get_pending_ids() == []
+        for memo in left_over:
+            stored = repository.get_by_id(memo.id)
+            assert stored is not None
+            assert stored.summary == f"Summary of: {memo.content}"
+
+    def test_一括の遅延作成は全件pendingで保存され個別に完了する(
+        self,
+        repository: InMemoryMemoRepository,
+        pool: EnrichmentWorkerPool,
+        stub_ai_client: StubAIClient,
+    ) -> None:
+        usecase = MemoUsecase(
+            repository=repository, ai_client=stub_ai_client, enrichment_pool=pool
+        )
+
+        memos = usecase.create_memos_deferred(["a", "b", "c"])
+        assert all(m.enrichment_status is EnrichmentStatus.PENDING for m in memos)
+        pool.shutdown()
+
+        statuses = [repository.get_by_id(m.id) for m in memos]
+        assert all(
+            s is not None and s.enrichment_status is EnrichmentStatus.COMPLETED
+            for s in statuses
+        )
+
+    def test_キューより大きい一括作成も全件完了する(
+        self, repository: InMemoryMemoRepository, stub_ai_client: StubAIClient
+    ) -> None:
+        pool = EnrichmentWorkerPool(max_workers=1, max_pending=2)
+        usecase = MemoUsecase(
+            repository=repository, ai_client=stub_ai_client, enrichment_pool=pool
+        )
+
+        memos = usecase.create_memos_deferred([str(i) for i in range(7)])
+        pool.shutdown()
+
+        assert repository.get_pending_ids() == []
+        assert len(memos) == len(repository.get_all()) == 7
+
+    def test_キューに空きがなければ一括作成は一度の削除で何も残さない(
+        self, repository: InMemoryMemoRepository, stub_ai_client: StubAIClient
+    ) -> None:
+        pool = EnrichmentWorkerPool(max_workers=1, max_pending=1)
+        release = threading.Event()
+        pool.submit(release.wait, on_failure=lambda _: None)
+        usecase = MemoUsecase(
+            repository=repository, ai_client=stub_ai_client, enrichment_pool=pool
+        )
+        before = repository.version()
+
+        with pytest.raises(EnrichmentQueueFullError):
+            usecase.create_memos_deferred(["a", "b", "c"])
+
+        release.set()
+        pool.shutdown()
+        assert repository.get_all() == []
+        # One bump for the batch save and one for the bulk rollback
+        assert repository.version() == before + 2
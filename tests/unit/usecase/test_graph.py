@@ -2,8 +2,9 @@ import math
 
 import pytest
 
-from app.application.memo.memo_usecase import MemoUsecase
+from app.application.memo.memo_usecase import GraphMode, MemoUsecase
 from app.domain.memo.entities.memo import Memo
+from app.domain.memo.repositories.memo_repository import SimilarityEdge
 from app.infrastructure.memo.db.repositories.in_memory_memo_repository import (
     InMemoryMemoRepository,
 )
@@ -99,3 +100,106 @@ class TestGraphData:
         # threshold=0.9 -> edge removed
         graph_high = usecase.get_graph_data(threshold=0.9)
         assert len(graph_high.edges) == 0
+
+
+@pytest.mark.unit
+class TestKnnGraphMode:
+    def test_kを指定すると各メモの近傍数が制限される(
+        self, repository: InMemoryMemoRepository, usecase: MemoUsecase
+    ) -> None:
+        # Five memos within 4 degrees of each other: every pair clears 0.7
+        for angle in range(5):
+            repository.save(Memo(content=f"m{angle}", embedding=_unit_vector(angle)))
+
+        full = usecase.get_graph_data(threshold=0.7)
+        capped = usecase.get_graph_data(threshold=0.7, k=1)
+
+        assert len(full.edges) == 10
+        assert 0 < len(capped.edges) <= 5
+        assert capped.recall is None
+
+    def test_近似モードで再現率が報告される(
+        self, repository: InMemoryMemoRepository, usecase: MemoUsecase
+    ) -> None:
+        for angle in range(0, 360, 15):
+            repository.save(Memo(content=f"m{angle}", embedding=_unit_vector(angle)))
+
+        graph = usecase.get_graph_data(
+            threshold=0.7,
+            mode=GraphMode.APPROXIMATE,
+            k=2,
+            measure_recall=True,
+        )
+
+        assert graph.recall is not None
+        assert 0.0 <= graph.recall <= 1.0
+        assert len(graph.edges) > 0
+        assert all(e.similarity >= 0.7 for e in graph.edges)
+
+    def test_再現率は要求しなければ計算されない(
+        self, repository: InMemoryMemoRepository, usecase: MemoUsecase
+    ) -> None:
+        repository.save(Memo(content="a", embedding=_unit_vector(0)))
+        repository.save(Memo(content="b", embedding=_unit_vector(5)))
+
+        graph = usecase.get_graph_data(threshold=0.7, mode=GraphMode.APPROXIMATE)
+
+        assert graph.recall is None
+        assert len(graph.edges) == 1
+
+
+class _PrecomputedEdgeRepository(InMemoryMemoRepository):
+    """Serves edges from a fixed list, like a repository with a stored table."""
+
+    def __init__(self, edges: list[SimilarityEdge]) -> None:
+        super().__init__()
+        self.edges = edges
+
+    def get_similarity_graph(
+        self, threshold: float, k: int | None = None
+    ) -> tuple[list[Memo], list[SimilarityEdge]] | None:
+        memos = [
+            m.model_copy(update={"embedding": None})
+            for m in self.get_all()
+            if m.embedding is not None
+        ]
+        return memos, [e for e in self.edges if e.similarity >= threshold]
+
+
+@pytest.mark.unit
+class TestPrecomputedEdges:
+    def test_リポジトリの保存済みエッジが使われる(
+        self, stub_ai_client: StubAIClient
+    ) -> None:
+        memo_a = Memo(content="a", embedding=_unit_vector(0))
+        memo_b = Memo(content="b", embedding=_unit_vector(90))
+        repository = _PrecomputedEdgeRepository(
+            [SimilarityEdge(source_id=memo_a.id, target_id=memo_b.id, similarity=0.8)]
+        )
+        repository.save(memo_a)
+        repository.save(memo_b)
+        usecase = MemoUsecase(repository=repository, ai_client=stub_ai_client)
+
+        graph = usecase.get_graph_data(threshold=0.7)
+
+        assert len(graph.edges) == 1
+        assert graph.edges[0].similarity == 0.8
+        assert usecase.get_graph_data(threshold=0.9).edges == []
+
+    def test_埋め込みなしの保存済みグラフでも3D座標を計算できる(
+        self, stub_ai_client: StubAIClient
+    ) -> None:
+        repository = _PrecomputedEdgeRepository([])
+        for angle in (0, 45, 90):
+            repository.save(Memo(content=str(angle), embedding=_unit_vector(angle)))
+        usecase = MemoUsecase(repository=repository, ai_client=stub_ai_client)
+        received: list[list[float]] = []
+
+        def reduce_fn(vectors: list[list[float]]) -> list[dict[str, float]]:
+            received.extend(vectors)
+            return [{"x": v[0], "y": v[1], "z": v[2]} for v in vectors]
+
+        graph = usecase.get_graph_3d_data(reduce_fn=reduce_fn, threshold=0.7)
+
+        assert len(graph.nodes) == 3
+        assert len(received) == 3
@@ -1,9 +1,11 @@
 import math
+from uuid import UUID
 
 import pytest
 
 from app.application.memo.memo_usecase import MemoUsecase
 from app.domain.memo.entities.memo import Memo
+from app.domain.memo.services.similarity import FloatMatrix
 from app.infrastructure.memo.db.repositories.in_memory_memo_repository import (
     InMemoryMemoRepository,
 )
@@ -127,3 +129,28 @@ class TestGraph3DData:
         edges_2d = {(e.source, e.target, e.similarity) for e in graph_2d.edges}
         edges_3d = {(e.source, e.target, e.similarity) for e in graph_3d.edges}
         assert edges_2d == edges_3d
+
+    def test_3Dグラフは埋め込み行列を一度だけ読む(
+        self, stub_ai_client: StubAIClient
+    ) -> None:
+        repository = _CountingMatrixRepository()
+        usecase = MemoUsecase(repository=repository, ai_client=stub_ai_client)
+        for angle in (0, 10, 90):
+            repository.save(Memo(content=str(angle), embedding=_unit_vector(angle)))
+
+        graph = usecase.get_graph_3d_data(reduce_fn=reduce_to_3d, threshold=0.9)
+
+        assert len(graph.nodes) == 3
+        assert repository.matrix_reads == 1
+
+
+class _CountingMatrixRepository(InMemoryMemoRepository):
+    def __init__(self) -> None:
+        super().__init__()
+        self.matrix_reads = 0
+
+    def get_embedding_matrix(
+        self, normalized: bool = True
+    ) -> tuple[list[UUID], FloatMatrix]:
+        self.matrix_reads += 1
+        return super().get_embedding_matrix(normalized)
@@ -1,13 +1,23 @@
-from uuid import uuid4
+import asyncio
+from collections.abc import AsyncIterator
+from datetime import datetime, timedelta
+from uuid import UUID, uuid4
 
 import pytest
 
 from app.application.memo.memo_usecase import MemoUsecase
+from app.domain.memo.entities.memo import Memo
 from app.domain.memo.repositories.memo_repository import IMemoRepository
+from app.domain.memo.services.ai_client import MemoAnalysisResult, SearchResult
 from app.infrastructure.memo.db.repositories.in_memory_memo_repository import (
     InMemoryMemoRepository,
 )
-from tests.conftest import FailingAIClient, StubAIClient
+from tests.conftest import (
+    CountingAIClient,
+    FailingAIClient,
+    StubAIClient,
+    StubEmbeddingClient,
+)
 
 
 @pytest.fixture
@@ -76,6 +86,77 @@ class TestGetMemos:
         assert result is None
 
 
+@pytest.mark.unit
+class TestGetMemoPage:
+    def test_カーソルをたどると全件を新しい順に重複なく取得できる(
+        self, usecase: MemoUsecase, repository: InMemoryMemoRepository
+    ) -> None:
+        base = datetime(2026, 1, 1)
+        memos = [
+            Memo(content=str(i), created_at=base + timedelta(minutes=i // 2))
+            for i in range(7)
+        ]
+        for memo in memos:
+            repository.save(memo)
+
+        pages = [usecase.get_memo_page(3)]
+        while pages[-1].next_cursor is not None:
+            pages.append(usecase.get_memo_page(3, pages[-1].next_cursor))
+
+        seen = [m.id for page in pages for m in page.memos]
+        expected = sorted(memos, key=lambda m: (m.created_at, m.id), reverse=True)
+        assert [len(page.memos) for page in pages] == [3, 3, 1]
+        assert seen == [m.id for m in expected]
+
+    def test_ページのメモはembeddingを含まない(
+        self, usecase: MemoUsecase, repository: InMemoryMemoRepository
+    ) -> None:
+        repository.save(Memo(content="vector", embedding=[1.0, 0.0]))
+
+        page = usecase.get_memo_page(10)
+
+        assert [m.embedding for m in page.memos] == [None]
+        assert repository.get_all_metadata()[0].embedding is None
+
+    def test_ちょうど割り切れる場合は最終ページにカーソルがない(
+        self, usecase: MemoUsecase
+    ) -> None:
+        usecase.create_memo("a")
+        usecase.create_memo("b")
+
+        page = usecase.get_memo_page(2)
+
+        assert len(page.memos) == 2
+        assert page.next_cursor is None
+
+    def test_ページ間で削除されたメモがあっても続きから取得できる(
+        self, usecase: MemoUsecase
+    ) -> None:
+        created = [usecase.create_memo(str(i)) for i in range(4)]
+        first = usecase.get_memo_page(2)
+        assert first.next_cursor is not None
+
+        usecase.delete_memo(first.memos[-1].id)
+        second = usecase.get_memo_page(2, first.next_cursor)
+
+        assert {m.id for m in first.memos} | {m.id for m in second.memos} == {
+            m.id for m in created
+        }
+
+    def test_作成日時を変えて保存すると並び順が更新される(
+        self, repository: InMemoryMemoRepository
+    ) -> None:
+        memo = Memo(content="moved", created_at=datetime(2026, 1, 1))
+        other = Memo(content="other", created_at=datetime(2026, 1, 2))
+        repository.save(memo)
+        repository.save(other)
+
+        repository.save(memo.model_copy(update={"created_at": datetime(2026, 1, 3)}))
+
+        page = repository.get_page(10)
+        assert [m.content for m in page.memos] == ["moved", "other"]
+
+
 @pytest.mark.unit
 class TestUpdateMemo:
     def test_メモ内容を更新するとAI再解析される(self, usecase: MemoUsecase) -> None:
@@ -109,6 +190,60 @@ class TestDeleteMemo:
         assert result is False
 
 
+@pytest.mark.unit
+class TestDatasetVersion:
+    def test_作成と更新と削除のたびにバージョンが増える(
+        self, usecase: MemoUsecase, repository: InMemoryMemoRepository
+    ) -> None:
+        versions = [repository.version()]
+        memo = usecase.create_memo("v1")
+        versions.append(repository.version())
+        usecase.update_memo(memo.id, "v2")
+        versions.append(repository.version())
+        usecase.delete_memo(memo.id)
+        versions.append(repository.version())
+
+        assert versions == sorted(set(versions))
+        assert usecase.get_dataset_version() == versions[-1]
+
+    def test_読み取りや変更のない操作ではバージョンが変わらない(
+        self, usecase: MemoUsecase
+    ) -> None:
+        memo = usecase.create_memo("same")
+        before = usecase.get_dataset_version()
+
+        usecase.get_memo_page(10)
+        usecase.get_graph_data()
+        usecase.update_memo(memo.id, "same")
+        usecase.delete_memo(uuid4())
+
+        assert usecase.get_dataset_version() == before
+
+    def test_バージョンは書き込みが終わってから進む(
+        self, repository: InMemoryMemoRepository
+    ) -> None:
+        memo = Memo(content="a", embedding=[1.0, 0.0])
+        before = repository.version()
+        seen: list[int] = []
+        add = repository._index.add
+
+        def observe(memo_id: UUID, vector: list[float]) -> None:
+            seen.append(repository.version())
+            add(memo_id, vector)
+
+        repository._index.add = observe  # type: ignore[method-assign]
+        repository.save(memo)
+
+        assert seen == [before]
+        assert repository.version() == before + 1
+
+    def test_再起動したリポジトリは以前のバージョンを再発行しない(self) -> None:
+        first = InMemoryMemoRepository()
+        first.save(Memo(content="a"))
+
+        assert InMemoryMemoRepository().version() > first.version()
+
+
 @pytest.mark.unit
 class TestSearchMemos:
     def test_検索クエリでAI検索結果が返る(self, usecase: MemoUsecase) -> None:
@@ -134,3 +269,270 @@ class TestSearchMemos:
 
         with pytest.raises(RuntimeError, match="AI service unavailable"):
             usecase.search_memos("query")
+
+    def test_検索結果の類似度スコアがAIクライアントに渡る(
+        self,
+        repository: InMemoryMemoRepository,
+        stub_embedding_client: StubEmbeddingClient,
+    ) -> None:
+        ai_client = ScoreRecordingAIClient()
+        usecase = MemoUsecase(
+            repository=repository,
+            ai_client=ai_client,
+            embedding_client=stub_embedding_client,
+        )
+        usecase.create_memo("Python tips")
+        usecase.create_memo("Docker guide")
+
+        usecase.search_memos("Python tips")
+        asyncio.run(usecase.search_memos_async("Python tips"))
+
+        assert len(ai_client.scores) == 2
+        for scores in ai_client.scores:
+            assert scores is not None
+            assert len(scores) == 2
+            assert scores[0] == pytest.approx(1.0, abs=1e-5)
+            assert scores == sorted(scores, reverse=True)
+
+
+class ScoreRecordingAIClient(StubAIClient):
+    def __init__(self) -> None:
+        self.scores: list[list[float] | None] = []
+
+    def search_memos(
+        self, query: str, memos: list[Memo], scores: list[float] | None = None
+    ) -> SearchResult:
+        self.scores.append(scores)
+        return super().search_memos(query, memos, scores)
+
+
+class RendezvousAIClient(StubAIClient):
+    """Finishes analysis only once embedding has started, or times out."""
+
+    def __init__(self, embedding_started: asyncio.Event) -> None:
+        self._embedding_started = embedding_started
+
+    async def analyze_memo_async(self, content: str) -> MemoAnalysisResult:
+        await asyncio.wait_for(self._embedding_started.wait(), timeout=1.0)
+        return self.analyze_memo(content)
+
+
+class SignallingEmbeddingClient(StubEmbeddingClient):
+    def __init__(self, started: asyncio.Event) -> None:
+        self._started = started
+
+    async def embed_async(self, text: str) -> list[float]:
+        self._started.set()
+        await asyncio.sleep(0)
+        return self.embed(text)
+
+
+@pytest.mark.unit
+class TestAsyncWrites:
+    def test_解析と埋め込みが並行して実行される(
+        self, repository: InMemoryMemoRepository
+    ) -> None:
+        async def scenario() -> None:
+            started = asyncio.Event()
+            usecase = MemoUsecase(
+                repository=repository,
+                ai_client=RendezvousAIClient(started),
+                embedding_client=SignallingEmbeddingClient(started),
+            )
+
+            memo = await usecase.create_memo_async("concurrent")
+
+            assert memo.summary is not None
+            assert memo.embedding is not None
+
+        asyncio.run(scenario())
+        assert len(repository.get_all()) == 1
+
+    def test_非同期更新で内容と解析結果が反映される(
+        self, usecase: MemoUsecase, repository: InMemoryMemoRepository
+    ) -> None:
+        memo = usecase.create_memo("original")
+
+        updated = asyncio.run(usecase.update_memo_async(memo.id, "updated"))
+
+        assert updated is not None
+        stored = repository.get_by_id(memo.id)
+        assert stored is not None
+        assert stored.content == "updated"
+        assert stored.summary == "Summary of: updated"
+
+    def test_存在しないIDの非同期更新はNoneを返す(self, usecase: MemoUsecase) -> None:
+        assert asyncio.run(usecase.update_memo_async(uuid4(), "content")) is None
+
+    def test_非同期作成でもAI障害は伝播し保存されない(
+        self,
+        repository: InMemoryMemoRepository,
+        failing_ai_client: FailingAIClient,
+    ) -> None:
+        usecase = MemoUsecase(repository=repository, ai_client=failing_ai_client)
+
+        with pytest.raises(RuntimeError, match="AI service unavailable"):
+            asyncio.run(usecase.create_memo_async("will fail"))
+
+        assert repository.get_all() == []
+
+    def test_非同期検索でAI検索結果が返る(self, usecase: MemoUsecase) -> None:
+        usecase.create_memo("Python tips")
+
+        result = asyncio.run(usecase.search_memos_async("Python"))
+
+        assert "Python" in result.answer
+
+
+class CountingEmbeddingClient(StubEmbeddingClient):
+    def __init__(self) -> None:
+        self.batches: list[int] = []
+
+    def embed_batch(self, texts: list[str]) -> list[list[float]]:
+        self.batches.append(len(texts))
+        return super().embed_batch(texts)
+
+
+class CountingRepository(InMemoryMemoRepository):
+    def __init__(self) -> None:
+        super().__init__()
+        self.batches: list[int] = []
+
+    def save_many(self, memos: list[Memo]) -> None:
+        self.batches.append(len(memos))
+        super().save_many(memos)
+
+
+@pytest.mark.unit
+class TestBulkCreate:
+    def test_バッチ単位で埋め込み全件をまとめて保存する(
+        self, stub_ai_client: StubAIClient
+    ) -> None:
+        repository = CountingRepository()
+        embedding_client = CountingEmbeddingClient()
+        usecase = MemoUsecase(
+            repository=repository,
+            ai_client=stub_ai_client,
+            embedding_client=embedding_client,
+        )
+        contents = [f"memo {i}" for i in range(10)]
+
+        memos = asyncio.run(usecase.create_memos_async(contents, batch_size=4))
+
+        assert [m.content for m in memos] == contents
+        assert embedding_client.batches == [4, 4, 2]
+        assert repository.batches == [10]
+        assert all(m.summary and m.embedding for m in repository.get_all())
+
+    def test_途中で失敗すると何も保存されない(
+        self, repository: InMemoryMemoRepository
+    ) -> None:
+        class FailsOnAIClient(StubAIClient):
+            async def analyze_memo_async(self, content: str) -> MemoAnalysisResult:
+                if content == "bad":
+                    raise RuntimeError("AI outage")
+                return self.analyze_memo(content)
+
+        usecase = MemoUsecase(repository=repository, ai_client=FailsOnAIClient())
+
+        with pytest.raises(RuntimeError):
+            asyncio.run(
+                usecase.create_memos_async(["a", "b", "c", "bad"], batch_size=2)
+            )
+
+        assert repository.get_all() == []
+
+    def test_解析の同時実行数が制限される(
+        self, repository: InMemoryMemoRepository
+    ) -> None:
+        active = 0
+        peak = 0
+
+        class SlowAIClient(StubAIClient):
+            async def analyze_memo_async(self, content: str) -> MemoAnalysisResult:
+                nonlocal active, peak
+                active += 1
+                peak = max(peak, active)
+                await asyncio.sleep(0.01)
+                active -= 1
+                return self.analyze_memo(content)
+
+        usecase = MemoUsecase(repository=repository, ai_client=SlowAIClient())
+
+        asyncio.run(
+            usecase.create_memos_async(
+                [str(i) for i in range(12)], batch_size=12, max_concurrency=3
+            )
+        )
+
+        assert peak == 3
+        assert len(repository.get_all()) == 12
+
+
+@pytest.mark.unit
+class TestUnchangedUpdate:
+    def test_内容が同じ更新は再解析しない(
+        self, repository: InMemoryMemoRepository, counting_ai_client: CountingAIClient
+    ) -> None:
+        usecase = MemoUsecase(repository=repository, ai_client=counting_ai_client)
+        memo = usecase.create_memo("autosave")
+
+        updated = usecase.update_memo(memo.id, "autosave")
+        asyncio.run(usecase.update_memo_async(memo.id, "autosave"))
+
+        assert updated is not None
+        assert updated.summary == "Summary of: autosave"
+        assert counting_ai_client.calls == ["autosave"]
+
+    def test_埋め込みが欠けていれば同じ内容でも再エンリッチする(
+        self,
+        repository: InMemoryMemoRepository,
+        stub_embedding_client: StubEmbeddingClient,
+    ) -> None:
+        MemoUsecase(repository=repository, ai_client=StubAIClient()).create_memo("x")
+        memo = repository.get_all()[0]
+        usecase = MemoUsecase(
+            repository=repository,
+            ai_client=StubAIClient(),
+            embedding_client=stub_embedding_client,
+        )
+
+        updated = usecase.update_memo(memo.id, "x")
+
+        assert updated is not None
+        assert updated.embedding is not None
+
+
+class StreamingAIClient(StubAIClient):
+    async def stream_search_answer(
+        self, query: str, memos: list[Memo], scores: list[float] | None = None
+    ) -> AsyncIterator[str]:
+        for word in ("Answer", " for ", query):
+            yield word
+
+
+@pytest.mark.unit
+class TestSearchStream:
+    def test_関連IDが先に得られ回答が分割して届く(
+        self, repository: InMemoryMemoRepository
+    ) -> None:
+        usecase = MemoUsecase(repository=repository, ai_client=StreamingAIClient())
+        memo = usecase.create_memo("Python tips")
+
+        async def scenario() -> tuple[list[str], list[str]]:
+            stream = await usecase.search_memos_stream("Python")
+            return stream.related_memo_ids, [text async for text in stream.answer]
+
+        related, chunks = asyncio.run(scenario())
+
+        assert related == [str(memo.id)]
+        assert chunks == ["Answer", " for ", "Python"]
+
+    def test_ストリーミング非対応のクライアントは回答を一度に返す(
+        self, usecase: MemoUsecase
+    ) -> None:
+        async def scenario() -> list[str]:
+            stream = await usecase.search_memos_stream("Python")
+            return [text async for text in stream.answer]
+
+        assert asyncio.run(scenario()) == ["Search result for: Python"]
@@ -0,0 +1,119 @@
+from uuid import uuid4
+
+import pytest
+
+from app.application.memo.memo_usecase import MemoUsecase
+from app.application.memo.search_cache import SemanticSearchCache
+from app.domain.memo.entities.memo import Memo
+from app.domain.memo.services.ai_client import SearchResult
+from app.infrastructure.memo.db.repositories.in_memory_memo_repository import (
+    InMemoryMemoRepository,
+)
+from tests.conftest import CountingAIClient, StubEmbeddingClient
+
+
+class FixedEmbeddingClient(StubEmbeddingClient):
+    """Embeds known texts to fixed vectors and everything else to a default."""
+
+    def __init__(self, vectors: dict[str, list[float]]) -> None:
+        self._vectors = vectors
+
+    def embed(self, text: str) -> list[float]:
+        return self._vectors.get(text, [1.0, 0.0, 0.0])
+
+    def dimension(self) -> int:
+        return 3
+
+
+@pytest.mark.unit
+class TestSemanticSearchCache:
+    def test_近いクエリは同じ回答を返す(self) -> None:
+        cache = SemanticSearchCache(max_distance=0.05)
+        memos = [Memo(content="a")]
+        cache.put([1.0, 0.0], memos, SearchResult(answer="cached"))
+
+        hit = cache.get([0.99, 0.05], memos)
+        miss = cache.get([0.0, 1.0], memos)
+
+        assert hit is not None
+        assert hit.answer == "cached"
+        assert miss is None
+
+    def test_検索されたメモが変わると使われない(self) -> None:
+        cache = SemanticSearchCache()
+        memo = Memo(content="a")
+        cache.put([1.0, 0.0], [memo], SearchResult(answer="cached"))
+
+        edited = memo.model_copy(update={"summary": "new summary"})
+
+        assert cache.get([1.0, 0.0], [edited]) is None
+        assert cache.get([1.0, 0.0], [memo, Memo(content="b")]) is None
+
+    def test_メモ単位で無効化される(self) -> None:
+        cache = SemanticSearchCache()
+        kept, dropped = Memo(content="a"), Memo(content="b")
+        cache.put([1.0, 0.0], [kept], SearchResult(answer="kept"))
+        cache.put([0.0, 1.0], [dropped], SearchResult(answer="dropped"))
+
+        cache.invalidate(dropped.id)
+        cache.invalidate(uuid4())
+
+        assert len(cache) == 1
+        assert cache.get([1.0, 0.0], [kept]) is not None
+
+    def test_上限を超えると古い回答から追い出される(self) -> None:
+        cache = SemanticSearchCache(max_entries=1)
+        memos = [Memo(content="a")]
+        cache.put([1.0, 0.0], memos, SearchResult(answer="old"))
+        cache.put([0.0, 1.0], memos, SearchResult(answer="new"))
+
+        assert cache.get([1.0, 0.0], memos) is None
+        assert len(cache) == 1
+
+
+@pytest.mark.unit
+class TestCachedSearch:
+    @pytest.fixture
+    def usecase(self, counting_ai_client: CountingAIClient) -> MemoUsecase:
+        return MemoUsecase(
+            repository=InMemoryMemoRepository(),
+            ai_client=counting_ai_client,
+            embedding_client=FixedEmbeddingClient(
+                {"python": [1.0, 0.0, 0.0], "python!": [0.999, 0.01, 0.0]}
+            ),
+            search_cache=SemanticSearchCache(),
+        )
+
+    def test_ほぼ同じクエリはAIを呼ばない(
+        self, usecase: MemoUsecase, counting_ai_client: CountingAIClient
+    ) -> None:
+        usecase.create_memo("Python tips")
+
+        first = usecase.search_memos("python")
+        second = usecase.search_memos("python!")
+
+        assert second.related_memo_ids == first.related_memo_ids
+        assert counting_ai_client.searches == 1
+
+    def test_メモを更新すると再検索される(
+        self, usecase: MemoUsecase, counting_ai_client: CountingAIClient
+    ) -> None:
+        memo = usecase.create_memo("Python tips")
+        usecase.search_memos("python")
+
+        usecase.update_memo(memo.id, "Python tricks")
+        usecase.search_memos("python")
+
+        assert counting_ai_client.searches == 2
+
+    def test_メモを削除すると再検索される(
+        self, usecase: MemoUsecase, counting_ai_client: CountingAIClient
+    ) -> None:
+        memo = usecase.create_memo("Python tips")
+        usecase.create_memo("Rust tips")
+        usecase.search_memos("python")
+
+        usecase.delete_memo(memo.id)
+        usecase.search_memos("python")
+
+        assert counting_ai_client.searches == 2
@@ -1,7 +1,13 @@
+import threading
+
+import numpy as np
 import pytest
 
 from app.application.memo.memo_usecase import MemoUsecase
 from app.domain.memo.entities.memo import Memo
+from app.domain.memo.services.similarity import normalize_rows, top_k
+from app.infrastructure.memo.db.hnsw_index import HnswParams
+from app.infrastructure.memo.db.quantization import VectorPrecision
 from app.infrastructure.memo.db.repositories.in_memory_memo_repository import (
     InMemoryMemoRepository,
 )
@@ -109,3 +115,82 @@ class TestVectorSearch:
     ) -> None:
         results = repository.search_by_vector([1.0, 0.0, 0.0], limit=5)
         assert results == []
+
+    def test_閾値を超えるとHNSWインデックスで検索される(self) -> None:
+        repository = InMemoryMemoRepository(brute_force_threshold=0)
+        memo_a = Memo(content="a", embedding=[1.0, 0.0, 0.0])
+        memo_b = Memo(content="b", embedding=[0.0, 1.0, 0.0])
+        memo_c = Memo(content="c", embedding=[0.9, 0.1, 0.0])
+        for memo in (memo_a, memo_b, memo_c):
+            repository.save(memo)
+        repository.delete(memo_a.id)
+
+        results = repository.search_by_vector([1.0, 0.0, 0.0], limit=1)
+
+        assert [m.id for m in results] == [memo_c.id]
+        assert results[0].embedding == pytest.approx([0.9, 0.1, 0.0])
+
+    def test_書き込みと並行した検索と一覧が失敗しない(self) -> None:
+        vectors = np.random.default_rng(0).standard_normal((200, 16))
+        repository = InMemoryMemoRepository(brute_force_threshold=0)
+        memos = [
+            Memo(content=str(i), embedding=v.tolist()) for i, v in enumerate(vectors)
+        ]
+        for memo in memos[:20]:
+            repository.save(memo)
+        errors: list[Exception] = []
+        done = threading.Event()
+
+        def write() -> None:
+            # Churn enough tombstones to rebuild the HNSW graph repeatedly
+            for _ in range(5):
+                for memo in memos[20:]:
+                    repository.save(memo)
+                    repository.delete(memo.id)
+            done.set()
+
+        def read() -> None:
+            while not done.is_set():
+                try:
+                    repository.search_by_vector(vectors[0].tolist(), 5)
+                    repository.get_page(10)
+                    repository.get_pending_ids()
+                except Exception as exc:  # noqa: BLE001
+                    errors.append(exc)
+
+        threads = [threading.Thread(target=write)] + [
+            threading.Thread(target=read) for _ in range(3)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=30)
+
+        assert errors == []
+        assert len(repository.get_all_metadata()) == 20
+
+    def test_int8インデックスの候補は元の精度で並べ直される(self) -> None:
+        rng = np.random.default_rng(0)
+        centers = rng.standard_normal((20, 32))
+        vectors = normalize_rows(
+            centers[rng.integers(0, 20, 600)] + 0.5 * rng.standard_normal((600, 32))
+        )
+        repository = InMemoryMemoRepository(
+            index_params=HnswParams(precision=VectorPrecision.INT8),
+            brute_force_threshold=0,
+        )
+        memos = [
+            Memo(content=str(i), embedding=v.tolist()) for i, v in enumerate(vectors)
+        ]
+        for memo in memos:
+            repository.save(memo)
+
+        hits = 0
+        for query in vectors[:30]:
+            expected = [memos[i].id for i in top_k(vectors @ query, 5).tolist()]
+            results = repository.search_by_vector(query.tolist(), limit=5)
+            hits += len(set(expected) & {m.id for m in results})
+            # Re-ranked at full precision, so the nearest neighbour is exact
+            assert results[0].id == expected[0]
+
+        assert hits / (30 * 5) >= 0.95